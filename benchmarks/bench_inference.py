@@ -0,0 +1,336 @@
+"""
+Micro-benchmarks for the inference hot path.
+
+Times each stage of src/api/inference.py at several batch sizes:
+
+    to_row              _to_row over the batch's requests
+    engineer_features   _engineer_features on a DataFrame (sklearn path)
+    engineer_columns    _engineer_columns (compiled path)
+    transform           fitted ColumnTransformer.transform
+    transform_compiled  CompiledPreprocessor.transform_columns
+    predict             model.predict
+    predict_flat        FlatTreeEnsemble.predict (tree models only)
+    predict_price       predict_price called once per request (cache disabled)
+    predict_batch       predict_batch over the whole batch
+
+for the shipped artifacts (MODEL_PATH/PREPROCESSOR_PATH) and for models
+freshly trained with train_model.get_model_instance on final.csv. Every
+result has the median and best wall time per call, the time per row and the
+peak Python allocation during one call (tracemalloc).
+
+Results are written as JSON. With --baseline, stages whose median got slower
+than --threshold are listed, and --fail-on-regression turns them into a
+non-zero exit code for CI.
+
+Usage:
+    python -m benchmarks.bench_inference --output benchmarks/results/baseline.json
+    python -m benchmarks.bench_inference --baseline benchmarks/results/baseline.json \
+        --fail-on-regression
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.api import inference  # noqa: E402
+from src.api.cache import PredictionCache  # noqa: E402
+from src.api.schemas import OLXPredictionRequest  # noqa: E402
+from benchmarks.replay_load import synthetic_payloads  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZES = (1, 10, 100, 10000)
+DEFAULT_ALTERNATIVES = ("LinearRegression", "RandomForest", "GradientBoosting", "XGBoost")
+
+# -----------------------------
+# Argument parser
+# -----------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the inference hot path.")
+    parser.add_argument("--model", type=str, default=str(inference.MODEL_PATH), help="Shipped model .pkl")
+    parser.add_argument("--preprocessor", type=str, default=str(inference.PREPROCESSOR_PATH),
+                        help="Shipped preprocessor .pkl")
+    parser.add_argument("--csv", type=str, default=str(ROOT / "final.csv"),
+                        help="CSV in final.csv format for requests and training")
+    parser.add_argument("--config", type=str, default=str(ROOT / "configs" / "model_config.yaml"),
+                        help="model_config.yaml; its parameters are used for the matching alternative")
+    parser.add_argument("--alternatives", nargs="*", default=list(DEFAULT_ALTERNATIVES),
+                        help="get_model_instance names to train and benchmark (none to skip)")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=list(DEFAULT_BATCH_SIZES))
+    parser.add_argument("--stages", nargs="*", default=None, help="Only run these stages")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Minimum seconds per measurement; fast calls are looped")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per stage")
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results here")
+    parser.add_argument("--baseline", type=str, default=None, help="Earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown of the median reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 if any stage regressed")
+    return parser.parse_args(argv)
+
+# -----------------------------
+# Timing
+# -----------------------------
+def measure(fn, min_time: float, repeat: int) -> dict:
+    """
+    Time fn like timeit: loop it until a measurement takes min_time, repeat.
+
+    Returns:
+        Dict with median_s and min_s per call, loops per measurement and the
+        peak bytes allocated during one traced call
+    """
+    fn()  # warm-up
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - start) / loops)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "loops": loops,
+        "peak_bytes": peak,
+    }
+
+
+def _stages(state, requests: list) -> dict:
+    """Stage name -> zero-argument callable over one batch of requests."""
+    rows = [inference._to_row(r) for r in requests]
+    df = inference._engineer_features(pd.DataFrame(rows, columns=inference.CSV_COLS))
+    X = state.preproc.transform(df) if state.compiled is None else None
+    cols = inference._engineer_columns(rows)
+    if X is None:
+        X = state.compiled.transform_columns(cols)
+
+    stages = {
+        "to_row": lambda: [inference._to_row(r) for r in requests],
+        "engineer_features": lambda: inference._engineer_features(
+            pd.DataFrame(rows, columns=inference.CSV_COLS)),
+        "engineer_columns": lambda: inference._engineer_columns(rows),
+    }
+    if hasattr(state.preproc, "transform"):
+        stages["transform"] = lambda: state.preproc.transform(df)
+    if state.compiled is not None:
+        stages["transform_compiled"] = lambda: state.compiled.transform_columns(cols)
+    stages["predict"] = lambda: state.model.predict(X)
+    if state.flat is not None and state.flat is not state.model:
+        stages["predict_flat"] = lambda: state.flat.predict(X)
+
+    def predict_each():
+        for r in requests:
+            inference.predict_price(r)
+
+    stages["predict_price"] = predict_each
+    stages["predict_batch"] = lambda: inference.predict_batch(requests)
+    return stages
+
+
+def bench_subject(name: str, state, requests: list, batch_sizes, min_time: float, repeat: int,
+                  only=None) -> list:
+    """Benchmark every stage for one model state; returns one result dict per stage and size."""
+    inference._install(state)
+    results = []
+    for size in batch_sizes:
+        batch = [requests[i % len(requests)] for i in range(size)]
+        for stage, fn in _stages(state, batch).items():
+            if only and stage not in only:
+                continue
+            timing = measure(fn, min_time, repeat)
+            results.append({
+                "subject": name,
+                "model": state.profile.display_name,
+                "stage": stage,
+                "batch_size": size,
+                **timing,
+                "per_row_us": timing["median_s"] / size * 1e6,
+            })
+            logger.info(
+                f"{name:<18} {stage:<18} n={size:<6} {timing['median_s'] * 1000:10.3f}ms "
+                f"({results[-1]['per_row_us']:9.2f}us/row, peak {timing['peak_bytes'] / 1024:,.0f}KiB)"
+            )
+    return results
+
+# -----------------------------
+# Subjects
+# -----------------------------
+def _training_data(csv_path):
+    """Engineered features and prices of the valid rows of a final.csv-format CSV."""
+    from src.models.batch_score import parse_chunk, parse_price
+
+    raw = pd.read_csv(csv_path, dtype=str)
+    features, errors = parse_chunk(raw)
+    prices = parse_price(raw["Price"])
+    valid = pd.isna(errors) & prices.notna().to_numpy()
+    X = inference._engineer_features(features[valid].reset_index(drop=True))
+    return X, prices[valid].reset_index(drop=True)
+
+
+def _production_preprocessor():
+    """Unfitted ColumnTransformer with the layout of the shipped preprocessor."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    return ColumnTransformer(transformers=[
+        ('num', Pipeline(steps=[('scaler', StandardScaler())]), ['LB', 'LT', 'KT', 'KM']),
+        ('cat', Pipeline(steps=[('onehot', OneHotEncoder(drop='first', handle_unknown='ignore',
+                                                         sparse_output=False))]),
+         ['Provinsi', 'Kota/Kab', 'Type']),
+    ])
+
+
+def fresh_states(names, csv_path, config_path) -> list:
+    """Train each named model with get_model_instance; returns (name, ModelState) pairs."""
+    try:
+        from src.models.train_model import get_model_instance
+    except ImportError as e:
+        logger.warning(f"Skipping freshly trained models; training dependencies missing: {e}")
+        return []
+    import yaml
+
+    params = {}
+    if config_path and Path(config_path).exists():
+        with open(config_path) as f:
+            model_cfg = yaml.safe_load(f)["model"]
+        params[model_cfg["best_model"]] = model_cfg.get("parameters") or {}
+
+    X, y = _training_data(csv_path)
+    preproc = _production_preprocessor().fit(X)
+    Xt = preproc.transform(X)
+    states = []
+    for name in names:
+        start_time = time.perf_counter()
+        model = get_model_instance(name, params.get(name, {})).fit(Xt, y)
+        logger.info(f"Trained {name} in {time.perf_counter() - start_time:.1f}s")
+        states.append((f"fresh:{name}", inference.ModelState.prepare(model, preproc, version=f"fresh-{name}")))
+    return states
+
+# -----------------------------
+# Baseline comparison
+# -----------------------------
+def _key(result: dict) -> tuple:
+    return result["subject"], result["stage"], result["batch_size"]
+
+
+def compare(results: list, baseline: list, threshold: float) -> list:
+    """Results whose median is more than threshold slower than the baseline's."""
+    before = {_key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = before.get(_key(result))
+        if old is None:
+            continue
+        ratio = result["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        if ratio > 1 + threshold:
+            regressions.append(dict(result, baseline_median_s=old["median_s"], slowdown=round(ratio, 3)))
+    return regressions
+
+# -----------------------------
+# Main logic
+# -----------------------------
+def main(args) -> int:
+    # Measure the inference path itself, not the prediction cache
+    inference._prediction_cache = PredictionCache(maxsize=0)
+    requests = [
+        OLXPredictionRequest(**payload)
+        for payload in synthetic_payloads(args.csv, min(max(args.batch_sizes), 1000))
+    ]
+
+    subjects, errors = [], {}
+    try:
+        model, preproc = inference._load_artifacts(args.model, args.preprocessor)
+        subjects.append(("shipped", inference.ModelState.prepare(
+            model, preproc, inference._artifact_digest(Path(args.model), Path(args.preprocessor)))))
+    except Exception as e:
+        logger.error(f"Shipped artifacts unavailable: {e}")
+        errors["shipped"] = str(e)
+    if args.alternatives:
+        subjects.extend(fresh_states(args.alternatives, args.csv, args.config))
+
+    results = []
+    for name, state in subjects:
+        try:
+            results.extend(bench_subject(name, state, requests, args.batch_sizes,
+                                         args.min_time, args.repeat, args.stages))
+        except Exception as e:
+            logger.error(f"Benchmark of {name} failed: {e}")
+            errors[name] = str(e)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "scikit_learn": sklearn.__version__,
+            "preprocessor_backend": inference.PREPROCESSOR_BACKEND,
+            "model_backend": inference.MODEL_BACKEND,
+            "min_time": args.min_time,
+            "repeat": args.repeat,
+        },
+        "errors": errors,
+        "results": results,
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold)
+        report["regressions"] = regressions
+        for r in regressions:
+            logger.warning(
+                f"Regression: {r['subject']} {r['stage']} n={r['batch_size']} "
+                f"{r['baseline_median_s'] * 1000:.3f}ms -> {r['median_s'] * 1000:.3f}ms (x{r['slowdown']})"
+            )
+        compared = len({_key(r) for r in results} & {_key(r) for r in baseline["results"]})
+        if not regressions:
+            logger.info(f"No regressions beyond {args.threshold:.0%} in {compared} stages compared")
+        if regressions and args.fail_on_regression:
+            status = 1
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Results written to {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main(parse_args()))
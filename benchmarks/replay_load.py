@@ -0,0 +1,397 @@
+"""
+Replay load generator for the prediction API.
+
+Replays captured or synthetic OLXPredictionRequest payloads against the
+FastAPI app, either in-process through ASGI (no server needed) or against a
+running server, and writes a JSON report with throughput, latency
+percentiles and error rates per endpoint.
+
+Payload sources:
+    --payloads FILE   NDJSON with one request body per line (the /predict/stream
+                      input format) or the API's JSON payload logs, whose
+                      "payload" field holds the request
+    --synthetic N     N rows sampled from a CSV in final.csv format
+
+Load models:
+    --mode open       constant arrival rate (--rate requests/s) regardless of
+                      how fast responses come back; latency is measured from
+                      each request's scheduled start, so a stalled server shows
+                      up as queueing delay instead of a lower request rate
+    --mode closed     --concurrency clients, each sending its next request as
+                      soon as the previous one returns
+
+Usage:
+    python -m benchmarks.replay_load --synthetic 500 --mode closed --concurrency 16 \
+        --duration 30 --endpoint predict --output reports/closed16.json
+    python -m benchmarks.replay_load --payloads capture.ndjson --url http://localhost:8000 \
+        --mode open --rate 200 --endpoint predict --endpoint batch --baseline reports/closed16.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.api.schemas import OLXPredictionRequest  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = {
+    "predict": "/predict",
+    "batch": "/predict/batch",
+}
+# Settings that change server behaviour; recorded with every in-process run
+SETTINGS_ENV = (
+    "MODEL_PATH", "PREPROCESSOR_PATH", "MODEL_BUNDLE_DIR", "PREPROCESSOR_BACKEND", "MODEL_BACKEND",
+    "PREDICTION_CACHE_SIZE", "MICROBATCH_ENABLED", "MICROBATCH_MAX_SIZE", "MICROBATCH_MAX_WAIT_MS",
+    "LOG_PAYLOAD_SAMPLE_RATE",
+)
+
+# -----------------------------
+# Argument parser
+# -----------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay prediction traffic and report latency.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--payloads", type=str, help="NDJSON file of request bodies or payload logs")
+    source.add_argument("--synthetic", type=int, help="Number of payloads to sample from --csv")
+    parser.add_argument("--csv", type=str, default=str(ROOT / "final.csv"),
+                        help="CSV in final.csv format for --synthetic")
+    parser.add_argument("--url", type=str, default=None,
+                        help="Base URL of a running server (default: the app in-process via ASGI)")
+    parser.add_argument("--endpoint", action="append", choices=sorted(ENDPOINTS), default=None,
+                        help="Endpoint to load; repeat to mix endpoints round-robin (default: predict)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Items per /predict/batch request")
+    parser.add_argument("--mode", choices=["open", "closed"], default="closed")
+    parser.add_argument("--rate", type=float, default=50.0, help="Requests per second (open loop)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (closed loop)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load to generate")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--warmup", type=int, default=10, help="Unrecorded requests sent first")
+    parser.add_argument("--max-in-flight", type=int, default=1000,
+                        help="Open loop: requests beyond this many outstanding are counted as errors")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", type=str, default=None, help="Free-form name stored in the report")
+    parser.add_argument("--output", type=str, default=None, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="Earlier report to compare throughput and latency against")
+    return parser.parse_args(argv)
+
+# -----------------------------
+# Payloads
+# -----------------------------
+def load_payloads(path) -> list:
+    """
+    Read request bodies from NDJSON.
+
+    Each line is either a request body or a JSON log record with a "payload"
+    field. Lines that are not valid requests are skipped.
+    """
+    payloads, skipped = [], 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                if isinstance(data, dict) and isinstance(data.get("payload"), dict):
+                    data = data["payload"]
+                payloads.append(OLXPredictionRequest(**data).dict(by_alias=True, exclude_none=True))
+            except (ValueError, TypeError):
+                skipped += 1
+    if skipped:
+        logger.warning(f"Skipped {skipped} lines of {path} that are not prediction requests")
+    if not payloads:
+        raise ValueError(f"No prediction requests found in {path}")
+    return payloads
+
+
+def synthetic_payloads(csv_path, n: int, seed: int = 0) -> list:
+    """Sample n valid request bodies from a CSV in final.csv format."""
+    from src.models.batch_score import parse_chunk
+
+    features, errors = parse_chunk(pd.read_csv(csv_path, dtype=str))
+    features = features[pd.isna(errors)]
+    if features.empty:
+        raise ValueError(f"No valid rows in {csv_path}")
+    sample = features.sample(n=n, replace=n > len(features), random_state=seed)
+    return [
+        OLXPredictionRequest(**row).dict(by_alias=True, exclude_none=True)
+        for row in sample.to_dict(orient="records")
+    ]
+
+# -----------------------------
+# Load generation
+# -----------------------------
+class Recorder:
+    """Latencies and outcomes per endpoint."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+
+    def record(self, endpoint: str, seconds: float, status):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[str(status)] = counts.get(str(status), 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {
+            name: _summarize(self.latencies[name], self.statuses[name], elapsed)
+            for name in sorted(self.latencies)
+        }
+        all_statuses = {}
+        for counts in self.statuses.values():
+            for status, n in counts.items():
+                all_statuses[status] = all_statuses.get(status, 0) + n
+        latencies = [s for values in self.latencies.values() for s in values]
+        return {"endpoints": endpoints, "total": _summarize(latencies, all_statuses, elapsed)}
+
+
+def _summarize(latencies: list, statuses: dict, elapsed: float) -> dict:
+    n = len(latencies)
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if n else (None, None, None)
+    return {
+        "requests": n,
+        "errors": errors,
+        "error_rate": round(errors / n, 6) if n else 0.0,
+        "throughput_rps": round(n / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(float(ms.mean()), 3) if n else None,
+            "p50": round(float(p50), 3) if n else None,
+            "p95": round(float(p95), 3) if n else None,
+            "p99": round(float(p99), 3) if n else None,
+            "max": round(float(ms.max()), 3) if n else None,
+        },
+        "status_codes": dict(sorted(statuses.items())),
+    }
+
+
+class _Traffic:
+    """Round-robin over endpoints and payloads, building (endpoint, path, body)."""
+
+    def __init__(self, payloads: list, endpoints: list, batch_size: int, seed: int):
+        rng = random.Random(seed)
+        self._payloads = itertools.cycle(rng.sample(payloads, len(payloads)))
+        self._endpoints = itertools.cycle(endpoints)
+        self.batch_size = batch_size
+
+    def next(self) -> tuple:
+        endpoint = next(self._endpoints)
+        if endpoint == "batch":
+            body = {"items": [next(self._payloads) for _ in range(self.batch_size)]}
+        else:
+            body = next(self._payloads)
+        return endpoint, ENDPOINTS[endpoint], body
+
+
+async def _send(client, recorder, endpoint, path, body, start: float, record: bool = True):
+    try:
+        response = await client.post(path, json=body)
+        status = response.status_code
+    except Exception as e:
+        status = type(e).__name__
+    if record:
+        recorder.record(endpoint, time.perf_counter() - start, status)
+
+
+async def _closed_loop(client, traffic, recorder, concurrency: int, deadline: float, budget):
+    async def worker():
+        while time.perf_counter() < deadline and budget.take():
+            endpoint, path, body = traffic.next()
+            await _send(client, recorder, endpoint, path, body, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _open_loop(client, traffic, recorder, rate: float, deadline: float, budget,
+                     max_in_flight: int):
+    start = time.perf_counter()
+    in_flight = set()
+    for i in itertools.count():
+        scheduled = start + i / rate
+        if scheduled >= deadline or not budget.take():
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint, path, body = traffic.next()
+        if len(in_flight) >= max_in_flight:
+            recorder.record(endpoint, time.perf_counter() - scheduled, "client_overload")
+            continue
+        task = asyncio.create_task(_send(client, recorder, endpoint, path, body, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+class _Budget:
+    """Optional cap on the number of requests sent."""
+
+    def __init__(self, limit):
+        self.remaining = limit
+
+    def take(self) -> bool:
+        if self.remaining is None:
+            return True
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+async def _server_info(client) -> dict:
+    try:
+        response = await client.get("/ready")
+        return {"ready": response.status_code == 200, **response.json()}
+    except Exception as e:
+        return {"ready": False, "error": str(e)}
+
+
+async def run_load(args, payloads: list, app=None) -> dict:
+    """Generate load as configured by args and return the report."""
+    import httpx
+
+    # httpx logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    endpoints = args.endpoint or ["predict"]
+    traffic = _Traffic(payloads, endpoints, args.batch_size, args.seed)
+    recorder = Recorder()
+    budget = _Budget(args.requests)
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout,
+                                   limits=httpx.Limits(max_connections=None))
+        lifespan = None
+    else:
+        if app is None:
+            from src.api.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay",
+                                   timeout=args.timeout)
+        lifespan = app.router.lifespan_context(app)
+
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            for _ in range(args.warmup):
+                endpoint, path, body = traffic.next()
+                await _send(client, recorder, endpoint, path, body, time.perf_counter(), record=False)
+            server = await _server_info(client)
+
+            started_at = datetime.now(timezone.utc).isoformat()
+            start = time.perf_counter()
+            deadline = start + args.duration
+            if args.mode == "open":
+                await _open_loop(client, traffic, recorder, args.rate, deadline, budget, args.max_in_flight)
+            else:
+                await _closed_loop(client, traffic, recorder, args.concurrency, deadline, budget)
+            elapsed = time.perf_counter() - start
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+
+    config = {
+        "label": args.label,
+        "target": args.url or "in-process",
+        "mode": args.mode,
+        "rate": args.rate if args.mode == "open" else None,
+        "concurrency": args.concurrency if args.mode == "closed" else None,
+        "duration": args.duration,
+        "requests": args.requests,
+        "endpoints": endpoints,
+        "batch_size": args.batch_size if "batch" in endpoints else None,
+        "payloads": args.payloads or f"synthetic:{args.synthetic}:{Path(args.csv).name}",
+        "n_payloads": len(payloads),
+        "seed": args.seed,
+    }
+    if not args.url:
+        config["settings"] = {k: os.environ[k] for k in SETTINGS_ENV if k in os.environ}
+    return {
+        "started_at": started_at,
+        "elapsed_seconds": round(elapsed, 3),
+        "config": config,
+        "server": server,
+        **recorder.summary(elapsed),
+    }
+
+# -----------------------------
+# Reporting
+# -----------------------------
+def compare(report: dict, baseline: dict) -> list:
+    """Rows of (endpoint, metric, baseline, current, change %) for the shared endpoints."""
+    rows = []
+    for name in sorted(set(report["endpoints"]) & set(baseline["endpoints"])):
+        current, before = report["endpoints"][name], baseline["endpoints"][name]
+        pairs = [("throughput_rps", before["throughput_rps"], current["throughput_rps"]),
+                 ("error_rate", before["error_rate"], current["error_rate"])]
+        pairs += [(f"{p}_ms", before["latency_ms"][p], current["latency_ms"][p]) for p in ("p50", "p95", "p99")]
+        for metric, old, new in pairs:
+            change = None if not old or new is None else round((new - old) / old * 100, 1)
+            rows.append((name, metric, old, new, change))
+    return rows
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{'endpoint':<10} {'requests':>9} {'rps':>9} {'errors':>7} "
+             f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+    for name, stats in list(report["endpoints"].items()) + [("total", report["total"])]:
+        latency = stats["latency_ms"]
+        lines.append(
+            f"{name:<10} {stats['requests']:>9} {stats['throughput_rps']:>9.1f} "
+            f"{stats['error_rate']:>7.2%} "
+            + " ".join(f"{latency[p]:>9.2f}" if latency[p] is not None else f"{'-':>9}"
+                       for p in ("p50", "p95", "p99"))
+        )
+    return "\n".join(lines)
+
+# -----------------------------
+# Main logic
+# -----------------------------
+def main(args) -> dict:
+    if args.payloads:
+        payloads = load_payloads(args.payloads)
+    else:
+        payloads = synthetic_payloads(args.csv, args.synthetic, args.seed)
+    logger.info(f"Replaying {len(payloads)} payloads ({args.mode} loop) against {args.url or 'the app in-process'}")
+
+    report = asyncio.run(run_load(args, payloads))
+    print(format_report(report))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["baseline"] = {"path": args.baseline, "label": baseline["config"].get("label")}
+        print(f"\nCompared with {args.baseline}:")
+        for name, metric, old, new, change in compare(report, baseline):
+            change_text = "" if change is None else f" ({change:+.1f}%)"
+            print(f"  {name:<8} {metric:<15} {old} -> {new}{change_text}")
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main(parse_args())
@@ -3,7 +3,7 @@ import numpy as np
 import joblib
 import mlflow
 import mlflow.sklearn
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
@@ -15,37 +15,51 @@ from contextlib import nullcontext
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.pipeline import Pipeline
-from sklearn.feature_selection import RFE
 from xgboost import XGBRegressor
+from src.models.training_scheduler import run_model_search
+from src.models.feature_selection import DEFAULTS as FEATURE_SELECTION_DEFAULTS, select_features
+from src.features.store import is_store, load_xy, store_path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger()
 
-# Load dataset
+# Load dataset: the binary feature store written by featurization, else the CSV.
+# Dense, as the API serves it: XGBoost would read a sparse matrix's zeros as missing values
 data_path = 'data/processed/featured_house_data.csv'
-data = pd.read_csv(data_path)
-
-X = data.drop('Price', axis=1)
-y = data['Price']
+if is_store(store_path(data_path)):
+    data_path = store_path(data_path)
+X, y, feature_columns = load_xy(data_path, 'price', dense=True)
 
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# Feature selection with RFE using XGBoost
-xgb_model = XGBRegressor(objective='reg:squarederror')
-xgb_model.fit(X_train, y_train)
+config_path = 'models/model_config.yaml'
 
-rfe_selector = RFE(estimator=xgb_model, n_features_to_select=10)
-rfe_selector.fit(X_train, y_train)
+# Feature selection settings live in model_config.yaml and are kept across runs
+feature_selection_cfg = dict(FEATURE_SELECTION_DEFAULTS)
+if os.path.exists(config_path):
+    with open(config_path, 'r') as f:
+        feature_selection_cfg.update((yaml.safe_load(f) or {}).get('feature_selection') or {})
+
+# Feature selection with adaptive-step RFE using XGBoost
+xgb_model = XGBRegressor(objective='reg:squarederror')
+rfe_selected_features, selection_report = select_features(xgb_model, X_train, y_train, columns=feature_columns,
+                                                          **feature_selection_cfg)
 
-rfe_selected_features = X.columns[rfe_selector.support_]
+print(f"Feature selection: {len(selection_report['rounds'])} rounds, {selection_report['n_fits']} fits "
+      f"in {selection_report['seconds']:.1f}s")
+for selection_round in selection_report['rounds']:
+    cv_score = selection_round['cv_score']
+    print(f"   {selection_round['n_features']:>4} features: "
+          f"CV R2 {'n/a' if cv_score is None else f'{cv_score:.4f}'} ({selection_round['seconds']:.2f}s)")
 
-print("Top 10 Selected Features by RFE:")
+print(f"Top {len(rfe_selected_features)} Selected Features by RFE:")
 for feature in rfe_selected_features:
     print(f" - {feature}")
 
 # Filter datasets to use only selected features
-X_train = X_train[rfe_selected_features]
-X_test = X_test[rfe_selected_features]
+selected_columns = [feature_columns.index(f) for f in rfe_selected_features]
+X_train = X_train[:, selected_columns]
+X_test = X_test[:, selected_columns]
 
 # Define models and hyperparameter grids
 models = {
@@ -73,40 +87,18 @@ model_grids = {
     }
 }
 
-def evaluate_model_with_gridsearch(name, model, grid, X_train, y_train, X_test, y_test):
-    if grid:
-        clf = GridSearchCV(model, grid, cv=3, scoring='r2', n_jobs=-1)
-        clf.fit(X_train, y_train)
-        best_model = clf.best_estimator_
-        best_params = clf.best_params_
-    else:
-        model.fit(X_train, y_train)
-        best_model = model
-        best_params = model.get_params()
-
-    y_pred = best_model.predict(X_test)
-    mae = mean_absolute_error(y_test, y_pred)
-    mse = mean_squared_error(y_test, y_pred)
-    rmse = np.sqrt(mse)
-    r2 = r2_score(y_test, y_pred)
-
-    return {
-        'mae': mae,
-        'mse': mse,
-        'rmse': rmse,
-        'r2': r2,
-        'model': best_model,
-        'params': best_params
-    }
-
-results = {}
+# Every candidate fit of every family shares one process pool and one core budget
+n_jobs = int(os.getenv('TRAIN_N_JOBS', os.cpu_count() or 1))
+results, search_report = run_model_search(models, model_grids, X_train, y_train, X_test, y_test, n_jobs=n_jobs)
 
-for name, model in models.items():
-    logger.info(f"Training {name}...")
-    evaluation = evaluate_model_with_gridsearch(name, model, model_grids[name], X_train, y_train, X_test, y_test)
-    results[name] = evaluation
+for name, evaluation in results.items():
     print(f"{name} R2: {evaluation['r2']:.4f}, RMSE: {evaluation['rmse']:.2f}")
 
+print(f"Model search: {search_report['n_fits']} fits in {search_report['wall_seconds']:.1f}s wall "
+      f"({search_report['fit_seconds']:.1f}s of fitting on {search_report['n_jobs']} cores), "
+      f"peak RSS {search_report['peak_rss_bytes'] / (1 << 20):.0f}MB, "
+      f"peak PSS {search_report['peak_pss_bytes'] / (1 << 20):.0f}MB")
+
 # Get best model
 best_model_name = max(results, key=lambda x: results[x]['r2'])
 best_model = results[best_model_name]['model']
@@ -144,6 +136,7 @@ selected_features_dict = {
 }
 
 model_config = {
+    'feature_selection': feature_selection_cfg,
     'model': {
         'name': 'house_price_model',
         'best_model': best_model_name,
@@ -155,7 +148,6 @@ model_config = {
     }
 }
 
-config_path = 'models/model_config.yaml'
 os.makedirs(os.path.dirname(config_path), exist_ok=True)
 with open(config_path, 'w') as f:
     yaml.dump(model_config, f)
@@ -170,4 +162,4 @@ joblib.dump(best_model, model_path)
 joblib.dump(preprocessor, preprocessor_path)
 
 print(f"Saved model to {model_path}")
-print(f"Saved preprocessor to {preprocessor_path}")
\ No newline at end of file
+print(f"Saved preprocessor to {preprocessor_path}")
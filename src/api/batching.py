@@ -0,0 +1,149 @@
+# fastapi_app/batching.py
+"""
+Micro-batching dispatcher for single-row predictions.
+
+Concurrent callers put their item on a shared queue and block on a future. A
+worker thread collects items into a batch, runs the handler once over the
+whole batch and resolves every caller's future with its own result. A batch
+is flushed when it reaches ``max_size`` items, when ``max_wait`` has passed
+since its first item, or as soon as every caller currently waiting is already
+in it (so a lone request under light load is never delayed).
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Collect concurrent submissions into batches for a vectorized handler.
+
+    Args:
+        handler: Callable taking a list of items and returning a list of the
+            same length; an entry that is an Exception fails only its caller
+        max_size: Maximum number of items per batch
+        max_wait: Seconds to keep a batch open for more items
+        name: Name of the worker thread
+    """
+
+    def __init__(self, handler, max_size: int = 32, max_wait: float = 0.002,
+                 name: str = "micro-batcher"):
+        self.handler = handler
+        self.max_size = max(int(max_size), 1)
+        self.max_wait = max(float(max_wait), 0.0)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        # Callers that have submitted and are not yet resolved
+        self._pending = 0
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.size_counts = {}
+        self.total_wait_s = 0.0
+        self.total_run_s = 0.0
+        self.max_run_s = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        """Queue item for the next batch and return a future for its result."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Micro-batcher is closed")
+            self._pending += 1
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item, timeout: float = None):
+        """Submit item and wait for its result, re-raising its exception."""
+        return self.submit(item).result(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Flush queued items and stop the worker thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_size:
+            with self._lock:
+                everyone_here = self._pending <= len(batch)
+            if everyone_here and self._queue.empty():
+                break
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._collect(first)
+            start = time.perf_counter()
+            try:
+                results = self.handler([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"Batch handler returned {len(results)} results for {len(batch)} items"
+                    )
+            except Exception as e:
+                logger.error(f"Micro-batch of {len(batch)} items failed: {e}")
+                results = [e] * len(batch)
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._pending -= len(batch)
+                self._record(batch, start, elapsed)
+            for (_, future, _), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _record(self, batch, start, elapsed):
+        # Caller holds the lock
+        size = len(batch)
+        self.batches += 1
+        self.items += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.size_counts[size] = self.size_counts.get(size, 0) + 1
+        self.total_wait_s += sum(start - submitted for _, _, submitted in batch)
+        self.total_run_s += elapsed
+        self.max_run_s = max(self.max_run_s, elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "pending": self._pending,
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "batch_size_counts": dict(sorted(self.size_counts.items())),
+                "mean_queue_wait_ms": self.total_wait_s / self.items * 1000 if self.items else 0.0,
+                "mean_batch_run_ms": self.total_run_s / self.batches * 1000 if self.batches else 0.0,
+                "max_batch_run_ms": self.max_run_s * 1000,
+            }
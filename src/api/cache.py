@@ -0,0 +1,130 @@
+# fastapi_app/cache.py
+"""
+In-process LRU cache for prediction responses.
+
+Entries are tagged with the version of the model/preprocessor pair that
+produced them. A model swap calls ``set_version``, which drops the previous
+version's entries at once, so a new artifact never serves predictions from
+the previous one. Requests still finishing on a replaced version neither read
+nor store entries, so during a swap the two versions do not evict each
+other's entries. Looking up or storing with a version never seen before
+(a model assigned without a swap) also replaces the current version.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Hashable, Optional
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with optional TTL and hit/miss/eviction counters.
+
+    Args:
+        maxsize: Maximum number of entries; 0 disables the cache
+        ttl: Seconds an entry stays valid; None or 0 means no expiry
+        clock: Monotonic time source (overridable for tests)
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, clock=time.monotonic):
+        self.maxsize = max(int(maxsize), 0)
+        self.ttl = ttl or None
+        self._clock = clock
+        self._data = OrderedDict()
+        self._version = None
+        # Versions replaced recently; requests still running on them bypass the cache
+        self._retired = deque(maxlen=8)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def _replace_version(self, version: Hashable):
+        # Caller holds the lock
+        if self._data:
+            self.invalidations += 1
+            self._data.clear()
+        if self._version is not None:
+            self._retired.append(self._version)
+        if version in self._retired:
+            self._retired.remove(version)
+        self._version = version
+
+    def _check_version(self, version: Hashable) -> bool:
+        """Whether version may use the cache; caller holds the lock."""
+        if version == self._version:
+            return True
+        if version in self._retired:
+            self.stale += 1
+            return False
+        self._replace_version(version)
+        return True
+
+    def set_version(self, version: Hashable):
+        """Make version current (on a model swap), dropping every other version's entries."""
+        with self._lock:
+            if version != self._version:
+                self._replace_version(version)
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """Return the cached value for key under version, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if not self._check_version(version):
+                return None
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, version: Hashable):
+        """Store value for key under version, evicting the least recently used entry."""
+        if not self.enabled:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            if not self._check_version(version):
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale": self.stale,
+            }
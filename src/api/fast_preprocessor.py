@@ -0,0 +1,286 @@
+# fastapi_app/fast_preprocessor.py
+"""
+NumPy fast path for a fitted scikit-learn ColumnTransformer.
+
+The production preprocessor is a ColumnTransformer of StandardScaler and
+OneHotEncoder pipelines. ``CompiledPreprocessor`` reads their fitted
+parameters once (scaler means/scales as arrays, one-hot vocabularies as
+value -> column index dicts) and then writes encoded features straight into
+a preallocated float64 array, without building a DataFrame or going through
+ColumnTransformer dispatch. The arithmetic is the same as scikit-learn's, so
+the output is identical to ``ColumnTransformer.transform``.
+"""
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+
+class UnsupportedPreprocessorError(TypeError):
+    """Raised when a preprocessor cannot be compiled to the NumPy fast path."""
+
+
+class _NumericBlock:
+    """Imputation and standard scaling of numeric columns."""
+
+    def __init__(self, columns, start, fill=None, mean=None, scale=None):
+        self.columns = list(columns)
+        self.start = start
+        self.stop = start + len(self.columns)
+        self.fill = fill
+        self.mean = mean
+        self.scale = scale
+
+    def write(self, cols, out):
+        block = out[:, self.start:self.stop]
+        for j, col in enumerate(self.columns):
+            block[:, j] = cols[col]
+        if self.fill is not None:
+            missing = np.isnan(block)
+            if missing.any():
+                block[missing] = np.broadcast_to(self.fill, block.shape)[missing]
+        if self.mean is not None:
+            block -= self.mean
+        if self.scale is not None:
+            block /= self.scale
+
+
+class _OneHotBlock:
+    """One-hot encoding of a single categorical column."""
+
+    def __init__(self, column, start, index, width, handle_unknown, fill=None):
+        self.column = column
+        self.start = start
+        self.stop = start + width
+        # Maps category -> offset in the block; dropped categories map to -1
+        self.index = index
+        self.handle_unknown = handle_unknown
+        self.fill = fill
+
+    def write(self, cols, out):
+        values = cols[self.column]
+        block = out[:, self.start:self.stop]
+        block[:] = 0.0
+        for row, value in enumerate(values):
+            if self.fill is not None and _is_missing(value):
+                value = self.fill
+            offset = self.index.get(value)
+            if offset is None:
+                if self.handle_unknown == 'error':
+                    raise ValueError(
+                        f"Found unknown categories [{value!r}] in column "
+                        f"'{self.column}' during transform"
+                    )
+                continue
+            if offset >= 0:
+                block[row, offset] = 1.0
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _steps(transformer):
+    """Flatten a transformer or Pipeline into its list of fitted steps."""
+    if isinstance(transformer, Pipeline):
+        return [step for _, step in transformer.steps if step not in (None, 'passthrough')]
+    return [transformer]
+
+
+def _compile_numeric(columns, steps, start):
+    fill = mean = scale = None
+    for step in steps:
+        if isinstance(step, SimpleImputer) and fill is None and mean is None and scale is None:
+            if step.add_indicator or not np.all(np.isfinite(step.statistics_)):
+                raise UnsupportedPreprocessorError("Unsupported SimpleImputer configuration")
+            fill = np.asarray(step.statistics_, dtype=float)
+        elif isinstance(step, StandardScaler) and mean is None and scale is None:
+            if step.with_mean:
+                mean = np.asarray(step.mean_, dtype=float)
+            if step.with_std:
+                scale = np.asarray(step.scale_, dtype=float)
+        else:
+            raise UnsupportedPreprocessorError(
+                f"Unsupported numeric step: {type(step).__name__}"
+            )
+    return _NumericBlock(columns, start, fill=fill, mean=mean, scale=scale)
+
+
+def _compile_categorical(columns, steps, start):
+    fills = [None] * len(columns)
+    if isinstance(steps[0], SimpleImputer):
+        imputer, steps = steps[0], steps[1:]
+        if imputer.add_indicator:
+            raise UnsupportedPreprocessorError("Unsupported SimpleImputer configuration")
+        fills = list(imputer.statistics_)
+    if len(steps) != 1 or not isinstance(steps[0], OneHotEncoder):
+        raise UnsupportedPreprocessorError("Categorical pipelines must end in a OneHotEncoder")
+
+    encoder = steps[0]
+    if getattr(encoder, '_infrequent_enabled', False):
+        raise UnsupportedPreprocessorError("Infrequent categories are not supported")
+
+    drop_idx = getattr(encoder, 'drop_idx_', None)
+    blocks = []
+    for i, (column, categories) in enumerate(zip(columns, encoder.categories_)):
+        dropped = drop_idx[i] if drop_idx is not None else None
+        index, offset = {}, 0
+        for j, category in enumerate(categories):
+            if dropped is not None and j == dropped:
+                index[category] = -1
+            else:
+                index[category] = offset
+                offset += 1
+        blocks.append(_OneHotBlock(
+            column, start, index, offset, encoder.handle_unknown, fill=fills[i]
+        ))
+        start += offset
+    return blocks
+
+
+class CompiledPreprocessor:
+    """
+    NumPy re-implementation of a fitted ColumnTransformer.
+
+    Build it once with ``from_column_transformer`` and call ``transform_columns``
+    with a mapping of column name -> 1-D array. Numeric columns must be float
+    arrays and categorical columns object arrays of the raw values.
+    """
+
+    def __init__(self, blocks, n_features_out, feature_names_out=None):
+        self.blocks = blocks
+        self.n_features_out = n_features_out
+        self.feature_names_out = feature_names_out
+
+    @classmethod
+    def from_column_transformer(cls, ct):
+        """Compile a fitted ColumnTransformer, or raise UnsupportedPreprocessorError."""
+        if not isinstance(ct, ColumnTransformer) or not hasattr(ct, 'transformers_'):
+            raise UnsupportedPreprocessorError("Expected a fitted ColumnTransformer")
+        if getattr(ct, 'sparse_output_', False):
+            raise UnsupportedPreprocessorError("Sparse ColumnTransformer output is not supported")
+        output_config = getattr(ct, '_sklearn_output_config', {}).get('transform', 'default')
+        if output_config != 'default':
+            raise UnsupportedPreprocessorError(f"Unsupported output container: {output_config}")
+
+        input_names = list(getattr(ct, 'feature_names_in_', []))
+        blocks, start = [], 0
+        for _, transformer, columns in ct.transformers_:
+            if transformer == 'drop':
+                continue
+            columns = _column_names(columns, input_names)
+            if not columns:
+                continue
+            if transformer == 'passthrough':
+                blocks.append(_NumericBlock(columns, start))
+                start += len(columns)
+                continue
+
+            steps = _steps(transformer)
+            if not steps:
+                raise UnsupportedPreprocessorError("Empty transformer pipeline")
+            if isinstance(steps[-1], OneHotEncoder):
+                new_blocks = _compile_categorical(columns, steps, start)
+                blocks.extend(new_blocks)
+                start = new_blocks[-1].stop if new_blocks else start
+            else:
+                block = _compile_numeric(columns, steps, start)
+                blocks.append(block)
+                start = block.stop
+
+        try:
+            feature_names_out = [str(name) for name in ct.get_feature_names_out()]
+        except Exception:
+            feature_names_out = None
+        if feature_names_out is not None and len(feature_names_out) != start:
+            raise UnsupportedPreprocessorError(
+                f"Compiled width {start} does not match preprocessor width {len(feature_names_out)}"
+            )
+        return cls(blocks, start, feature_names_out)
+
+    def transform_columns(self, cols):
+        """Encode a mapping of column name -> 1-D array into a float64 matrix."""
+        n_rows = len(next(iter(cols.values())))
+        out = np.empty((n_rows, self.n_features_out), dtype=np.float64)
+        for block in self.blocks:
+            block.write(cols, out)
+        return out
+
+    def known_categories(self) -> dict:
+        """First known category of each one-hot encoded column."""
+        return {
+            block.column: next(iter(block.index))
+            for block in self.blocks
+            if isinstance(block, _OneHotBlock) and block.index
+        }
+
+    def to_arrays(self):
+        """
+        Split into (arrays, spec): numeric parameters as NumPy arrays and a
+        JSON-serializable spec of the blocks and one-hot vocabularies.
+        """
+        arrays, blocks = {}, []
+        for i, block in enumerate(self.blocks):
+            if isinstance(block, _NumericBlock):
+                spec = {"kind": "numeric", "columns": block.columns, "start": block.start}
+                for name in ("fill", "mean", "scale"):
+                    value = getattr(block, name)
+                    if value is not None:
+                        spec[name] = f"block{i}_{name}"
+                        arrays[spec[name]] = value
+            else:
+                spec = {
+                    "kind": "onehot", "column": block.column, "start": block.start,
+                    "width": block.stop - block.start, "handle_unknown": block.handle_unknown,
+                    "fill": _to_json(block.fill),
+                    "index": [[_to_json(category), offset] for category, offset in block.index.items()],
+                }
+            blocks.append(spec)
+        spec = {
+            "n_features_out": self.n_features_out,
+            "feature_names_out": self.feature_names_out,
+            "blocks": blocks,
+        }
+        return arrays, spec
+
+    @classmethod
+    def from_arrays(cls, arrays, spec):
+        blocks = []
+        for block in spec["blocks"]:
+            if block["kind"] == "numeric":
+                params = {name: arrays[block[name]] for name in ("fill", "mean", "scale") if name in block}
+                blocks.append(_NumericBlock(block["columns"], block["start"], **params))
+            else:
+                index = {category: offset for category, offset in block["index"]}
+                blocks.append(_OneHotBlock(
+                    block["column"], block["start"], index, block["width"],
+                    block["handle_unknown"], fill=block["fill"],
+                ))
+        return cls(blocks, spec["n_features_out"], spec["feature_names_out"])
+
+    def get_feature_names_out(self):
+        if self.feature_names_out is None:
+            return np.array([f"Feature_{i}" for i in range(self.n_features_out)], dtype=object)
+        return np.asarray(self.feature_names_out, dtype=object)
+
+
+def _to_json(value):
+    """Convert NumPy scalars (e.g. category values) to plain Python for JSON."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _column_names(columns, input_names):
+    """Resolve a ColumnTransformer column spec to a list of column names."""
+    if isinstance(columns, str):
+        return [columns]
+    if isinstance(columns, slice):
+        return list(np.asarray(input_names, dtype=object)[columns])
+    columns = list(columns)
+    if all(isinstance(c, str) for c in columns):
+        return columns
+    if all(isinstance(c, (bool, np.bool_)) for c in columns) and input_names:
+        return [name for name, keep in zip(input_names, columns) if keep]
+    if all(isinstance(c, (int, np.integer)) for c in columns) and input_names:
+        return [input_names[c] for c in columns]
+    raise UnsupportedPreprocessorError(f"Unsupported column specification: {columns!r}")
@@ -0,0 +1,206 @@
+# fastapi_app/feedback.py
+"""
+Buffered local store for labeled feedback (actual sale prices).
+
+``POST /feedback`` adds a listing and its actual price to an in-memory buffer.
+A writer thread flushes the buffer to CSV when it holds ``max_rows`` rows or
+its oldest row has waited ``max_wait`` seconds, and on shutdown. The request
+thread never touches the disk.
+
+Every server process appends to its own file, ``feedback-<host>-<pid>.csv``
+in FEEDBACK_DIR, so pre-fork workers never interleave writes. A flush is a
+single ``write()`` of whole lines to an O_APPEND descriptor, so a reader sees
+complete rows only. The files use the final.csv columns, plus the time the
+feedback was received and the model version that was serving, so
+``src.data.ingest.read_listings`` reads them directly. The incremental update
+job (src/models/incremental_update.py) consumes them by byte offset.
+
+If a write fails (disk full, read-only volume), the rows stay buffered and
+the write is retried with exponential backoff, from ``FEEDBACK_RETRY_SECONDS``
+up to ``FEEDBACK_RETRY_MAX_SECONDS``. At most ``FEEDBACK_MAX_BACKLOG`` rows
+are kept meanwhile; beyond that the oldest are dropped and counted in stats.
+"""
+import csv
+import io
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+# FEEDBACK_DIR: directory of the feedback CSV files (shared with the update job)
+FEEDBACK_DIR = Path(os.getenv("FEEDBACK_DIR", str(BASE_DIR.parent.parent / "data" / "feedback")))
+# Flush the buffer at FEEDBACK_FLUSH_ROWS rows or after FEEDBACK_FLUSH_SECONDS
+FEEDBACK_FLUSH_ROWS = int(os.getenv("FEEDBACK_FLUSH_ROWS", "100"))
+FEEDBACK_FLUSH_SECONDS = float(os.getenv("FEEDBACK_FLUSH_SECONDS", "5"))
+# Rows kept in memory while writes fail; the oldest are dropped beyond this
+FEEDBACK_MAX_BACKLOG = int(os.getenv("FEEDBACK_MAX_BACKLOG", "10000"))
+# Backoff between retries of a failed write, doubled per failure up to the maximum
+FEEDBACK_RETRY_SECONDS = float(os.getenv("FEEDBACK_RETRY_SECONDS", "1"))
+FEEDBACK_RETRY_MAX_SECONDS = float(os.getenv("FEEDBACK_RETRY_MAX_SECONDS", "60"))
+
+FEEDBACK_COLUMNS = ["LB", "LT", "KM", "KT", "Kota/Kab", "Provinsi", "Type", "Price",
+                    "received_at", "model_version"]
+FILE_PREFIX = "feedback-"
+
+
+def _encode(rows: list) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerows([row.get(c) for c in FEEDBACK_COLUMNS] for row in rows)
+    return out.getvalue().encode("utf-8")
+
+
+class FeedbackBuffer:
+    """
+    Collect feedback rows in memory and append them to this process's CSV file.
+
+    Args:
+        directory: Directory of the feedback files
+        max_rows: Flush once this many rows are buffered
+        max_wait: Seconds a row may wait in the buffer before a flush
+        max_backlog: Rows kept while writes fail; the oldest are dropped beyond this
+        retry_wait: Seconds before the first retry of a failed write
+        retry_max_wait: Longest wait between retries
+    """
+
+    def __init__(self, directory=None, max_rows: int = None, max_wait: float = None, max_backlog: int = None,
+                 retry_wait: float = None, retry_max_wait: float = None):
+        self.directory = Path(directory or FEEDBACK_DIR)
+        self.max_rows = max(int(FEEDBACK_FLUSH_ROWS if max_rows is None else max_rows), 1)
+        self.max_wait = max(float(FEEDBACK_FLUSH_SECONDS if max_wait is None else max_wait), 0.0)
+        self.max_backlog = max(int(FEEDBACK_MAX_BACKLOG if max_backlog is None else max_backlog), self.max_rows)
+        self.retry_wait = max(float(FEEDBACK_RETRY_SECONDS if retry_wait is None else retry_wait), 0.0)
+        self.retry_max_wait = max(float(FEEDBACK_RETRY_MAX_SECONDS if retry_max_wait is None else retry_max_wait),
+                                  self.retry_wait)
+        self._backoff = self.retry_wait
+        self._retry_at = float("-inf")
+        self.path = self.directory / f"{FILE_PREFIX}{socket.gethostname()}-{os.getpid()}.csv"
+        self._rows = []
+        self._oldest = None
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self.received = 0
+        self.written = 0
+        self.flushes = 0
+        self.write_errors = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, row: dict, model_version: str = None) -> int:
+        """Buffer one labeled listing; returns the number of rows waiting to be written."""
+        row = dict(row, received_at=datetime.utcnow().isoformat() + "Z", model_version=model_version)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Feedback buffer is closed")
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append(row)
+            self.received += 1
+            self._trim()
+            pending = len(self._rows)
+            # Wake the writer to start the max_wait timer, or to flush a full buffer
+            if pending == 1 or pending >= self.max_rows:
+                self._cond.notify()
+        return pending
+
+    def flush(self) -> int:
+        """Write every buffered row now; returns the number of rows written."""
+        with self._cond:
+            rows, self._rows, self._oldest = self._rows, [], None
+        if not rows:
+            return 0
+        with self._write_lock:
+            try:
+                self._append(_encode(rows))
+            except OSError as e:
+                # Keep the rows for the next flush instead of losing them
+                self.write_errors += 1
+                with self._cond:
+                    self._rows[:0] = rows
+                    self._oldest = self._oldest or time.monotonic()
+                    self._trim()
+                    self._retry_at = time.monotonic() + self._backoff
+                    logger.error(f"Failed to write {len(rows)} feedback rows to {self.path}: {e}; "
+                                 f"retrying in {self._backoff:g}s, {self.dropped} rows dropped so far")
+                    self._backoff = min(self._backoff * 2, self.retry_max_wait)
+                return 0
+            self.written += len(rows)
+            self.flushes += 1
+            with self._cond:
+                self._backoff, self._retry_at = self.retry_wait, float("-inf")
+        logger.debug(f"Wrote {len(rows)} feedback rows to {self.path}")
+        return len(rows)
+
+    def _trim(self):
+        """Drop the oldest rows beyond max_backlog (caller holds _cond)."""
+        excess = len(self._rows) - self.max_backlog
+        if excess > 0:
+            del self._rows[:excess]
+            self.dropped += excess
+
+    def _append(self, data: bytes):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size == 0:
+                data = (",".join(FEEDBACK_COLUMNS) + "\n").encode("utf-8") + data
+            # One write of whole lines: readers never see a partial row
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._rows)
+        return {
+            "received": self.received,
+            "written": self.written,
+            "pending": pending,
+            "flushes": self.flushes,
+            "write_errors": self.write_errors,
+            "dropped": self.dropped,
+            "path": str(self.path),
+        }
+
+    def close(self, timeout: float = 5.0):
+        """Stop the writer thread and flush what is left."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self.flush()
+
+    def _seconds_to_flush(self):
+        """Seconds until the next flush is due, None if nothing is buffered (caller holds _cond)."""
+        if self._oldest is None:
+            return None
+        now = time.monotonic()
+        due = now if len(self._rows) >= self.max_rows else self._oldest + self.max_wait
+        # After a failed write, wait for the backoff even if the buffer is full
+        return max(due, self._retry_at) - now
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    remaining = self._seconds_to_flush()
+                    if remaining is None:
+                        self._cond.wait()
+                    elif remaining <= 0:
+                        break
+                    else:
+                        self._cond.wait(remaining)
+                if self._closed:
+                    return
+            self.flush()
@@ -1,14 +1,27 @@
 # fastapi_app/inference.py
 import os
+import hashlib
 import joblib
 from pathlib import Path
 from datetime import datetime
 import pandas as pd
 import numpy as np
 import sys
+import time
+import threading
 import logging
 
-from .schemas import OLXPredictionRequest, PredictionResponse
+from .schemas import (
+    OLXPredictionRequest, PredictionResponse, BatchPredictionItem, SweepResponse, INTEGER_SWEEP_FEATURES,
+)
+from .fast_preprocessor import CompiledPreprocessor, UnsupportedPreprocessorError
+from .tree_engine import FlatTreeEnsemble, UnsupportedModelError
+from .cache import PredictionCache
+from .model_profile import ModelProfile
+from . import mmap_bundle
+from .batching import MicroBatcher
+from .feedback import FeedbackBuffer
+from . import metrics
 
 # Configure logging
 logging.basicConfig(
@@ -23,6 +36,37 @@ DEFAULT_MODEL_PATH = Path("/models/modelbaru.pkl")
 DEFAULT_PREP_PATH = Path("/models/barupreprocessor.pkl")
 
 # Allow overriding via env vars
+# PREPROCESSOR_BACKEND: "compiled" (NumPy fast path, falls back to sklearn if the
+# fitted preprocessor cannot be compiled) or "sklearn" (ColumnTransformer.transform)
+PREPROCESSOR_BACKEND = os.getenv("PREPROCESSOR_BACKEND", "compiled").lower()
+# MODEL_BACKEND: "flat" (FlatTreeEnsemble for tree models, falls back to sklearn for
+# other models) or "sklearn" (model.predict). The flat engine wins on small batches;
+# batches larger than FLAT_MODEL_MAX_ROWS go to the model's own compiled predict.
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "flat").lower()
+FLAT_MODEL_MAX_ROWS = int(os.getenv("FLAT_MODEL_MAX_ROWS", "256"))
+# Prediction cache: number of entries (0 disables) and TTL in seconds (0 = no expiry)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "1024"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "0"))
+# /predict/sweep responses cached per (model version, base input, axes); same TTL
+SWEEP_CACHE_SIZE = int(os.getenv("SWEEP_CACHE_SIZE", "128"))
+# EAGER_LOAD: load and warm up the artifacts at startup instead of on the first request
+EAGER_LOAD = os.getenv("EAGER_LOAD", "true").lower() in ("1", "true", "yes")
+# MODEL_RELOAD_INTERVAL: seconds between checks of MODEL_PATH/PREPROCESSOR_PATH for
+# changes to hot reload (0 disables the watcher; /admin/reload still works)
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "30"))
+# Micro-batching of concurrent /predict calls: flush at MICROBATCH_MAX_SIZE rows or
+# after MICROBATCH_MAX_WAIT_MS, whichever comes first (off by default)
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "32"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2"))
+# /predict/stream: rows scored per vectorized pass and longest accepted NDJSON line
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", str(64 * 1024)))
+# ADMIN_TOKEN: if set, /admin/reload requires it in the X-Admin-Token header
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# MODEL_BUNDLE_DIR: load a memory-mapped inference bundle (see mmap_bundle.py) instead
+# of unpickling MODEL_PATH/PREPROCESSOR_PATH; the backend settings above do not apply
+MODEL_BUNDLE_DIR = os.getenv("MODEL_BUNDLE_DIR") or None
 MODEL_PATH = Path(os.getenv("MODEL_PATH", str(DEFAULT_MODEL_PATH)))
 PREPROCESSOR_PATH = Path(os.getenv("PREPROCESSOR_PATH", str(DEFAULT_PREP_PATH)))
 
@@ -53,75 +97,375 @@ MODEL_PATH, PREPROCESSOR_PATH = validate_env_vars()
 
 _model = None
 _preproc = None
+# Content hash of the loaded model/preprocessor files
+_model_version = None
+_prediction_cache = PredictionCache(maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+_sweep_cache = PredictionCache(maxsize=SWEEP_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
 
-def _ensure_loaded():
-    global _model, _preproc
-    if _model is None or _preproc is None:
-        logger.info("Loading model and preprocessor...")
-
-        # Some preprocessor objects may have been pickled when a helper
-        # function (_make_interactions) was defined in a training script
-        # run as __main__. During unpickling we must ensure that symbol
-        # exists on the same module. Provide a safe fallback here.
-        def _make_interactions(df):
-            try:
-                df = df.copy()
-                if "LB" in df.columns and "LT" in df.columns:
-                    df["LBxLT"] = df["LB"] * df["LT"]
-            except Exception:
-                pass
-            return df
-
-        # Inject into __main__ so pickle can find it if it was saved from a
-        # script executed as __main__ previously.
-        main_mod = sys.modules.get("__main__")
-        if main_mod is not None and not hasattr(main_mod, "_make_interactions"):
-            setattr(main_mod, "_make_interactions", _make_interactions)
-
-        # Provide helpful errors when model files are missing
-        if not PREPROCESSOR_PATH.exists():
-            error_msg = f"Preprocessor file not found: {PREPROCESSOR_PATH}"
-            logger.error(error_msg)
-            raise FileNotFoundError(error_msg)
-
-        if not MODEL_PATH.exists():
-            error_msg = f"Model file not found: {MODEL_PATH}"
-            logger.error(error_msg)
-            raise FileNotFoundError(error_msg)
+def _artifact_digest(*paths) -> str:
+    """Short content hash identifying a set of artifact files."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+def _compile_preprocessor(preproc):
+    """Compile the fitted preprocessor for the NumPy fast path, if enabled."""
+    if PREPROCESSOR_BACKEND != "compiled":
+        return None
+    try:
+        compiled = CompiledPreprocessor.from_column_transformer(preproc)
+        logger.info("Using compiled NumPy preprocessor")
+        return compiled
+    except UnsupportedPreprocessorError as e:
+        logger.warning(f"Preprocessor cannot be compiled ({e}); using sklearn transform")
+        return None
+
+def _flatten_model(model):
+    """Flatten a tree ensemble for the NumPy evaluator, if enabled."""
+    if MODEL_BACKEND != "flat":
+        return None
+    try:
+        flat = FlatTreeEnsemble.from_model(model)
+        logger.info(f"Using flat tree evaluator ({flat.n_trees} trees)")
+        return flat
+    except UnsupportedModelError as e:
+        logger.info(f"Model cannot be flattened ({e}); using model.predict")
+        return None
+
+class ModelState:
+    """
+    A model/preprocessor pair together with everything derived from it.
+
+    Requests take one snapshot of the active state and use it throughout, so a
+    hot reload never mixes artifacts within a request and in-flight requests
+    finish on the version they started with.
+    """
+
+    def __init__(self, model, preproc, version=None, compiled=None, flat=None, profile=None):
+        self.model = model
+        self.preproc = preproc
+        self.version = version
+        self.compiled = compiled
+        self.flat = flat
+        self._profile = profile
+        self.loaded_at = datetime.utcnow().isoformat() + "Z"
+
+    @classmethod
+    def prepare(cls, model, preproc, version=None):
+        """Build a state with its profile and the compiled preprocessor and flat model fast paths."""
+        return cls(model, preproc, version,
+                   compiled=_compile_preprocessor(preproc),
+                   flat=_flatten_model(model),
+                   profile=ModelProfile.from_artifacts(model, preproc, version))
+
+    @property
+    def profile(self) -> ModelProfile:
+        """Request-independent response data (importances, display name)."""
+        if self._profile is None:
+            self._profile = ModelProfile.from_artifacts(self.model, self.preproc, self.version)
+        return self._profile
 
+    def fast_model(self, n_rows: int):
+        """Return the flat evaluator for a batch of n_rows, or None."""
+        if self.flat is not None and n_rows <= FLAT_MODEL_MAX_ROWS:
+            return self.flat
+        return None
+
+# Active ModelState; _model/_preproc above always mirror it
+_state = None
+_swap_lock = threading.Lock()
+
+def _install(state: ModelState):
+    """Atomically make state the active model/preprocessor pair."""
+    global _state, _model, _preproc, _model_version
+    with _swap_lock:
+        _state = state
+        _model, _preproc = state.model, state.preproc
+        _model_version = state.version
+    # Drop the previous version's entries now rather than letting LRU churn them out
+    _prediction_cache.set_version(_cache_version(state))
+    _sweep_cache.set_version(_cache_version(state))
+
+def _active_state() -> ModelState:
+    """Consistent snapshot of the active model/preprocessor pair."""
+    with _swap_lock:
+        state, model, preproc = _state, _model, _preproc
+    if state is not None and state.model is model and state.preproc is preproc:
+        return state
+    # _model/_preproc were assigned directly (e.g. patched in tests): no fast paths
+    return ModelState(model, preproc)
+
+_load_lock = threading.Lock()
+# Set once artifacts are loaded and a warm-up inference has succeeded
+_ready = threading.Event()
+_load_error = None
+# Background load started by readiness() when EAGER_LOAD is off
+_background_load = None
+_background_load_lock = threading.Lock()
+
+def _load_artifacts(model_path=None, preprocessor_path=None):
+    """Unpickle the preprocessor and model from disk (default: MODEL_PATH and PREPROCESSOR_PATH)."""
+    model_path = Path(model_path or MODEL_PATH)
+    preprocessor_path = Path(preprocessor_path or PREPROCESSOR_PATH)
+    logger.info("Loading model and preprocessor...")
+
+    # Some preprocessor objects may have been pickled when a helper
+    # function (_make_interactions) was defined in a training script
+    # run as __main__. During unpickling we must ensure that symbol
+    # exists on the same module. Provide a safe fallback here.
+    def _make_interactions(df):
         try:
-            logger.info(f"Loading preprocessor from {PREPROCESSOR_PATH}")
-            _preproc = joblib.load(PREPROCESSOR_PATH)
-            logger.info("Preprocessor loaded successfully")
-        except Exception as e:
-            error_msg = f"Failed to load preprocessor from {PREPROCESSOR_PATH}: {e}"
-            logger.error(error_msg)
-            raise RuntimeError(error_msg)
+            df = df.copy()
+            if "LB" in df.columns and "LT" in df.columns:
+                df["LBxLT"] = df["LB"] * df["LT"]
+        except Exception:
+            pass
+        return df
+
+    # Inject into __main__ so pickle can find it if it was saved from a
+    # script executed as __main__ previously.
+    main_mod = sys.modules.get("__main__")
+    if main_mod is not None and not hasattr(main_mod, "_make_interactions"):
+        setattr(main_mod, "_make_interactions", _make_interactions)
+
+    # Provide helpful errors when model files are missing
+    if not preprocessor_path.exists():
+        error_msg = f"Preprocessor file not found: {preprocessor_path}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+
+    if not model_path.exists():
+        error_msg = f"Model file not found: {model_path}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+
+    try:
+        logger.info(f"Loading preprocessor from {preprocessor_path}")
+        preproc = joblib.load(preprocessor_path)
+        logger.info("Preprocessor loaded successfully")
+    except Exception as e:
+        error_msg = f"Failed to load preprocessor from {preprocessor_path}: {e}"
+        logger.error(error_msg)
+        raise RuntimeError(error_msg)
+
+    try:
+        logger.info(f"Loading model from {model_path}")
+        model = joblib.load(model_path)
+        logger.info("Model loaded successfully")
+    except Exception as e:
+        error_msg = f"Failed to load model from {model_path}: {e}"
+        logger.error(error_msg)
+        raise RuntimeError(error_msg)
+
+    return model, preproc
+
+def _ensure_loaded():
+    """
+    Load the model and preprocessor exactly once and warm them up.
+
+    Safe to call from many threads: the first caller loads while holding
+    _load_lock and the others wait for it instead of unpickling again.
+    """
+    if _model is not None and _preproc is not None:
+        return
+    with _load_lock:
+        if _model is not None and _preproc is not None:
+            return
+        state = _load_state()
+        logger.info(f"Model version: {state.version}")
+        _install(state)
+        _warm_up()
+
+def _artifact_paths() -> tuple:
+    """Files whose content defines the active artifacts."""
+    if MODEL_BUNDLE_DIR:
+        return (Path(MODEL_BUNDLE_DIR) / mmap_bundle.MANIFEST_NAME,)
+    return (MODEL_PATH, PREPROCESSOR_PATH)
+
+def _current_version() -> str:
+    """Version of the artifacts currently on disk."""
+    if MODEL_BUNDLE_DIR:
+        return mmap_bundle.read_manifest(MODEL_BUNDLE_DIR)["version"]
+    return _artifact_digest(MODEL_PATH, PREPROCESSOR_PATH)
+
+def _load_state() -> ModelState:
+    """Load the artifacts from disk into a ModelState (not yet installed)."""
+    if MODEL_BUNDLE_DIR:
+        logger.info(f"Loading inference bundle from {MODEL_BUNDLE_DIR}")
+        engine, compiled, profile, version = mmap_bundle.load_bundle(MODEL_BUNDLE_DIR)
+        logger.info(f"Inference bundle mapped ({engine.n_trees} trees, {engine.nbytes:,} bytes)")
+        return ModelState(engine, compiled, version, compiled=compiled, flat=engine, profile=profile)
+    model, preproc = _load_artifacts()
+    return ModelState.prepare(model, preproc, _artifact_digest(MODEL_PATH, PREPROCESSOR_PATH))
 
+def _known_categories(preproc) -> dict:
+    """First fitted category of each one-hot encoded column of the preprocessor."""
+    if isinstance(preproc, CompiledPreprocessor):
+        return preproc.known_categories()
+    known = {}
+    for _, transformer, columns in getattr(preproc, 'transformers_', []):
+        steps = getattr(transformer, 'steps', [(None, transformer)])
+        encoder = steps[-1][1]
+        if hasattr(encoder, 'categories_') and isinstance(columns, (list, tuple)):
+            for column, categories in zip(columns, encoder.categories_):
+                if len(categories):
+                    known[column] = categories[0]
+    return known
+
+def _smoke_test(state: ModelState):
+    """Run a throwaway inference on state; raises if the artifacts cannot predict."""
+    known = _known_categories(state.preproc)
+    row = {"LB": 120.0, "LT": 150.0, "KM": 2, "KT": 3}
+    row.update({c: known.get(c, "") for c in CATEGORICAL_COLS})
+    start_time = time.perf_counter()
+    _predict_rows([row], state)
+    _predict_rows([row] * 8, state)
+    _feature_importance(state)
+    logger.info(f"Smoke inference completed in {(time.perf_counter() - start_time) * 1000:.2f}ms")
+
+def _warm_up():
+    """Run a throwaway inference so the first real request does not pay for it."""
+    global _load_error
+    try:
+        _smoke_test(_active_state())
+        _load_error = None
+        _ready.set()
+    except Exception as e:
+        _load_error = f"Warm-up prediction failed: {e}"
+        logger.error(_load_error)
+
+def load_on_startup():
+    """Load and warm up the artifacts at service startup; failures are reported by readiness()."""
+    global _load_error
+    try:
+        _ensure_loaded()
+    except Exception as e:
+        _load_error = str(e)
+        logger.error(f"Model loading failed at startup: {e}")
+
+def readiness() -> dict:
+    """
+    Whether the artifacts are loaded and warmed up, for the /ready endpoint.
+
+    With EAGER_LOAD off, a probe of a process that is not ready starts loading
+    in the background (again after a failure), so readiness gating does not
+    wait for a first prediction that is never routed to the process.
+    """
+    global _background_load
+    if not EAGER_LOAD and not _ready.is_set():
+        with _background_load_lock:
+            if _background_load is None or not _background_load.is_alive():
+                _background_load = threading.Thread(target=load_on_startup, name="model-loader", daemon=True)
+                _background_load.start()
+    return {
+        "ready": _ready.is_set(),
+        "model_version": _model_version,
+        "error": _load_error,
+    }
+
+def reload_artifacts(force: bool = False) -> dict:
+    """
+    Load the artifacts from disk again and swap them in without downtime.
+
+    The new pair is loaded and smoke-tested while the current one keeps
+    serving; only if that succeeds is it installed atomically. Requests
+    already running finish on the previous state. A failed reload leaves the
+    current model in place.
+
+    Args:
+        force: Reload even if the files' content hash has not changed
+
+    Returns:
+        Dict describing the outcome, with the active model version
+    """
+    global _load_error
+    with _load_lock:
+        current = _active_state()
         try:
-            logger.info(f"Loading model from {MODEL_PATH}")
-            _model = joblib.load(MODEL_PATH)
-            logger.info("Model loaded successfully")
+            version = _current_version()
+            if version == current.version and not force:
+                return {"reloaded": False, "model_version": version, "reason": "Artifacts unchanged"}
+
+            state = _load_state()
+            if state.version != version:
+                raise RuntimeError("Artifacts changed while loading; retry the reload")
+            _smoke_test(state)
         except Exception as e:
-            error_msg = f"Failed to load model from {MODEL_PATH}: {e}"
-            logger.error(error_msg)
-            raise RuntimeError(error_msg)
+            logger.error(f"Model reload failed, keeping version {current.version}: {e}")
+            return {"reloaded": False, "model_version": current.version, "error": str(e)}
+
+        _install(state)
+        _load_error = None
+        _ready.set()
+        logger.info(f"Model reloaded: {current.version} -> {version}")
+        return {"reloaded": True, "model_version": version, "previous_version": current.version}
+
+def _artifact_signature():
+    """Cheap change detector for the artifact files (mtime and size)."""
+    try:
+        return tuple((st.st_mtime_ns, st.st_size) for st in (p.stat() for p in _artifact_paths()))
+    except OSError:
+        return None
+
+def start_artifact_watcher(interval: float = None):
+    """
+    Poll the artifact files and hot reload them when they change.
+
+    Returns:
+        threading.Event that stops the watcher when set, or None if disabled
+    """
+    interval = MODEL_RELOAD_INTERVAL if interval is None else interval
+    if interval <= 0:
+        return None
+    stop = threading.Event()
+
+    def watch():
+        last = _artifact_signature()
+        while not stop.wait(interval):
+            signature = _artifact_signature()
+            if signature is None or signature == last:
+                continue
+            last = signature
+            logger.info("Artifact change detected; reloading model")
+            reload_artifacts()
+
+    threading.Thread(target=watch, name="artifact-watcher", daemon=True).start()
+    logger.info(f"Watching {', '.join(map(str, _artifact_paths()))} every {interval:g}s")
+    return stop
 
 CSV_COLS = [
     "LB","LT","KM","KT","Kota/Kab","Provinsi","Type"
 ]
 
+NUMERIC_COLS = ["LB", "LT", "KM", "KT"]
+CATEGORICAL_COLS = ["Kota/Kab", "Provinsi", "Type"]
+
+def _derive_features(cols):
+    """
+    Compute the engineered features from the raw numeric columns.
+
+    ``cols`` may be a DataFrame or a mapping of column name -> numpy array, so the
+    pandas path and the compiled preprocessor path share one set of formulas.
+    """
+    lt = cols['LT']
+    return {
+        'LBxLT': cols['LB'] * lt,
+        'log_LB': np.log1p(cols['LB']),
+        'log_LT': np.log1p(lt),
+        'lb_x_km': cols['LB'] * cols['KM'],
+        'lt_x_kt': lt * cols['KT'],
+        # Handle division by zero for ratio
+        'ratio_lb_lt': cols['LB'] / np.where(lt == 0, np.nan, lt),
+    }
+
 def _engineer_features(df):
     """Create all required features for the model."""
     try:
-        # Basic features
-        df['LBxLT'] = df['LB'] * df['LT']
-        df['log_LB'] = np.log1p(df['LB'])
-        df['log_LT'] = np.log1p(df['LT'])
-        df['lb_x_km'] = df['LB'] * df['KM']
-        df['lt_x_kt'] = df['LT'] * df['KT']
-        # Handle division by zero for ratio
-        df['ratio_lb_lt'] = df['LB'] / df['LT'].replace(0, np.nan)
+        for name, values in _derive_features(df).items():
+            df[name] = values
 
         # Keep original features needed by preprocessor
         required_cols = [
@@ -133,6 +477,48 @@ def _engineer_features(df):
     except Exception as e:
         raise ValueError(f"Error engineering features: {str(e)}")
 
+def _engineer_columns(rows: list) -> dict:
+    """Build engineered feature columns as numpy arrays, without a DataFrame."""
+    try:
+        cols = {c: np.array([r[c] for r in rows], dtype=np.float64) for c in NUMERIC_COLS}
+        cols.update({c: np.array([r[c] for r in rows], dtype=object) for c in CATEGORICAL_COLS})
+        cols.update(_derive_features(cols))
+        return cols
+    except Exception as e:
+        raise ValueError(f"Error engineering features: {str(e)}")
+
+def _version_label(state: ModelState) -> str:
+    """model_version label value for metrics."""
+    return state.version or "unknown"
+
+def _cache_version(state: ModelState):
+    """Identify a model state; any model or preprocessor swap changes it."""
+    return (state.version, id(state.model), id(state.preproc))
+
+def _cache_key(row: dict) -> tuple:
+    """Canonical cache key: only the fields that reach the model, numerics as floats."""
+    return tuple(
+        float(row[c]) if c in NUMERIC_COLS else row[c]
+        for c in CSV_COLS
+    )
+
+def _from_cache(response: PredictionResponse, start_time: float) -> PredictionResponse:
+    return response.copy(update={
+        "cached": True,
+        "prediction_time": datetime.utcnow().isoformat() + "Z",
+        "prediction_time_ms": (time.perf_counter() - start_time) * 1000,
+    })
+
+def model_info() -> dict:
+    """Profile of the active model, for the /model/info endpoint."""
+    _ensure_loaded()
+    state = _active_state()
+    return dict(state.profile.to_dict(), loaded_at=state.loaded_at)
+
+def prediction_cache_stats() -> dict:
+    """Hit/miss/eviction counters of the prediction cache (and, under "sweep", of the sweep cache)."""
+    return dict(_prediction_cache.stats(), model_version=_active_state().version, sweep=_sweep_cache.stats())
+
 def _to_row(req: OLXPredictionRequest) -> dict:
     """Convert request to initial dataframe row."""
     try:
@@ -142,10 +528,333 @@ def _to_row(req: OLXPredictionRequest) -> dict:
     except Exception as e:
         raise ValueError(f"Error converting request to row: {str(e)}")
 
+DEFAULT_CONFIDENCE = 0.85  # Default value for regression models
+
+
+def _predict_rows(rows: list, state: ModelState = None) -> tuple:
+    """
+    Run feature engineering, the preprocessor and the model once over many rows.
+
+    Args:
+        rows: Raw rows as produced by _to_row
+        state: Model state to use; defaults to a snapshot of the active one
+
+    Returns:
+        Tuple of (prices, confidence_scores) as 1-D numpy arrays, one entry per row
+    """
+    state = state or _active_state()
+    version = _version_label(state)
+    t0 = time.perf_counter()
+    if state.compiled is not None:
+        cols = _engineer_columns(rows)
+        t1 = time.perf_counter()
+        X = state.compiled.transform_columns(cols)
+    else:
+        df = pd.DataFrame(rows, columns=CSV_COLS)
+        df = _engineer_features(df)
+        logger.debug(f"Engineered features: {list(df.columns)}")
+        t1 = time.perf_counter()
+        X = state.preproc.transform(df)
+    t2 = time.perf_counter()
+    logger.debug(f"Transformed features shape: {X.shape}")
+
+    prices, confidences = _predict_matrix(X, state)
+    t3 = time.perf_counter()
+    metrics.STAGE_SECONDS.observe(t1 - t0, stage="engineer_features", model_version=version)
+    metrics.STAGE_SECONDS.observe(t2 - t1, stage="transform", model_version=version)
+    metrics.STAGE_SECONDS.observe(t3 - t2, stage="predict", model_version=version)
+    metrics.BATCH_ITEMS.observe(len(rows), model_version=version)
+    return prices, confidences
+
+
+def _predict_matrix(X, state: ModelState) -> tuple:
+    """Run the model on a transformed feature matrix; returns (prices, confidences)."""
+    # Ensure predictions are non-negative
+    model = state.fast_model(len(X)) or state.model
+    prices = np.maximum(np.asarray(model.predict(X), dtype=float).reshape(-1), 0.0)
+
+    # Get confidence score (using predict_proba if available, else use a heuristic)
+    confidences = np.full(len(prices), DEFAULT_CONFIDENCE)
+    if hasattr(state.model, 'predict_proba'):
+        try:
+            proba = np.asarray(state.model.predict_proba(X), dtype=float)
+            confidences = proba.reshape(len(prices), -1).max(axis=1)
+            logger.debug(f"Confidence scores from predict_proba: {confidences[:5]}")
+        except Exception as e:
+            logger.warning(f"Could not get confidence from predict_proba: {e}")
+
+    return prices, confidences
+
+
+def predict_frame(df: pd.DataFrame, state: ModelState = None) -> tuple:
+    """
+    Score a DataFrame holding the raw CSV_COLS (numeric columns already numeric).
+
+    Same feature engineering, preprocessor and model as the API, without
+    building request objects; used for offline batch scoring.
+
+    Returns:
+        Tuple of (prices, confidence_scores) as 1-D numpy arrays, one entry per row
+    """
+    state = state or _active_state()
+    if state.compiled is not None:
+        cols = {c: df[c].to_numpy(dtype=np.float64) for c in NUMERIC_COLS}
+        cols.update({c: df[c].to_numpy(dtype=object) for c in CATEGORICAL_COLS})
+        try:
+            cols.update(_derive_features(cols))
+        except Exception as e:
+            raise ValueError(f"Error engineering features: {str(e)}")
+        X = state.compiled.transform_columns(cols)
+    else:
+        X = state.preproc.transform(_engineer_features(df[CSV_COLS].copy()))
+    return _predict_matrix(X, state)
+
+
+def score_isolating(indices, score) -> tuple:
+    """
+    Score many items in one vectorized call, isolating failing items by bisection.
+
+    If ``score`` raises (e.g. one listing has a category the preprocessor has
+    never seen), the items are split in halves and each half is retried, so a
+    few bad items among n cost O(log n) calls each instead of n single-item calls.
+
+    Args:
+        indices: Item indices to score
+        score: Callable scoring a list of indices, returning one result per index
+
+    Returns:
+        Tuple of (results, errors): dicts from index to its result, and to the
+        exception raised for it alone
+    """
+    results, errors = {}, {}
+    pending = [list(indices)]
+    while pending:
+        group = pending.pop()
+        try:
+            results.update(zip(group, score(group)))
+        except Exception as e:
+            if len(group) == 1:
+                errors[group[0]] = e
+            else:
+                middle = len(group) // 2
+                pending += [group[middle:], group[:middle]]
+    return results, errors
+
+
+def _sweep_values(axis) -> np.ndarray:
+    """Evenly spaced values of a sweep axis; whole numbers for count features."""
+    values = np.linspace(axis.start, axis.stop, axis.num)
+    if axis.feature in INTEGER_SWEEP_FEATURES:
+        values = np.unique(np.round(values))
+    return values
+
+
+def predict_sweep(req) -> SweepResponse:
+    """
+    Predict prices over a grid of one or two inputs around a base listing.
+
+    The whole grid goes through feature engineering, the preprocessor and the
+    model in one vectorized pass (predict_frame). Responses are cached per
+    model version, base input and axes.
+
+    Args:
+        req: Validated SweepRequest
+
+    Returns:
+        SweepResponse with the predictions in row-major order over the axes
+
+    Raises:
+        ValueError: If the base listing cannot be scored
+    """
+    start_time = time.perf_counter()
+    _ensure_loaded()
+    state = _active_state()
+    version = _version_label(state)
+    row = _to_row(req.base)
+    axes = [(axis.feature, _sweep_values(axis)) for axis in req.axes]
+
+    cache_key = (_cache_key(row), tuple((feature, values.tobytes()) for feature, values in axes))
+    cache_version = _cache_version(state)
+    cached = _sweep_cache.get(cache_key, cache_version)
+    if cached is not None:
+        _record_request("sweep", version, "cache_hit", start_time)
+        return cached.copy(update={
+            "cached": True,
+            "prediction_time_ms": (time.perf_counter() - start_time) * 1000,
+        })
+
+    grids = np.meshgrid(*[values for _, values in axes], indexing="ij")
+    n_points = grids[0].size
+    frame = pd.DataFrame({
+        c: np.full(n_points, row[c], dtype=np.float64 if c in NUMERIC_COLS else object) for c in CSV_COLS
+    })
+    for (feature, _), grid in zip(axes, grids):
+        frame[feature] = grid.ravel()
+    try:
+        prices, _ = predict_frame(frame, state)
+    except Exception as e:
+        metrics.ERRORS.inc(endpoint="sweep", stage="score", model_version=version)
+        _record_request("sweep", version, "error", start_time)
+        raise ValueError(f"Error during sweep prediction: {e}")
+    metrics.BATCH_ITEMS.observe(n_points, model_version=version)
+
+    response = SweepResponse(
+        axes=[{"feature": feature, "values": values.tolist()} for feature, values in axes],
+        predictions=np.round(prices, 2).tolist(),
+        shape=[len(values) for _, values in axes],
+        model_name=_model_name(state),
+        model_version=state.version,
+        prediction_time_ms=(time.perf_counter() - start_time) * 1000,
+    )
+    _sweep_cache.put(cache_key, response, cache_version)
+    _record_request("sweep", version, "success", start_time)
+    return response
+
+
+def _predict_microbatch(items: list) -> list:
+    """
+    MicroBatcher handler: score (row, state) pairs with one pass per model state.
+
+    Returns one (price, confidence) tuple per item, or the exception for items
+    that could not be scored, so a bad row only fails its own caller.
+    """
+    results = [None] * len(items)
+    groups = {}
+    for i, (row, state) in enumerate(items):
+        groups.setdefault(id(state), (state, []))[1].append(i)
+
+    for state, indices in groups.values():
+        # Failing rows are isolated by bisection, so the shared worker stays vectorized
+        scores, failures = score_isolating(
+            indices, lambda group: list(zip(*_predict_rows([items[i][0] for i in group], state))))
+        for i, result in {**scores, **failures}.items():
+            results[i] = result
+    return results
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def _get_batcher():
+    """The shared MicroBatcher, started on first use; None if micro-batching is off."""
+    global _batcher
+    if not MICROBATCH_ENABLED:
+        return None
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(
+                    _predict_microbatch,
+                    max_size=MICROBATCH_MAX_SIZE,
+                    max_wait=MICROBATCH_MAX_WAIT_MS / 1000,
+                )
+                logger.info(
+                    f"Micro-batching enabled (max {MICROBATCH_MAX_SIZE} rows, "
+                    f"{MICROBATCH_MAX_WAIT_MS:g}ms max wait)"
+                )
+    return _batcher
+
+def stop_batcher():
+    """Flush and stop the micro-batching worker, if running."""
+    global _batcher
+    with _batcher_lock:
+        batcher, _batcher = _batcher, None
+    if batcher is not None:
+        batcher.close()
+
+def batching_stats() -> dict:
+    """Per-batch size and latency statistics of the micro-batching dispatcher."""
+    batcher = _batcher
+    if batcher is None:
+        return {"enabled": MICROBATCH_ENABLED}
+    return dict(batcher.stats(), enabled=True)
+
+_feedback = None
+_feedback_lock = threading.Lock()
+
+def _get_feedback_buffer() -> FeedbackBuffer:
+    """The shared feedback buffer, started on first use."""
+    global _feedback
+    if _feedback is None:
+        with _feedback_lock:
+            if _feedback is None:
+                _feedback = FeedbackBuffer()
+                logger.info(f"Buffering feedback to {_feedback.path}")
+    return _feedback
+
+def stop_feedback():
+    """Write buffered feedback to disk and stop the feedback writer, if running."""
+    global _feedback
+    with _feedback_lock:
+        buffer, _feedback = _feedback, None
+    if buffer is not None:
+        buffer.close()
+
+def feedback_stats() -> dict:
+    """Received/written/pending counters of the feedback buffer."""
+    buffer = _feedback
+    if buffer is None:
+        return {"received": 0, "written": 0, "pending": 0}
+    return buffer.stats()
+
+def record_feedback(req) -> dict:
+    """
+    Buffer a listing with its actual sale price for the incremental update job.
+
+    Args:
+        req: Validated FeedbackRequest
+
+    Returns:
+        Dict with the number of rows pending in the buffer and the serving model version
+    """
+    row = _to_row(req)
+    # Whole rupiah without separators, so read_listings' price parser reads it back
+    row["Price"] = f"{req.price:.0f}"
+    version = _model_version
+    pending = _get_feedback_buffer().add(row, model_version=version)
+    return {"pending": pending, "model_version": version}
+
+def _score_row(row: dict, state: ModelState) -> tuple:
+    """Score one row, through the micro-batcher when it is enabled."""
+    batcher = _get_batcher()
+    if batcher is None:
+        prices, confidences = _predict_rows([row], state)
+        return prices[0], confidences[0]
+    return batcher((row, state))
+
+
+def _feature_importance(state: ModelState) -> dict:
+    """Return the top features by model importance, or an empty dict."""
+    return state.profile.feature_importance()
+
+
+def _model_name(state: ModelState) -> str:
+    return state.profile.display_name
+
+
+def _build_response(price: float, confidence_score: float, feature_importance: dict,
+                    model_name: str, prediction_time_ms: float,
+                    model_version: str = None) -> PredictionResponse:
+    price = float(price)
+    # Calculate price range (±10% by default)
+    price_range = (price * 0.9, price * 1.1)
+    return PredictionResponse(
+        prediction=round(price, 2),
+        prediction_time=datetime.utcnow().isoformat() + "Z",
+        confidence_score=float(confidence_score),
+        model_name=model_name,
+        price_range=price_range,
+        feature_importance=feature_importance,
+        prediction_time_ms=prediction_time_ms,
+        model_version=model_version
+    )
+
+
 def predict_price(req: OLXPredictionRequest) -> PredictionResponse:
     """
     Generate house price prediction from input features.
 
+    Each stage is timed into the metrics.STAGE_SECONDS histogram.
+
     Args:
         req: Validated request containing house features
 
@@ -156,103 +865,162 @@ def predict_price(req: OLXPredictionRequest) -> PredictionResponse:
         ValueError: If feature engineering fails
         RuntimeError: If model prediction fails
     """
+    start_counter = time.perf_counter()
+    stage, version = "load", "unknown"
     try:
-        logger.info(f"Processing prediction request for property in {req.kota_kab}, {req.provinsi}")
-        start_time = datetime.now()
+        logger.debug(f"Processing prediction request for property in {req.kota_kab}, {req.provinsi}")
         _ensure_loaded()
+        # One snapshot for the whole request, so a concurrent reload cannot mix versions
+        state = _active_state()
+        version = _version_label(state)
 
-        # Create initial dataframe
+        # Create initial row
+        stage = "to_row"
+        t0 = time.perf_counter()
         row_dict = _to_row(req)
-        df = pd.DataFrame([row_dict])
+        t1 = time.perf_counter()
+        metrics.STAGE_SECONDS.observe(t1 - t0, stage="to_row", model_version=version)
 
-        # Engineer features
-        df = _engineer_features(df)
-        logger.debug(f"Engineered features: {list(df.columns)}")
+        stage = "cache"
+        cache_key, cache_version = _cache_key(row_dict), _cache_version(state)
+        cached = _prediction_cache.get(cache_key, cache_version)
+        if cached is not None:
+            logger.debug("Prediction served from cache")
+            response = _from_cache(cached, start_counter)
+            _record_request("predict", version, "cache_hit", start_counter)
+            return response
 
         # Generate prediction
         try:
-            X = _preproc.transform(df)
-            logger.debug(f"Transformed features shape: {X.shape}")
-
-            # Get base prediction
-            y = _model.predict(X)
-            price = float(y[0])
-
-            # Ensure prediction is non-negative
-            price = max(0, price)
-            logger.info(f"Predicted price: Rp {price:,.0f}")
-
-            # Get confidence score (using predict_proba if available, else use a heuristic)
-            confidence_score = 0.85  # Default value for regression models
-            if hasattr(_model, 'predict_proba'):
-                try:
-                    proba = _model.predict_proba(X)
-                    confidence_score = float(proba.max())
-                    logger.debug(f"Confidence score from predict_proba: {confidence_score}")
-                except Exception as e:
-                    logger.warning(f"Could not get confidence from predict_proba: {e}")
-                    confidence_score = 0.85
-
-            # Calculate price range (±10% by default)
-            price_range = (price * 0.9, price * 1.1)
-
-            # Get feature importance
-            feature_importance = {}
-            if hasattr(_model, 'feature_importances_'):
-                importances = _model.feature_importances_
-                # Get feature names from preprocessor if available
-                try:
-                    if hasattr(_preproc, 'get_feature_names_out'):
-                        feature_names = _preproc.get_feature_names_out()
-                        logger.debug(f"Feature names from preprocessor: {feature_names[:5]}...")
-                    else:
-                        # Fallback to generic names
-                        feature_names = [f"Feature_{i}" for i in range(len(importances))]
-                except Exception as e:
-                    logger.warning(f"Could not get feature names: {e}")
-                    # Fallback to predefined names
-                    feature_names = [
-                        "Square Footage (LB)",
-                        "Location",
-                        "Number of Bathrooms",
-                        "Land Area (LT)",
-                        "Number of Bedrooms"
-                    ]
-
-                importance_dict = dict(zip(feature_names, importances))
-                # Sort by importance and get top 3
-                feature_importance = dict(sorted(
-                    importance_dict.items(),
-                    key=lambda x: x[1],
-                    reverse=True
-                )[:3])
-                logger.debug(f"Top 3 important features: {list(feature_importance.keys())}")
+            stage = "score"
+            price, confidence = _score_row(row_dict, state)
+            price = float(price)
+            logger.debug(f"Predicted price: Rp {price:,.0f}")
+
+            stage = "feature_importance"
+            t0 = time.perf_counter()
+            feature_importance = _feature_importance(state)
+            t1 = time.perf_counter()
+            metrics.STAGE_SECONDS.observe(t1 - t0, stage="feature_importance", model_version=version)
 
             # Calculate prediction time
-            end_time = datetime.now()
-            prediction_time_ms = (end_time - start_time).total_seconds() * 1000
-            logger.info(f"Prediction completed in {prediction_time_ms:.2f}ms")
-
-            # Get model name
-            model_name = type(_model).__name__
-            if model_name == 'XGBRegressor':
-                model_name = 'XGBoost'
-
-            return PredictionResponse(
-                prediction=round(price, 2),
-                prediction_time=datetime.utcnow().isoformat() + "Z",
-                confidence_score=confidence_score,
-                model_name=model_name,
-                price_range=price_range,
-                feature_importance=feature_importance,
-                prediction_time_ms=prediction_time_ms
+            prediction_time_ms = (t1 - start_counter) * 1000
+            logger.debug(f"Prediction completed in {prediction_time_ms:.2f}ms")
+
+            stage = "serialize"
+            response = _build_response(
+                price, confidence, feature_importance, _model_name(state),
+                prediction_time_ms, state.version
             )
+            metrics.STAGE_SECONDS.observe(
+                time.perf_counter() - t1, stage="serialize", model_version=version
+            )
+            _prediction_cache.put(cache_key, response, cache_version)
+            _record_request("predict", version, "success", start_counter)
+            return response
         except Exception as e:
             logger.error(f"Error during prediction: {str(e)}")
             raise RuntimeError(f"Error during prediction: {str(e)}")
 
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
+        metrics.ERRORS.inc(endpoint="predict", stage=stage, model_version=version)
+        _record_request("predict", version, "error", start_counter)
         raise ValueError(f"Error processing request: {str(e)}")
-    # This code block appears to be duplicate/unused code that was accidentally left in the file
-    # It should be removed as it's redundant with the main predict_price function above
+
+
+def _record_request(endpoint: str, version: str, outcome: str, start_counter: float):
+    """Count a finished request and record its end-to-end latency."""
+    metrics.REQUEST_SECONDS.observe(
+        time.perf_counter() - start_counter, endpoint=endpoint, model_version=version
+    )
+    metrics.REQUESTS.inc(endpoint=endpoint, model_version=version, outcome=outcome)
+
+
+def predict_batch(reqs: list) -> list:
+    """
+    Generate predictions for many requests with a single vectorized pass.
+
+    Feature engineering, the preprocessor and the model run once over the whole
+    batch. If the vectorized pass fails (e.g. one listing has a category the
+    preprocessor has never seen), the failing items are isolated by bisection
+    (see score_isolating), so a bad item only fails itself.
+
+    Args:
+        reqs: Validated requests containing house features
+
+    Returns:
+        List of BatchPredictionItem, in the same order as ``reqs``
+
+    Raises:
+        FileNotFoundError/RuntimeError: If the model artifacts cannot be loaded
+    """
+    start_time = time.perf_counter()
+    _ensure_loaded()
+    logger.debug(f"Processing batch prediction request with {len(reqs)} items")
+
+    errors = {}
+    rows = {}
+    hits = {}
+    state = _active_state()
+    version = _version_label(state)
+    cache_version = _cache_version(state)
+    t0 = time.perf_counter()
+    for i, req in enumerate(reqs):
+        try:
+            row = _to_row(req)
+        except ValueError as e:
+            errors[i] = str(e)
+            continue
+        cached = _prediction_cache.get(_cache_key(row), cache_version)
+        if cached is not None:
+            hits[i] = cached
+        else:
+            rows[i] = row
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - t0, stage="to_row", model_version=version)
+
+    scores = {}
+    if rows:
+        scores, failures = score_isolating(
+            list(rows), lambda indices: list(zip(*_predict_rows([rows[i] for i in indices], state))))
+        if failures:
+            logger.warning(f"Batch prediction failed for {len(failures)} of {len(rows)} items")
+        for i, item_error in failures.items():
+            errors[i] = f"Error during prediction: {item_error}"
+
+    t0 = time.perf_counter()
+    feature_importance = _feature_importance(state) if scores else {}
+    model_name = _model_name(state)
+    t1 = time.perf_counter()
+    metrics.STAGE_SECONDS.observe(t1 - t0, stage="feature_importance", model_version=version)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    # Each item reports its amortized share of the batch time
+    per_item_ms = elapsed_ms / max(len(reqs), 1)
+
+    results = []
+    for i in range(len(reqs)):
+        if i in hits:
+            response = _from_cache(hits[i], start_time)
+            results.append(BatchPredictionItem(index=i, prediction=response))
+        elif i in scores:
+            price, confidence = scores[i]
+            response = _build_response(
+                price, confidence, feature_importance, model_name, per_item_ms, state.version
+            )
+            _prediction_cache.put(_cache_key(rows[i]), response, cache_version)
+            results.append(BatchPredictionItem(index=i, prediction=response))
+        else:
+            results.append(BatchPredictionItem(index=i, error=errors[i]))
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - t1, stage="serialize", model_version=version)
+
+    for outcome, count in (("success", len(scores)), ("cache_hit", len(hits)), ("error", len(errors))):
+        if count:
+            metrics.REQUESTS.inc(count, endpoint="batch", model_version=version, outcome=outcome)
+    metrics.REQUEST_SECONDS.observe(
+        time.perf_counter() - start_time, endpoint="batch", model_version=version
+    )
+    logger.debug(
+        f"Batch prediction completed in {elapsed_ms:.2f}ms "
+        f"({len(scores)} scored, {len(hits)} from cache, {len(errors)} failed)"
+    )
+    return results
@@ -0,0 +1,223 @@
+# fastapi_app/logging_config.py
+"""
+Non-blocking structured logging for the API.
+
+Request threads only put log records on an in-memory queue; one background
+listener thread formats them (as JSON lines by default) and writes them to
+stdout, so formatting and a slow or blocked stdout never stall a request. When
+the queue is full a record is dropped instead of waiting.
+
+Volume is cut before anything is queued:
+
+- per-request logs (the ``<package>.payload`` logger with request payloads and
+  results, and uvicorn's access log) are sampled at LOG_PAYLOAD_SAMPLE_RATE;
+- WARNING and above are rate limited per call site, LOG_ERROR_RATE records per
+  second with bursts of LOG_ERROR_BURST; the next record let through carries
+  the number suppressed in its ``suppressed`` field.
+
+Counts of emitted, sampled out, rate limited and dropped records and the bytes
+written are exported at /metrics.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from . import metrics
+
+# LOG_FORMAT: "json" (one JSON object per line) or "text"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Fraction of per-request payload/access logs kept (1 keeps all, 0 none)
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+# Warnings/errors per second per call site, and burst size (LOG_ERROR_RATE=0 disables the limit)
+LOG_ERROR_RATE = float(os.getenv("LOG_ERROR_RATE", "1"))
+LOG_ERROR_BURST = int(os.getenv("LOG_ERROR_BURST", "10"))
+# Records buffered for the writer thread before new ones are dropped
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Per-request payload logs go here so they can be sampled separately
+payload_logger = logging.getLogger(f"{__package__}.payload")
+
+# LogRecord attributes; anything else on a record came from extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _json_default(value):
+    if hasattr(value, "dict"):
+        # pydantic models, e.g. request payloads passed lazily through extra=
+        return value.dict()
+    return str(value)
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message, pid and extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=_json_default)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random fraction ``rate`` of records."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or random.random() < self.rate:
+            return True
+        metrics.LOG_RECORDS.inc(level=record.levelname, outcome="sampled_out")
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site for records at or above ``level``.
+
+    Lower-level records always pass. Each call site (logger, file, line) may
+    log ``burst`` records at once and ``rate`` per second after that.
+    """
+
+    def __init__(self, rate: float, burst: int, level: int = logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.level = level
+        self._lock = threading.Lock()
+        # call site -> [tokens, last refill, suppressed since last emitted]
+        self._buckets = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level or self.rate <= 0:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                metrics.LOG_RECORDS.inc(level=record.levelname, outcome="rate_limited")
+                return False
+            bucket[0] = tokens - 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener and never waits on a full queue."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments now (they may change later); the listener does the rest
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.LOG_RECORDS.inc(level=record.levelname, outcome="dropped")
+
+
+class _CountingStreamHandler(logging.StreamHandler):
+    """StreamHandler that counts what it writes in the log volume metrics."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        metrics.LOG_RECORDS.inc(level=record.levelname, outcome="emitted")
+        metrics.LOG_BYTES.inc(len(text.encode("utf-8", "replace")) + len(self.terminator))
+        return text
+
+
+def build_pipeline(stream, fmt: str = None, queue_size: int = None,
+                   error_rate: float = None, error_burst: int = None) -> tuple:
+    """
+    Create the queue handler and its (not yet started) listener writing to stream.
+
+    Returns:
+        Tuple of (QueueHandler to attach to loggers, QueueListener)
+    """
+    fmt = LOG_FORMAT if fmt is None else fmt
+    output = _CountingStreamHandler(stream)
+    output.setFormatter(JSONFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    handler = _NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE if queue_size is None else queue_size))
+    handler.addFilter(RateLimitFilter(
+        LOG_ERROR_RATE if error_rate is None else error_rate,
+        LOG_ERROR_BURST if error_burst is None else error_burst,
+    ))
+    return handler, QueueListener(handler.queue, output, respect_handler_level=True)
+
+
+_handler = None
+_listener = None
+
+
+def configure_logging():
+    """
+    Route all logging through the queue to a background writer on stdout.
+
+    Replaces the root logger's handlers; safe to call more than once. The
+    writer thread is restarted in forked children (see server.py), since
+    threads do not survive fork.
+    """
+    global _handler, _listener
+    if _listener is not None:
+        return
+    _handler, _listener = build_pipeline(sys.stdout)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    for logger in (payload_logger, logging.getLogger("uvicorn.access")):
+        logger.addFilter(SamplingFilter(LOG_PAYLOAD_SAMPLE_RATE))
+    _listener.start()
+    atexit.register(stop_logging)
+    os.register_at_fork(after_in_child=_restart_in_child)
+
+
+def stop_logging():
+    """Write out everything still queued and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_in_child():
+    global _listener
+    if _handler is None or _listener is None:
+        return
+    # The parent's queue may have been locked mid-operation at fork time
+    _handler.queue = queue.Queue(_handler.queue.maxsize)
+    _listener = QueueListener(_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
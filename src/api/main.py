@@ -1,14 +1,18 @@
 # fastapi_app/main.py
 import logging
-from fastapi import FastAPI, HTTPException, Request
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from .logging_config import configure_logging, payload_logger
+
+# Configure logging: queued, structured, sampled (see logging_config.py)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # ---- Fallback utk pipeline lama yang expect fastapi_app.main._make_interactions
@@ -27,13 +31,58 @@ def _make_interactions(df):
     return df
 # ---- end fallback
 
-from .schemas import OLXPredictionRequest, PredictionResponse
-from .inference import predict_price
+import time
+
+from .schemas import (
+    OLXPredictionRequest,
+    PredictionResponse,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+    FeedbackRequest,
+    FeedbackResponse,
+    SweepRequest,
+    SweepResponse,
+)
+from . import inference, metrics
+from . import memory
+from .memory import memory_report
+from .streaming import NDJSONStreamingResponse, score_ndjson
+from .inference import (
+    predict_price,
+    predict_batch,
+    predict_sweep,
+    prediction_cache_stats,
+    batching_stats,
+    feedback_stats,
+    record_feedback,
+    model_info,
+    readiness,
+    reload_artifacts,
+    start_artifact_watcher,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start loading the model in the background so /health answers immediately,
+    and watch the artifact files for changes to hot reload.
+    """
+    if inference.EAGER_LOAD:
+        threading.Thread(
+            target=inference.load_on_startup, name="model-loader", daemon=True
+        ).start()
+    stop_watcher = start_artifact_watcher()
+    yield
+    if stop_watcher is not None:
+        stop_watcher.set()
+    inference.stop_batcher()
+    inference.stop_feedback()
 
 app = FastAPI(
     title="House Price Prediction API",
     version="1.0.0",
-    description="API for predicting house prices using machine learning models"
+    description="API for predicting house prices using machine learning models",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -56,9 +105,95 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.get("/health")
 def health():
     """Health check endpoint."""
-    logger.info("Health check requested")
+    logger.debug("Health check requested")
     return {"status": "ok", "service": "house-price-prediction-api"}
 
+@app.get("/ready")
+def ready():
+    """
+    Readiness check endpoint.
+
+    Returns 503 until the model and preprocessor are loaded and a warm-up
+    inference has succeeded, so traffic is only routed to warm instances.
+    """
+    status = readiness()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+@app.get("/model/info")
+def model_information():
+    """
+    Static profile of the active model: version, display name, feature names,
+    sorted feature importances and importances aggregated by input column.
+    """
+    try:
+        return model_info()
+    except (FileNotFoundError, RuntimeError, ValueError) as e:
+        logger.error(f"Model info unavailable: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """
+    Per-stage latency histograms and request/error counters in Prometheus text format.
+
+    Under the pre-fork server these are summed over all workers.
+    """
+    if metrics.SHARED_DIR is not None and memory.MASTER_PID is not None:
+        content = metrics.render_shared(memory.child_pids(memory.MASTER_PID))
+    else:
+        content = metrics.REGISTRY.render()
+    return Response(content=content, media_type=metrics.CONTENT_TYPE)
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Prediction cache counters (hits, misses, evictions, size) of the server process in ``pid``."""
+    return dict(prediction_cache_stats(), pid=os.getpid())
+
+@app.get("/batching/stats")
+def micro_batching_stats():
+    """Micro-batching dispatcher statistics of the server process in ``pid``."""
+    return dict(batching_stats(), pid=os.getpid())
+
+@app.get("/feedback/stats")
+def feedback_buffer_stats():
+    """Feedback buffer counters (received, written, pending) of the server process in ``pid``."""
+    return dict(feedback_stats(), pid=os.getpid())
+
+@app.get("/memory")
+def memory_usage():
+    """
+    RSS/PSS per server process, in bytes.
+
+    Under the pre-fork server (server.py) this lists the master and every
+    worker; summed PSS far below summed RSS means the model is shared.
+    """
+    return memory_report()
+
+@app.post("/admin/reload")
+def admin_reload(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """
+    Hot reload the model and preprocessor from disk without downtime.
+
+    The new artifacts are loaded and smoke-tested while the current ones keep
+    serving, then swapped in atomically. On failure the current model stays
+    active and the error is returned with status 500.
+
+    Under the pre-fork server the master is then told to reload every other
+    worker too (``workers_notified``); they reload if the artifacts changed.
+    """
+    if inference.ADMIN_TOKEN and x_admin_token != inference.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    logger.info(f"Model reload requested (force={force})")
+    status = reload_artifacts(force=force)
+    if "error" in status:
+        return JSONResponse(status_code=500, content=status)
+    # Imported here: server.py imports this module
+    from .server import notify_reload
+    status["workers_notified"] = notify_reload()
+    return status
+
 @app.post("/predict", response_model=PredictionResponse)
 def predict(req: OLXPredictionRequest):
     """
@@ -68,9 +203,16 @@ def predict(req: OLXPredictionRequest):
     along with confidence metrics and feature importance.
     """
     try:
-        logger.info(f"Prediction request received: {req.dict()}")
         result = predict_price(req)
-        logger.info(f"Prediction completed successfully: Rp {result.prediction:,.0f}")
+        # The payload is serialized by the log writer thread, and only if sampled
+        payload_logger.info("Prediction completed", extra={
+            "endpoint": "predict",
+            "payload": req,
+            "prediction": result.prediction,
+            "model_version": result.model_version,
+            "cached": result.cached,
+            "prediction_time_ms": result.prediction_time_ms,
+        })
         return result
     except ValueError as e:
         logger.warning(f"Validation error: {e}")
@@ -82,6 +224,109 @@ def predict(req: OLXPredictionRequest):
         logger.error(f"Unexpected error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/feedback", response_model=FeedbackResponse, status_code=202)
+def feedback(req: FeedbackRequest):
+    """
+    Record the actual sale price of a listing.
+
+    The observation is buffered and appended to a local CSV store in the
+    background; the incremental update job (src/models/incremental_update.py)
+    continues training the model on it and promotes the result only if it
+    beats the current model on a holdout.
+    """
+    try:
+        status = record_feedback(req)
+    except (ValueError, RuntimeError) as e:
+        logger.error(f"Feedback not recorded: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    payload_logger.info("Feedback received", extra={
+        "endpoint": "feedback",
+        "payload": req,
+        "model_version": status["model_version"],
+    })
+    return FeedbackResponse(accepted=True, **status)
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+def predict_batch_endpoint(req: BatchPredictionRequest):
+    """
+    Predict house prices for many listings in one call.
+
+    Feature engineering, the preprocessor and the model run once over the whole
+    batch. Items that cannot be scored are reported individually in ``results``
+    and do not fail the rest of the batch.
+    """
+    try:
+        start_time = time.perf_counter()
+        results = predict_batch(req.items)
+        n_success = sum(1 for r in results if r.prediction is not None)
+        payload_logger.info("Batch prediction completed", extra={
+            "endpoint": "batch",
+            "n_items": len(req.items),
+            "n_failed": len(results) - n_success,
+        })
+        return BatchPredictionResponse(
+            results=results,
+            n_success=n_success,
+            n_failed=len(results) - n_success,
+            prediction_time_ms=(time.perf_counter() - start_time) * 1000
+        )
+    except (FileNotFoundError, RuntimeError) as e:
+        logger.error(f"Runtime error during batch prediction: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/predict/sweep", response_model=SweepResponse)
+def predict_sweep_endpoint(req: SweepRequest):
+    """
+    What-if sensitivity sweep: predicted prices while one or two inputs vary.
+
+    Every other input stays at the ``base`` listing's value. One axis gives a
+    price curve, two give a surface (``predictions`` in row-major order,
+    ``shape`` values per axis). The grid is scored in a single vectorized
+    pass and cached per model version, base input and axes.
+    """
+    try:
+        result = predict_sweep(req)
+        payload_logger.info("Sweep prediction completed", extra={
+            "endpoint": "sweep",
+            "payload": req,
+            "n_points": len(result.predictions),
+            "model_version": result.model_version,
+            "cached": result.cached,
+        })
+        return result
+    except ValueError as e:
+        logger.warning(f"Sweep prediction failed: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except (FileNotFoundError, RuntimeError) as e:
+        logger.error(f"Runtime error during sweep prediction: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request):
+    """
+    Score an NDJSON upload and stream NDJSON predictions back.
+
+    Each request line is one listing (the /predict body). Rows are scored in
+    chunks of STREAM_CHUNK_SIZE through the batch path, so memory stays flat
+    however large the upload is. Every input line produces one output record
+    with its ``line`` number and either a ``prediction`` or an inline ``error``.
+    """
+    try:
+        await run_in_threadpool(inference._ensure_loaded)
+    except Exception as e:
+        logger.error(f"Model unavailable for streaming prediction: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    payload_logger.info("Streaming prediction started", extra={"endpoint": "stream"})
+    return NDJSONStreamingResponse(score_ndjson(
+        request.stream(),
+        predict_batch,
+        chunk_size=inference.STREAM_CHUNK_SIZE,
+        max_line_bytes=inference.STREAM_MAX_LINE_BYTES,
+    ))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("fastapi_app.main:app", host="0.0.0.0", port=8000, reload=False)
@@ -0,0 +1,103 @@
+# fastapi_app/memory.py
+"""
+Per-process memory accounting from /proc (Linux).
+
+RSS counts every resident page a process maps, including pages shared with
+other processes, so summing RSS over pre-forked workers counts the shared
+model once per worker. PSS (proportional set size) divides each shared page
+among the processes mapping it: summed over the master and its workers it is
+their real combined footprint, and a worker PSS well below its RSS shows the
+model pages are shared copy-on-write rather than duplicated.
+"""
+import os
+from pathlib import Path
+
+# Set in pre-forked workers (see server.py) to the pid of the process that forked them
+MASTER_PID = None
+
+_SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+
+def _parse_kb_fields(text: str, fields: dict) -> dict:
+    """Parse "Name:   123 kB" lines of a /proc file into bytes, keyed by fields[Name]."""
+    values = {}
+    for line in text.splitlines():
+        name, _, rest = line.partition(":")
+        if name in fields and rest.split():
+            values[fields[name]] = int(rest.split()[0]) * 1024
+    return values
+
+
+def process_memory(pid: int = None) -> dict:
+    """
+    Memory breakdown of a process in bytes.
+
+    Reads /proc/<pid>/smaps_rollup (Linux 4.14+). Where that is unavailable
+    only RSS is known, from /proc/<pid>/status, and the other fields are None.
+    """
+    pid = os.getpid() if pid is None else pid
+    memory = {"pid": pid, **{key: None for key in _SMAPS_FIELDS.values()}}
+    try:
+        memory.update(_parse_kb_fields(Path(f"/proc/{pid}/smaps_rollup").read_text(), _SMAPS_FIELDS))
+        return memory
+    except OSError:
+        pass
+    try:
+        memory.update(_parse_kb_fields(Path(f"/proc/{pid}/status").read_text(), {"VmRSS": "rss"}))
+    except OSError:
+        pass
+    return memory
+
+
+def child_pids(pid: int) -> list:
+    """Pids of the direct children of a process."""
+    try:
+        return sorted(int(p) for p in Path(f"/proc/{pid}/task/{pid}/children").read_text().split())
+    except OSError:
+        pass
+    # Kernels without CONFIG_PROC_CHILDREN: match the parent pid in every /proc/<pid>/stat
+    children = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # Fields after the parenthesized command name: state, ppid, ...
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(stat.parent.name))
+    return sorted(children)
+
+
+def memory_report() -> dict:
+    """
+    RSS/PSS of this server's processes, for the /memory endpoint.
+
+    Under the pre-fork server this covers the master and all of its workers;
+    otherwise it covers this process only. Totals are summed over every
+    process listed.
+    """
+    if MASTER_PID is not None:
+        master = process_memory(MASTER_PID)
+        workers = [process_memory(pid) for pid in child_pids(MASTER_PID)]
+    else:
+        master, workers = None, [process_memory()]
+    processes = workers + ([master] if master is not None else [])
+
+    def total(key):
+        values = [p[key] for p in processes]
+        return None if any(v is None for v in values) else sum(values)
+
+    return {
+        "pid": os.getpid(),
+        "master": master,
+        "workers": workers,
+        "total_rss": total("rss"),
+        "total_pss": total("pss"),
+    }
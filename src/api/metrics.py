@@ -0,0 +1,275 @@
+# fastapi_app/metrics.py
+"""
+Minimal Prometheus metrics: labelled counters and histograms rendered in the
+text exposition format served at /metrics.
+
+Recording is a dict lookup, a bisect and a few additions under a lock, so it
+is cheap enough to wrap every stage of every request.
+
+Under the pre-fork server (server.py) each worker counts only the requests it
+handled. Workers publish their series to ``SHARED_DIR`` every few seconds, and
+/metrics renders the sum over all live workers, so a scrape sees the whole
+server whichever worker answers it.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Set by the pre-fork server to the directory its workers publish their series to
+SHARED_DIR = None
+
+# Seconds; tuned for stages that take tens of microseconds to a few seconds
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+        if registry is not None:
+            registry.register(self)
+
+    def _labels(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> list:
+        """The series as JSON-serializable [label values, state] pairs."""
+        with self._lock:
+            return [[list(key), json.loads(json.dumps(state))] for key, state in self._series.items()]
+
+    def render(self, others=()) -> list:
+        """Text exposition lines, with the series of ``others`` (snapshots) added in."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = dict(self._series)
+            for snapshot in others:
+                for key, state in snapshot:
+                    key = tuple(key)
+                    series[key] = self._merge(series[key], state) if key in series else state
+            lines.extend(self._render_series(sorted(series.items())))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._labels(labels), 0)
+
+    @staticmethod
+    def _merge(a, b):
+        return a + b
+
+    def _render_series(self, series):
+        for key, value in series:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS,
+                 registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._labels(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._series.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, with a final +Inf slot; sum; count
+                state = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._series.get(self._labels(labels))
+            return state[2] if state else 0
+
+    @staticmethod
+    def _merge(a, b):
+        return [[x + y for x, y in zip(a[0], b[0])], a[1] + b[1], a[2] + b[2]]
+
+    def _render_series(self, series):
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Duplicate metric name: {metric.name}")
+            self._metrics.append(metric)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics)
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def render(self, snapshots=()) -> str:
+        """Render every metric, summed with the given Registry.snapshot() results."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render([s.get(metric.name, ()) for s in snapshots]))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _shared_path(pid: int) -> Path:
+    return Path(SHARED_DIR) / f"{pid}.json"
+
+
+def publish(registry: Registry = REGISTRY):
+    """Write this process's series to SHARED_DIR for the other workers' /metrics."""
+    path = _shared_path(os.getpid())
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(registry.snapshot()))
+    os.replace(tmp, path)
+
+
+def start_publisher(interval: float, registry: Registry = REGISTRY) -> threading.Thread:
+    """Publish this process's series every ``interval`` seconds from a daemon thread."""
+    def run():
+        while True:
+            try:
+                publish(registry)
+            except OSError as e:
+                logger.warning(f"Could not publish metrics to {SHARED_DIR}: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="metrics-publisher", daemon=True)
+    thread.start()
+    return thread
+
+
+def render_shared(pids, registry: Registry = REGISTRY) -> str:
+    """
+    Render this process's series summed with those last published by ``pids``.
+
+    Other workers' series are at most one publish interval old. A worker that
+    died no longer counts, which Prometheus treats as a counter reset.
+    """
+    snapshots = []
+    for pid in pids:
+        if pid == os.getpid():
+            continue
+        try:
+            snapshots.append(json.loads(_shared_path(pid).read_text()))
+        except (OSError, ValueError):
+            # Not published yet, or the worker just exited
+            continue
+    return registry.render(snapshots)
+
+STAGE_SECONDS = Histogram(
+    "house_price_stage_seconds",
+    "Time spent in each stage of a prediction request.",
+    ("stage", "model_version"),
+    registry=REGISTRY,
+)
+REQUEST_SECONDS = Histogram(
+    "house_price_request_seconds",
+    "End-to-end prediction time per request.",
+    ("endpoint", "model_version"),
+    registry=REGISTRY,
+)
+REQUESTS = Counter(
+    "house_price_requests_total",
+    "Prediction requests handled, by outcome.",
+    ("endpoint", "model_version", "outcome"),
+    registry=REGISTRY,
+)
+ERRORS = Counter(
+    "house_price_request_errors_total",
+    "Prediction errors by the stage that raised them.",
+    ("endpoint", "stage", "model_version"),
+    registry=REGISTRY,
+)
+BATCH_ITEMS = Histogram(
+    "house_price_batch_items",
+    "Number of rows scored per vectorized predict call.",
+    ("model_version",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 1024, 4096, 10000),
+    registry=REGISTRY,
+)
+LOG_RECORDS = Counter(
+    "house_price_log_records_total",
+    "Log records by level and fate: emitted, sampled_out, rate_limited or dropped (queue full).",
+    ("level", "outcome"),
+    registry=REGISTRY,
+)
+LOG_BYTES = Counter(
+    "house_price_log_bytes_total",
+    "Bytes of log output written.",
+    registry=REGISTRY,
+)
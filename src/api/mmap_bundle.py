@@ -0,0 +1,173 @@
+# fastapi_app/mmap_bundle.py
+"""
+Memory-mappable inference bundle.
+
+A bundle stores the fitted preprocessor (as a CompiledPreprocessor) and tree
+model (as a FlatTreeEnsemble) as raw ``.npy`` buffers plus a small JSON
+manifest, so the API can load it with ``np.load(mmap_mode='r')``: startup does
+not unpickle anything, and every worker process maps the same pages from the
+OS page cache instead of holding a private copy.
+
+Layout::
+
+    <bundle_dir>/manifest.json          points at the current version
+    <bundle_dir>/<version>/*.npy        one file per array
+
+Each export writes its arrays to a new ``<version>`` directory and only then
+replaces ``manifest.json`` atomically, so processes that still map an older
+version are never affected by a re-export (overwriting a mapped file in place
+would crash them). The previous version is kept; older ones are removed.
+
+Export from existing pickles with::
+
+    python -m src.api.mmap_bundle --model models/modelbaru.pkl \\
+        --preprocessor models/barupreprocessor.pkl --out models/bundle
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .fast_preprocessor import CompiledPreprocessor
+from .model_profile import ModelProfile
+from .tree_engine import FlatTreeEnsemble
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+
+def export_bundle(model, preproc, bundle_dir, keep: int = 2) -> str:
+    """
+    Write an inference bundle for a fitted model and preprocessor.
+
+    Args:
+        model: Fitted tree model supported by FlatTreeEnsemble
+        preproc: Fitted ColumnTransformer supported by CompiledPreprocessor
+        bundle_dir: Bundle directory (created if missing)
+        keep: Number of array versions to keep, including the new one
+
+    Returns:
+        Version of the written bundle (content hash of its arrays and spec)
+
+    Raises:
+        UnsupportedModelError / UnsupportedPreprocessorError: If the artifacts
+            cannot be flattened or compiled
+    """
+    engine = FlatTreeEnsemble.from_model(model)
+    compiled = CompiledPreprocessor.from_column_transformer(preproc)
+    profile = ModelProfile.from_artifacts(model, preproc)
+
+    model_arrays, model_meta = engine.to_arrays()
+    prep_arrays, prep_spec = compiled.to_arrays()
+    arrays = {f"model_{k}": v for k, v in model_arrays.items()}
+    arrays.update({f"preprocessor_{k}": v for k, v in prep_arrays.items()})
+
+    digest = hashlib.sha256()
+    spec = {"model": model_meta, "preprocessor": prep_spec, "profile": profile.to_dict()}
+    digest.update(json.dumps(spec, sort_keys=True, default=str).encode())
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(name.encode())
+        digest.update(array.dtype.str.encode())
+        digest.update(array.tobytes())
+    version = digest.hexdigest()[:12]
+
+    bundle_dir = Path(bundle_dir)
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    version_dir = bundle_dir / version
+    if not version_dir.exists():
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=bundle_dir))
+        for name, array in arrays.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+        os.replace(staging, version_dir)
+
+    spec["profile"]["model_version"] = version
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "arrays_dir": version,
+        "arrays": sorted(arrays),
+        "model_class": type(model).__name__,
+        "n_trees": engine.n_trees,
+        "n_nodes": engine.n_nodes,
+        **spec,
+    }
+    fd, tmp_path = tempfile.mkstemp(prefix=".manifest-", dir=bundle_dir)
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    os.replace(tmp_path, bundle_dir / MANIFEST_NAME)
+
+    _prune(bundle_dir, version, keep)
+    return version
+
+
+def _prune(bundle_dir: Path, current: str, keep: int):
+    """Remove all but the newest ``keep`` array versions (never the current one)."""
+    versions = sorted(
+        (p for p in bundle_dir.iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime, reverse=True,
+    )
+    kept = 1
+    for path in versions:
+        if path.name == current:
+            continue
+        if kept < keep:
+            kept += 1
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def read_manifest(bundle_dir) -> dict:
+    with open(Path(bundle_dir) / MANIFEST_NAME) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format: {manifest.get('format_version')}")
+    return manifest
+
+
+def load_bundle(bundle_dir, mmap_mode: str = "r"):
+    """
+    Load an inference bundle.
+
+    Returns:
+        Tuple of (FlatTreeEnsemble, CompiledPreprocessor, ModelProfile, version)
+    """
+    manifest = read_manifest(bundle_dir)
+    arrays_dir = Path(bundle_dir) / manifest["arrays_dir"]
+    arrays = {
+        name: np.load(arrays_dir / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+        for name in manifest["arrays"]
+    }
+
+    def prefixed(prefix):
+        return {k[len(prefix):]: v for k, v in arrays.items() if k.startswith(prefix)}
+
+    engine = FlatTreeEnsemble.from_arrays(prefixed("model_"), manifest["model"])
+    compiled = CompiledPreprocessor.from_arrays(prefixed("preprocessor_"), manifest["preprocessor"])
+    version = manifest["version"]
+    profile = ModelProfile.from_dict(manifest["profile"], version=version)
+    return engine, compiled, profile, version
+
+
+def main(argv=None):
+    from . import inference
+
+    parser = argparse.ArgumentParser(description="Export a memory-mappable inference bundle.")
+    parser.add_argument("--model", required=True, help="Path to the fitted model .pkl")
+    parser.add_argument("--preprocessor", required=True, help="Path to the fitted preprocessor .pkl")
+    parser.add_argument("--out", required=True, help="Bundle directory")
+    args = parser.parse_args(argv)
+
+    # Legacy pickles may need inference's unpickling workarounds; the bundle does not
+    model, preproc = inference._load_artifacts(args.model, args.preprocessor)
+    version = export_bundle(model, preproc, args.out)
+    print(f"Exported inference bundle {version} to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# fastapi_app/model_profile.py
+"""
+Static, per-model response data computed once when artifacts are loaded.
+
+Feature names, the sorted importance table, importances aggregated back to
+the original input columns and the display name do not depend on the
+request, so ``ModelProfile`` builds them at load time and predictions only
+read them.
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Used when the preprocessor cannot report its output feature names
+FALLBACK_FEATURE_NAMES = (
+    "Square Footage (LB)",
+    "Location",
+    "Number of Bathrooms",
+    "Land Area (LT)",
+    "Number of Bedrooms",
+)
+
+DISPLAY_NAMES = {
+    "XGBRegressor": "XGBoost",
+}
+
+
+def _feature_names(preproc, n_features: int) -> list:
+    try:
+        if hasattr(preproc, 'get_feature_names_out'):
+            return [str(name) for name in preproc.get_feature_names_out()]
+        # Fallback to generic names
+        return [f"Feature_{i}" for i in range(n_features)]
+    except Exception as e:
+        logger.warning(f"Could not get feature names: {e}")
+        return list(FALLBACK_FEATURE_NAMES)
+
+
+def _source_column(feature: str, columns: list) -> str:
+    """
+    Map an output feature name back to the input column it was derived from.
+
+    ColumnTransformer names are "<transformer>__<feature>" and one-hot
+    features are "<column>_<category>", so the longest input column that the
+    name equals or starts with (followed by "_") is its source.
+    """
+    name = feature.split("__", 1)[1] if "__" in feature else feature
+    best = None
+    for column in columns:
+        if name == column or name.startswith(column + "_"):
+            if best is None or len(column) > len(best):
+                best = column
+    return best or name
+
+
+class ModelProfile:
+    """
+    Immutable summary of a model/preprocessor pair.
+
+    Attributes:
+        version: Content hash of the artifacts, or None
+        model_class: Class name of the model
+        display_name: Model name reported in responses
+        feature_names: Output feature names of the preprocessor
+        importances: (feature, importance) pairs, most important first
+        column_importances: (input column, summed importance) pairs, most important first
+        top_features: Top features by importance as returned in responses
+    """
+
+    __slots__ = (
+        "version", "model_class", "display_name", "feature_names",
+        "importances", "column_importances", "top_features",
+    )
+
+    def __init__(self, version, model_class, display_name, feature_names,
+                 importances, column_importances, top_n):
+        set_ = object.__setattr__
+        set_(self, "version", version)
+        set_(self, "model_class", model_class)
+        set_(self, "display_name", display_name)
+        set_(self, "feature_names", tuple(feature_names))
+        set_(self, "importances", tuple(importances))
+        set_(self, "column_importances", tuple(column_importances))
+        set_(self, "top_features", tuple(self.importances[:top_n]))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ModelProfile is immutable")
+
+    @classmethod
+    def from_artifacts(cls, model, preproc, version=None, top_n: int = 3):
+        """Build the profile of a fitted model and preprocessor."""
+        model_class = type(model).__name__
+        display_name = DISPLAY_NAMES.get(model_class, model_class)
+
+        try:
+            importances = np.asarray(model.feature_importances_, dtype=float).reshape(-1)
+        except Exception as e:
+            if hasattr(model, 'feature_importances_'):
+                logger.warning(f"Could not read feature importances: {e}")
+            n_features = getattr(model, 'n_features_in_', 0)
+            return cls(version, model_class, display_name,
+                       _feature_names(preproc, n_features), (), (), top_n)
+
+        feature_names = _feature_names(preproc, len(importances))
+        # Stable sort keeps feature order among ties
+        pairs = dict(zip(feature_names, (float(v) for v in importances)))
+        ranked = sorted(pairs.items(), key=lambda x: x[1], reverse=True)
+
+        columns = [str(c) for c in getattr(preproc, 'feature_names_in_', [])]
+        by_column = {}
+        for feature, importance in pairs.items():
+            column = _source_column(feature, columns)
+            by_column[column] = by_column.get(column, 0.0) + importance
+        column_ranked = sorted(by_column.items(), key=lambda x: x[1], reverse=True)
+
+        return cls(version, model_class, display_name, feature_names, ranked, column_ranked, top_n)
+
+    @classmethod
+    def from_dict(cls, data: dict, version=None, top_n: int = 3):
+        """Rebuild a profile saved with ``to_dict`` (e.g. in an inference bundle manifest)."""
+        model_class = data["model_class"]
+        return cls(
+            version if version is not None else data.get("model_version"),
+            model_class,
+            data.get("model_name") or DISPLAY_NAMES.get(model_class, model_class),
+            data["feature_names"],
+            list(data["feature_importance"].items()),
+            list(data["column_importance"].items()),
+            top_n,
+        )
+
+    def feature_importance(self) -> dict:
+        """Top features for a PredictionResponse."""
+        return dict(self.top_features)
+
+    def to_dict(self) -> dict:
+        return {
+            "model_version": self.version,
+            "model_name": self.display_name,
+            "model_class": self.model_class,
+            "n_features": len(self.feature_names),
+            "feature_names": list(self.feature_names),
+            "feature_importance": dict(self.importances),
+            "column_importance": dict(self.column_importances),
+            "top_features": dict(self.top_features),
+        }
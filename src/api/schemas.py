@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, root_validator, validator
+from typing import Literal, Optional
 
 
 class OLXPredictionRequest(BaseModel):
@@ -103,6 +103,14 @@ class PredictionResponse(BaseModel):
         ...,
         description="Time taken to make prediction in milliseconds"
     )
+    cached: bool = Field(
+        False,
+        description="Whether the prediction was served from the prediction cache"
+    )
+    model_version: Optional[str] = Field(
+        None,
+        description="Content hash of the model/preprocessor pair that made the prediction"
+    )
     
     class Config:
         schema_extra = {
@@ -117,6 +125,183 @@ class PredictionResponse(BaseModel):
                     "Location": 0.27,
                     "Number of Bathrooms": 0.15
                 },
-                "prediction_time_ms": 120.5
+                "prediction_time_ms": 120.5,
+                "cached": False,
+                "model_version": "3f2a9c1b7d04"
             }
         }
+
+
+class FeedbackRequest(OLXPredictionRequest):
+    """A listing together with the price it actually sold for."""
+    price: float = Field(
+        ...,
+        alias="Price",
+        gt=0,
+        description="Actual sale price, in the same currency as training data"
+    )
+
+
+class FeedbackResponse(BaseModel):
+    """Response model for a feedback submission."""
+    accepted: bool = Field(
+        ...,
+        description="Whether the observation was buffered for the incremental update job"
+    )
+    pending: int = Field(
+        ...,
+        description="Observations buffered in this server process and not yet written"
+    )
+    model_version: Optional[str] = Field(
+        None,
+        description="Version of the model serving when the feedback was received"
+    )
+
+
+MAX_BATCH_ITEMS = 10000
+
+
+class BatchPredictionRequest(BaseModel):
+    """Request model for scoring many listings in a single call."""
+    items: list[OLXPredictionRequest] = Field(
+        ...,
+        min_items=1,
+        max_items=MAX_BATCH_ITEMS,
+        description="Listings to score, in order"
+    )
+
+
+class BatchPredictionItem(BaseModel):
+    """Prediction result for a single item of a batch request."""
+    index: int = Field(
+        ...,
+        description="Position of the item in the request"
+    )
+    prediction: Optional[PredictionResponse] = Field(
+        None,
+        description="Prediction details, if the item was scored successfully"
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Error message, if the item could not be scored"
+    )
+
+
+class BatchPredictionResponse(BaseModel):
+    """Response model for batch house price prediction."""
+    results: list[BatchPredictionItem] = Field(
+        ...,
+        description="One result per requested item, in request order"
+    )
+    n_success: int = Field(
+        ...,
+        description="Number of items scored successfully"
+    )
+    n_failed: int = Field(
+        ...,
+        description="Number of items that could not be scored"
+    )
+    prediction_time_ms: float = Field(
+        ...,
+        description="Time taken to score the whole batch in milliseconds"
+    )
+
+
+MAX_SWEEP_POINTS = 10000
+# Count features (KM, KT) are swept over whole numbers only
+INTEGER_SWEEP_FEATURES = ("KM", "KT")
+
+
+class SweepAxis(BaseModel):
+    """One numeric input to vary over an evenly spaced range."""
+    feature: Literal["LB", "LT", "KM", "KT"] = Field(
+        ...,
+        description="Input to vary"
+    )
+    start: float = Field(
+        ...,
+        ge=0,
+        description="First value of the range"
+    )
+    stop: float = Field(
+        ...,
+        ge=0,
+        description="Last value of the range (inclusive)"
+    )
+    num: int = Field(
+        50,
+        ge=2,
+        le=1000,
+        description="Number of points; KM/KT ranges give at most one point per whole number"
+    )
+
+    @root_validator(skip_on_failure=True)
+    def check_range(cls, values):
+        if values["stop"] < values["start"]:
+            raise ValueError("stop must not be less than start")
+        if values["feature"] in ("LB", "LT") and values["start"] <= 0:
+            raise ValueError(f"{values['feature']} must be greater than 0")
+        return values
+
+
+class SweepRequest(BaseModel):
+    """A base listing and one or two inputs to vary around it."""
+    base: OLXPredictionRequest = Field(
+        ...,
+        description="Listing whose other inputs stay fixed"
+    )
+    axes: list[SweepAxis] = Field(
+        ...,
+        min_items=1,
+        max_items=2,
+        description="Inputs to vary: one for a price curve, two for a price surface"
+    )
+
+    @validator("axes")
+    def check_axes(cls, axes):
+        if len({axis.feature for axis in axes}) != len(axes):
+            raise ValueError("each feature can only be swept once")
+        n_points = 1
+        for axis in axes:
+            n_points *= axis.num
+        if n_points > MAX_SWEEP_POINTS:
+            raise ValueError(f"sweep has {n_points} points, more than {MAX_SWEEP_POINTS}")
+        return axes
+
+
+class SweepAxisValues(BaseModel):
+    """The values an input took in a sweep."""
+    feature: str = Field(..., description="Swept input")
+    values: list[float] = Field(..., description="Values in sweep order")
+
+
+class SweepResponse(BaseModel):
+    """Predicted prices over a grid of inputs."""
+    axes: list[SweepAxisValues] = Field(
+        ...,
+        description="Swept inputs and their values, in request order"
+    )
+    predictions: list[float] = Field(
+        ...,
+        description="Predicted prices in row-major order: the last axis varies fastest"
+    )
+    shape: list[int] = Field(
+        ...,
+        description="Number of values per axis; predictions has their product entries"
+    )
+    model_name: str = Field(
+        ...,
+        description="Name of the model used for prediction"
+    )
+    model_version: Optional[str] = Field(
+        None,
+        description="Content hash of the model/preprocessor pair that made the predictions"
+    )
+    prediction_time_ms: float = Field(
+        ...,
+        description="Time taken to compute the sweep in milliseconds"
+    )
+    cached: bool = Field(
+        False,
+        description="Whether the sweep was served from the sweep cache"
+    )
@@ -0,0 +1,289 @@
+# fastapi_app/server.py
+"""
+Pre-fork multi-worker server.
+
+``uvicorn --workers N`` starts N fresh interpreters that each unpickle and
+warm up the model, so startup time and resident memory grow with N. This
+launcher loads and warms the artifacts once in the master process and only
+then forks the workers: they inherit the loaded model copy-on-write and are
+ready as soon as they start. All workers accept connections on one socket
+bound by the master, and a worker that dies is re-forked from the warm
+master without loading anything.
+
+Run with::
+
+    python -m fastapi_app.server --workers 4 --host 0.0.0.0 --port 8000
+
+The master logs each worker's RSS/PSS every ``--memory-report-interval``
+seconds, and ``/memory`` returns the same breakdown (see memory.py).
+Workers publish their Prometheus series every ``--metrics-interval``
+seconds, so ``/metrics`` reports the sum over all workers (see metrics.py).
+
+``POST /admin/reload`` reloads the worker that receives it, which then
+sends the master ``RELOAD_SIGNAL`` (SIGHUP; ``kill -HUP <master>`` works
+too). The master forwards it to every worker, each of which reloads if the
+artifacts changed, and reloads its own copy so re-forked workers start
+with the new model.
+
+Linux only (``os.fork`` and /proc). A hot reload in a worker loads a private
+copy of the new artifacts; with MODEL_BUNDLE_DIR the reloaded arrays are
+memory-mapped and stay shared through the page cache.
+"""
+import argparse
+import gc
+import logging
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+
+from . import inference, memory, metrics
+from .logging_config import stop_logging
+from .main import app
+
+logger = logging.getLogger(__name__)
+
+RELOAD_SIGNAL = signal.SIGHUP
+
+
+def notify_reload() -> bool:
+    """
+    From a pre-forked worker, have the master reload every worker.
+
+    Returns:
+        False outside the pre-fork server, where there is nothing to notify
+    """
+    if memory.MASTER_PID is None:
+        return False
+    os.kill(memory.MASTER_PID, RELOAD_SIGNAL)
+    return True
+
+
+def preload():
+    """
+    Load and warm up the artifacts in the master before forking.
+
+    Afterwards every object allocated so far is moved to the GC's permanent
+    generation, so collections in the workers do not write to the inherited
+    objects' headers and copy the pages they live on. A load failure is
+    logged and left to the workers, which retry at startup.
+    """
+    start_time = time.perf_counter()
+    inference.load_on_startup()
+    gc.collect()
+    gc.freeze()
+    status = inference.readiness()
+    if status["ready"]:
+        logger.info(f"Preloaded model {status['model_version']} in {time.perf_counter() - start_time:.2f}s")
+    else:
+        logger.warning(f"Model preload failed; workers will load it themselves: {status['error']}")
+
+
+def _format_mb(value) -> str:
+    return "n/a" if value is None else f"{value / (1 << 20):.1f}MB"
+
+
+class PreforkServer:
+    """
+    Fork ``workers`` processes running ``serve`` and keep them running.
+
+    Args:
+        serve: Callable run in each worker; the worker exits when it returns
+        workers: Number of worker processes
+        memory_report_interval: Seconds between worker memory log lines (0 disables)
+        graceful_timeout: Seconds workers get to finish after SIGTERM before SIGKILL
+        reload: Callable run on RELOAD_SIGNAL, in the master and (in a thread) in
+            every worker the master forwards the signal to
+    """
+
+    def __init__(self, serve, workers: int, memory_report_interval: float = 60,
+                 graceful_timeout: float = 30, reload=None):
+        self.serve = serve
+        self.n_workers = max(1, workers)
+        self.memory_report_interval = memory_report_interval
+        self.graceful_timeout = graceful_timeout
+        self.reload = reload
+        # pid -> monotonic start time
+        self.workers = {}
+        self._stop = threading.Event()
+        self._reload_requested = threading.Event()
+
+    def run(self):
+        """Start the workers and supervise them until stop() or SIGTERM/SIGINT."""
+        previous = {
+            sig: signal.signal(sig, lambda signum, frame: self.stop())
+            for sig in (signal.SIGTERM, signal.SIGINT)
+        }
+        previous[RELOAD_SIGNAL] = signal.signal(RELOAD_SIGNAL, lambda signum, frame: self._reload_requested.set())
+        try:
+            for _ in range(self.n_workers):
+                self._spawn()
+            logger.info(f"Started {self.n_workers} workers: {sorted(self.workers)}")
+            last_report = time.monotonic()
+            while not self._stop.is_set():
+                self._reap(respawn=True)
+                if self._reload_requested.is_set():
+                    self._reload_requested.clear()
+                    self.reload_workers()
+                if self.memory_report_interval and time.monotonic() - last_report >= self.memory_report_interval:
+                    self.log_memory()
+                    last_report = time.monotonic()
+                self._stop.wait(0.5)
+        finally:
+            self._shutdown()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+    def stop(self):
+        self._stop.set()
+
+    def reload_workers(self):
+        """Forward RELOAD_SIGNAL to every worker, then reload the master's own copy."""
+        logger.info(f"Reloading workers {sorted(self.workers)}")
+        for pid in self.workers:
+            try:
+                os.kill(pid, RELOAD_SIGNAL)
+            except ProcessLookupError:
+                pass
+        if self.reload is not None:
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("Master reload failed")
+
+    def log_memory(self):
+        """Log RSS/PSS of every worker and the total over master and workers."""
+        master = memory.process_memory()
+        workers = [memory.process_memory(pid) for pid in sorted(self.workers)]
+        per_worker = ", ".join(
+            f"{w['pid']}: rss {_format_mb(w['rss'])} pss {_format_mb(w['pss'])}" for w in workers
+        )
+        processes = [master] + workers
+        total_rss = sum(p["rss"] or 0 for p in processes)
+        total_pss = sum(p["pss"] or 0 for p in processes)
+        logger.info(
+            f"Worker memory ({per_worker}); master rss {_format_mb(master['rss'])}; "
+            f"total rss {_format_mb(total_rss)} pss {_format_mb(total_pss)}"
+        )
+
+    def _spawn(self):
+        master_pid = os.getpid()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                for sig in (signal.SIGTERM, signal.SIGINT):
+                    signal.signal(sig, signal.SIG_DFL)
+                signal.signal(RELOAD_SIGNAL, self._reload_in_worker)
+                memory.MASTER_PID = master_pid
+                self.serve()
+            except BaseException:
+                logger.exception("Worker failed")
+                code = 1
+            finally:
+                # Never return into the master's code (or run its exit handlers)
+                stop_logging()
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+
+    def _reload_in_worker(self, signum, frame):
+        # Signal handlers run between bytecodes of the main thread: load elsewhere
+        if self.reload is not None:
+            threading.Thread(target=self.reload, name="reload", daemon=True).start()
+
+    def _reap(self, respawn: bool):
+        for pid, started in list(self.workers.items()):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, 0
+            if not done:
+                continue
+            del self.workers[pid]
+            if respawn and not self._stop.is_set():
+                logger.warning(
+                    f"Worker {pid} exited with code {os.waitstatus_to_exitcode(status)}; starting a new one"
+                )
+                if time.monotonic() - started < 1:
+                    # Do not spin if workers die right after starting
+                    time.sleep(1)
+                self._spawn()
+
+    def _shutdown(self):
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.05)
+        for pid in list(self.workers):
+            logger.warning(f"Worker {pid} did not stop in {self.graceful_timeout:g}s; killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            del self.workers[pid]
+        logger.info("All workers stopped")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the API from pre-forked workers sharing one loaded model.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Worker processes (default: WEB_CONCURRENCY or 1)")
+    parser.add_argument("--memory-report-interval", type=float,
+                        default=float(os.getenv("MEMORY_REPORT_INTERVAL", "60")),
+                        help="Seconds between worker RSS/PSS log lines (0 disables)")
+    parser.add_argument("--graceful-timeout", type=float, default=30,
+                        help="Seconds workers get to finish requests on shutdown")
+    parser.add_argument("--metrics-interval", type=float,
+                        default=float(os.getenv("METRICS_PUBLISH_INTERVAL", "5")),
+                        help="Seconds between workers publishing their metrics for /metrics")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import uvicorn
+
+    args = parse_args(argv)
+    # log_config=None: uvicorn's loggers propagate into the queued JSON pipeline
+    config = uvicorn.Config(app, host=args.host, port=args.port, log_config=None)
+    sock = config.bind_socket()
+    preload()
+    metrics.SHARED_DIR = tempfile.mkdtemp(prefix="house-price-metrics-")
+
+    def serve():
+        metrics.start_publisher(args.metrics_interval)
+        uvicorn.Server(config).run(sockets=[sock])
+
+    master_pid = os.getpid()
+
+    def reload():
+        status = inference.reload_artifacts()
+        logger.info(f"Reload in process {os.getpid()}: {status}")
+        if os.getpid() == master_pid and status.get("reloaded"):
+            # As in preload(): keep the new model's pages clean in future workers
+            gc.collect()
+            gc.freeze()
+
+    try:
+        PreforkServer(
+            serve,
+            workers=args.workers,
+            memory_report_interval=args.memory_report_interval,
+            graceful_timeout=args.graceful_timeout,
+            reload=reload,
+        ).run()
+    finally:
+        shutil.rmtree(metrics.SHARED_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# fastapi_app/streaming.py
+"""
+Streaming NDJSON bulk scoring.
+
+The request body is read incrementally, split into lines and scored in
+bounded chunks through ``predict_batch``, and one JSON record per input line
+is streamed back as soon as its chunk is done. Memory use depends on the
+chunk size, not on the size of the upload.
+
+Output records carry the 1-based input ``line`` (and the row's ``id``, if it
+has one) plus either a ``prediction`` or an ``error``::
+
+    {"line": 1, "prediction": {"prediction": 1250000000.0, ...}}
+    {"line": 2, "error": "Invalid JSON: Expecting value"}
+"""
+import json
+import logging
+import time
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+from .schemas import OLXPredictionRequest
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator reads the request body itself.
+
+    Starlette's StreamingResponse listens for client disconnects by calling
+    receive() while streaming, which would consume the request body chunks the
+    iterator still needs. Here only the iterator calls receive(); a client
+    disconnect surfaces as ClientDisconnect from request.stream().
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_lines(byte_stream, max_line_bytes: int):
+    """
+    Split an async stream of byte chunks into (line_number, line) pairs.
+
+    Lines longer than max_line_bytes are yielded as None rather than buffered.
+    Blank lines are counted but not yielded.
+    """
+    buffer = b""
+    line_number = 0
+    overflow = False
+    async for chunk in byte_stream:
+        lines = (buffer + chunk).split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            line_number += 1
+            if overflow:
+                overflow = False
+                yield line_number, None
+            elif line.strip():
+                yield line_number, line if len(line) <= max_line_bytes else None
+        if len(buffer) > max_line_bytes:
+            # Drop the rest of this oversized line; it is reported when it ends
+            overflow, buffer = True, b""
+    if overflow or buffer.strip():
+        line_number += 1
+        yield line_number, None if overflow else buffer
+
+
+def _parse(line: bytes):
+    """Return (row_id, request, error) for one NDJSON line."""
+    if line is None:
+        return None, None, "Line too long"
+    try:
+        data = json.loads(line)
+    except ValueError as e:
+        return None, None, f"Invalid JSON: {e}"
+    if not isinstance(data, dict):
+        return None, None, "Each line must be a JSON object"
+    row_id = data.get("id")
+    try:
+        return row_id, OLXPredictionRequest(**data), None
+    except ValidationError as e:
+        errors = "; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+        return row_id, None, f"Invalid row: {errors}"
+
+
+def _record(line_number: int, row_id, **fields) -> bytes:
+    record = {"line": line_number}
+    if row_id is not None:
+        record["id"] = row_id
+    record.update(fields)
+    return (json.dumps(record, default=str) + "\n").encode("utf-8")
+
+
+def _score_chunk(lines: list, predict_batch) -> tuple:
+    """Parse and score one chunk of (line_number, line) pairs; returns (bytes, n_failed)."""
+    parsed = [(line_number, *_parse(line)) for line_number, line in lines]
+    requests = [req for _, _, req, _ in parsed if req is not None]
+    results = iter(predict_batch(requests) if requests else [])
+    out, n_failed = [], 0
+    for line_number, row_id, req, error in parsed:
+        if req is not None:
+            item = next(results)
+            if item.prediction is not None:
+                out.append(_record(line_number, row_id, prediction=item.prediction.dict()))
+                continue
+            error = item.error
+        n_failed += 1
+        out.append(_record(line_number, row_id, error=error))
+    return b"".join(out), n_failed
+
+
+async def score_ndjson(byte_stream, predict_batch, chunk_size: int, max_line_bytes: int):
+    """
+    Score an NDJSON byte stream chunk by chunk, yielding NDJSON output bytes.
+
+    Parsing and scoring run in the threadpool so the event loop stays free
+    while a chunk is processed.
+
+    Args:
+        byte_stream: Async iterable of request body chunks
+        predict_batch: Callable scoring a list of OLXPredictionRequest into
+            BatchPredictionItem results
+        chunk_size: Maximum number of rows scored per predict_batch call
+        max_line_bytes: Longest accepted input line
+    """
+    start_time = time.perf_counter()
+    n_rows = n_failed = 0
+    pending = []
+
+    async for item in iter_lines(byte_stream, max_line_bytes):
+        pending.append(item)
+        if len(pending) >= chunk_size:
+            out, failed = await run_in_threadpool(_score_chunk, pending, predict_batch)
+            n_rows, n_failed = n_rows + len(pending), n_failed + failed
+            pending = []
+            yield out
+    if pending:
+        out, failed = await run_in_threadpool(_score_chunk, pending, predict_batch)
+        n_rows, n_failed = n_rows + len(pending), n_failed + failed
+        yield out
+
+    elapsed = time.perf_counter() - start_time
+    logger.info(
+        f"Streamed {n_rows} rows in {elapsed:.2f}s "
+        f"({n_rows / elapsed if elapsed else 0:.0f} rows/s, {n_failed} failed)"
+    )
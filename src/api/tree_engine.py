@@ -0,0 +1,357 @@
+# fastapi_app/tree_engine.py
+"""
+Flat-array evaluator for tree ensembles.
+
+``FlatTreeEnsemble`` flattens every tree of a fitted GradientBoosting,
+RandomForest/ExtraTrees, DecisionTree or XGBoost regressor into one set of
+contiguous node arrays:
+
+    feature   int32    split feature (0 for leaves)
+    threshold float32  go left when ``x <= threshold``
+    left      int32    left child, global node index (leaves point to themselves)
+    right     int32    right child, global node index (leaves point to themselves)
+    missing   bool     go left when the feature value is NaN
+    value     float64  leaf output, already multiplied by the ensemble weight
+
+All trees of a batch are then walked together with vectorized NumPy gathers,
+one step per tree level, instead of dispatching to each estimator in Python.
+
+Thresholds are stored as float32 and inputs are cast to float32, exactly as
+scikit-learn and XGBoost do internally; each threshold is rounded down to the
+nearest float32 that keeps the original comparison, so splits are identical.
+Leaf values stay float64 so GradientBoosting and RandomForest predictions match
+``model.predict`` to the last bit (XGBoost accumulates in float32, so it matches
+to float32 precision).
+
+Run ``python -m src.api.tree_engine --model models/modelbaru.pkl`` to check
+equivalence against ``model.predict`` and benchmark latency and memory.
+"""
+import json
+
+import numpy as np
+
+
+class UnsupportedModelError(TypeError):
+    """Raised when a model cannot be flattened into a FlatTreeEnsemble."""
+
+
+# XGBoost objectives whose prediction is the raw margin
+_XGB_IDENTITY_OBJECTIVES = {
+    "reg:squarederror", "reg:squaredlogerror", "reg:absoluteerror",
+    "reg:pseudohubererror", "reg:quantileerror",
+}
+
+
+def _round_down_float32(threshold):
+    """Largest float32 t such that float32(x) <= t  <=>  float32(x) <= threshold."""
+    threshold = np.asarray(threshold, dtype=np.float64)
+    t32 = threshold.astype(np.float32)
+    too_high = t32.astype(np.float64) > threshold
+    t32[too_high] = np.nextafter(t32[too_high], np.float32(-np.inf))
+    return t32
+
+
+class FlatTreeEnsemble:
+    """Tree ensemble stored as contiguous node arrays and evaluated with NumPy."""
+
+    def __init__(self, feature, threshold, left, right, missing, value, roots,
+                 base_score=0.0, average=False, n_features_in=None, max_depth=None,
+                 sum_dtype=np.float64, children=None, feature_index=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float32)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.missing = np.ascontiguousarray(missing, dtype=bool)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.base_score = float(base_score)
+        self.average = average
+        self.n_features_in = n_features_in
+        self.max_depth = max_depth if max_depth is not None else self._depth()
+        self.sum_dtype = sum_dtype
+        self._any_missing_left = bool(self.missing.any())
+        # Interleaved (left, right) children and intp copies for fast gathers; both
+        # can be passed in precomputed (e.g. memory-mapped) to avoid private copies
+        if children is None:
+            children = np.stack([self.left, self.right], axis=1).ravel()
+        if feature_index is None:
+            feature_index = self.feature
+        self._children = np.ascontiguousarray(children, dtype=np.intp)
+        self._feature = np.ascontiguousarray(feature_index, dtype=np.intp)
+        self._roots = self.roots.astype(np.intp)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_model(cls, model):
+        """Flatten a fitted tree-based regressor, or raise UnsupportedModelError."""
+        name = type(model).__name__
+        if name == "XGBRegressor":
+            return cls._from_xgboost(model)
+        if name == "GradientBoostingRegressor":
+            return cls._from_sklearn_gbr(model)
+        if name in ("RandomForestRegressor", "ExtraTreesRegressor"):
+            return cls._from_sklearn_trees(
+                [est.tree_ for est in model.estimators_], model.n_features_in_, average=True
+            )
+        if name in ("DecisionTreeRegressor", "ExtraTreeRegressor"):
+            return cls._from_sklearn_trees([model.tree_], model.n_features_in_)
+        raise UnsupportedModelError(f"Cannot flatten model of type {name}")
+
+    @classmethod
+    def _from_sklearn_gbr(cls, model):
+        if model.init_ == "zero":
+            base_score = 0.0
+        elif type(model.init_).__name__ == "DummyRegressor":
+            base_score = float(np.ravel(model.init_.constant_)[0])
+        else:
+            raise UnsupportedModelError("Only DummyRegressor or 'zero' init is supported")
+        trees = [est.tree_ for est in model.estimators_[:, 0]]
+        return cls._from_sklearn_trees(
+            trees, model.n_features_in_, scale=model.learning_rate, base_score=base_score
+        )
+
+    @classmethod
+    def _from_sklearn_trees(cls, trees, n_features_in, scale=1.0, base_score=0.0, average=False):
+        parts, roots, offset, max_depth = [], [], 0, 0
+        for tree in trees:
+            if tree.n_outputs != 1:
+                raise UnsupportedModelError("Only single-output trees are supported")
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            own = np.arange(offset, offset + n)
+            missing = getattr(tree, "missing_go_to_left", np.zeros(n, dtype=bool))
+            parts.append((
+                np.where(is_leaf, 0, tree.feature),
+                np.where(is_leaf, 0.0, _round_down_float32(tree.threshold)),
+                np.where(is_leaf, own, tree.children_left + offset),
+                np.where(is_leaf, own, tree.children_right + offset),
+                np.asarray(missing, dtype=bool) & ~is_leaf,
+                tree.value[:, 0, 0] * scale if scale != 1.0 else tree.value[:, 0, 0],
+            ))
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+        feature, threshold, left, right, missing, value = (np.concatenate(a) for a in zip(*parts))
+        return cls(feature, threshold, left, right, missing, value, roots,
+                   base_score=base_score, average=average,
+                   n_features_in=n_features_in, max_depth=max_depth)
+
+    @classmethod
+    def _from_xgboost(cls, model):
+        booster = model.get_booster()
+        learner = json.loads(bytes(booster.save_raw(raw_format="json")))["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in _XGB_IDENTITY_OBJECTIVES:
+            raise UnsupportedModelError(f"Unsupported XGBoost objective: {objective}")
+        gbm = learner["gradient_booster"]
+        if gbm["name"] != "gbtree":
+            raise UnsupportedModelError(f"Unsupported XGBoost booster: {gbm['name']}")
+        trees = gbm["model"]["trees"]
+        if any(info != 0 for info in gbm["model"]["tree_info"]):
+            raise UnsupportedModelError("Only single-target XGBoost models are supported")
+
+        best_iteration = getattr(model, "best_iteration", None)
+        if best_iteration is not None:
+            per_round = max(len(trees) // max(booster.num_boosted_rounds(), 1), 1)
+            trees = trees[:(best_iteration + 1) * per_round]
+
+        parts, roots, offset = [], [], 0
+        for tree in trees:
+            left = np.asarray(tree["left_children"], dtype=np.int64)
+            right = np.asarray(tree["right_children"], dtype=np.int64)
+            cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+            is_leaf = left == -1
+            own = np.arange(offset, offset + len(left))
+            # XGBoost goes left when x < cond, i.e. x <= the next float32 below cond
+            threshold = np.nextafter(cond, np.float32(-np.inf))
+            parts.append((
+                np.where(is_leaf, 0, tree["split_indices"]),
+                np.where(is_leaf, np.float32(0.0), threshold),
+                np.where(is_leaf, own, left + offset),
+                np.where(is_leaf, own, right + offset),
+                np.asarray(tree["default_left"], dtype=bool) & ~is_leaf,
+                np.where(is_leaf, cond, 0.0).astype(np.float64),
+            ))
+            roots.append(offset)
+            offset += len(left)
+
+        base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+        feature, threshold, left, right, missing, value = (np.concatenate(a) for a in zip(*parts))
+        return cls(feature, threshold, left, right, missing, value, roots,
+                   base_score=base_score,
+                   n_features_in=int(learner["learner_model_param"]["num_feature"]),
+                   sum_dtype=np.float32)
+
+    def _depth(self):
+        node = self.roots.copy()
+        depth = 0
+        while True:
+            is_leaf = self.left[node] == node
+            if is_leaf.all():
+                return depth
+            node = np.concatenate([self.left[node[~is_leaf]], self.right[node[~is_leaf]]])
+            depth += 1
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+    def apply(self, X):
+        """Return the global leaf index reached in every tree, shape (n_rows, n_trees)."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.n_features_in is not None and X.shape[1] != self.n_features_in:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but the model expects {self.n_features_in}"
+            )
+        X_flat = np.ascontiguousarray(X).ravel()
+        has_nan = bool(np.isnan(X_flat).any())
+        # Trees along axis 0 so each tree's leaves end up contiguous for the sum
+        row_offset = np.arange(X.shape[0], dtype=np.intp) * X.shape[1]
+        node = np.repeat(self._roots[:, None], X.shape[0], axis=1)
+        index = np.empty_like(node)
+        x = np.empty(node.shape, dtype=np.float32)
+        go_right = np.empty(node.shape, dtype=bool)
+        for _ in range(self.max_depth):
+            np.add(self._feature.take(node), row_offset, out=index)
+            X_flat.take(index, out=x)
+            np.greater(x, self.threshold.take(node), out=go_right)
+            if has_nan:
+                # NaN compares False, so route it explicitly by the node's default
+                nan = np.isnan(x)
+                if self._any_missing_left:
+                    nan &= ~self.missing.take(node)
+                go_right |= nan
+            node *= 2
+            node += go_right
+            self._children.take(node, out=node)
+        return node.T
+
+    def predict(self, X):
+        """Predict targets for X, matching the source model's ``predict``."""
+        leaves = self.apply(X).T
+        values = np.empty((leaves.shape[0] + 1, leaves.shape[1]), dtype=self.sum_dtype)
+        values[0] = self.base_score
+        values[1:] = self.value.take(leaves)
+        # Reducing over axis 0 of a C-contiguous array adds tree by tree, in the
+        # same order as the source model (no pairwise summation)
+        out = values.sum(axis=0)
+        if self.average:
+            out /= leaves.shape[0]
+        return out.astype(np.float64, copy=False)
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+    def to_arrays(self):
+        """
+        Split the ensemble into (arrays, meta) for storage as raw buffers.
+
+        ``from_arrays(arrays, meta)`` rebuilds it without copying the arrays, so
+        they can be memory-mapped.
+        """
+        arrays = {
+            "feature": self.feature, "threshold": self.threshold,
+            "left": self.left, "right": self.right, "missing": self.missing,
+            "value": self.value, "roots": self.roots,
+            "children": self._children, "feature_index": self._feature,
+        }
+        meta = {
+            "base_score": self.base_score,
+            "average": self.average,
+            "n_features_in": self.n_features_in,
+            "max_depth": self.max_depth,
+            "sum_dtype": np.dtype(self.sum_dtype).name,
+        }
+        return arrays, meta
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        return cls(
+            arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"],
+            arrays["missing"], arrays["value"], arrays["roots"],
+            base_score=meta["base_score"], average=meta["average"],
+            n_features_in=meta["n_features_in"], max_depth=meta["max_depth"],
+            sum_dtype=np.dtype(meta["sum_dtype"]).type,
+            children=arrays.get("children"), feature_index=arrays.get("feature_index"),
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        arrays = (self.feature, self.threshold, self.left, self.right,
+                  self.missing, self.value, self.roots)
+        return sum(a.nbytes for a in arrays)
+
+
+def check_equivalence(model, engine, X):
+    """
+    Compare ``engine.predict`` with ``model.predict`` on X.
+
+    Returns:
+        Dict with the maximum absolute and relative differences
+    """
+    expected = np.asarray(model.predict(X), dtype=np.float64)
+    actual = engine.predict(X)
+    abs_diff = np.abs(actual - expected)
+    rel_diff = abs_diff / np.maximum(np.abs(expected), np.finfo(np.float64).tiny)
+    return {
+        "n_rows": int(len(expected)),
+        "max_abs_diff": float(abs_diff.max()) if len(abs_diff) else 0.0,
+        "max_rel_diff": float(rel_diff.max()) if len(rel_diff) else 0.0,
+        "exact": bool(np.array_equal(actual, expected)),
+    }
+
+
+def _time_per_call(func, repeat, number):
+    import timeit
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def main():
+    import argparse
+    import pickle
+
+    import joblib
+
+    parser = argparse.ArgumentParser(
+        description="Check FlatTreeEnsemble against model.predict and benchmark it."
+    )
+    parser.add_argument("--model", required=True, help="Path to a pickled tree model")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows for the batch benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    engine = FlatTreeEnsemble.from_model(model)
+    rng = np.random.default_rng(args.seed)
+    X = rng.normal(size=(args.rows, engine.n_features_in))
+    # Mix in one-hot style 0/1 columns so both sides of typical splits are hit
+    X[:, engine.n_features_in // 2:] = rng.integers(0, 2, size=X[:, engine.n_features_in // 2:].shape)
+
+    print(f"Model: {type(model).__name__} ({engine.n_trees} trees, {engine.n_nodes} nodes, "
+          f"max depth {engine.max_depth})")
+    print(f"Equivalence on {args.rows} rows: {check_equivalence(model, engine, X)}")
+
+    row = X[:1]
+    for label, func in [("sklearn/xgboost", model.predict), ("flat", engine.predict)]:
+        single = _time_per_call(lambda: func(row), repeat=5, number=200)
+        batch = _time_per_call(lambda: func(X), repeat=3, number=3)
+        print(f"{label:>16}: {single * 1e6:9.1f} us/row (single)  "
+              f"{batch / args.rows * 1e6:9.3f} us/row (batch of {args.rows})")
+
+    print(f"Memory: pickled model {len(pickle.dumps(model)) / 1024:.1f} KiB, "
+          f"flat arrays {engine.nbytes / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
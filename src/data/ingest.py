@@ -0,0 +1,166 @@
+# src/data/ingest.py
+"""
+Typed, vectorized reading of the OLX listings CSV (final.csv) and of the
+processed feature CSVs.
+
+Listings are read with compact dtypes instead of pandas' object defaults:
+
+- ``LB``/``LT``/``KM``/``KT`` become float32. Capped counts like ">10" count as 10.
+- ``Provinsi``/``Kota/Kab``/``Type`` become ``category``.
+- ``Price`` ("550.000.000") becomes float64, parsed with NumPy over the
+  string bytes instead of per row in Python. float32 cannot hold every
+  rupiah price exactly.
+
+Required columns are checked from the header before any rows are parsed. The
+file can be read in chunks; categories are unioned across chunks so the
+result stays categorical.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_COLUMNS = ["LB", "LT", "KM", "KT"]
+CATEGORICAL_COLUMNS = ["Provinsi", "Kota/Kab", "Type"]
+REQUIRED_COLUMNS = NUMERIC_COLUMNS + CATEGORICAL_COLUMNS + ["Price"]
+
+# Parser dtypes; KM/KT are read as category and parsed once per distinct value
+_READ_DTYPES = {
+    "LB": np.float32,
+    "LT": np.float32,
+    "KM": "category",
+    "KT": "category",
+    "Provinsi": "category",
+    "Kota/Kab": "category",
+    "Type": "category",
+    "Price": object,
+}
+
+
+def parse_price(prices: pd.Series) -> pd.Series:
+    """
+    Parse prices like "550.000.000" (thousands separated by dots) to float64.
+
+    Every non-digit character is ignored, as in the training pipeline's old
+    per-row parser; values without digits become NaN.
+    """
+    present = prices.notna().to_numpy()
+    try:
+        raw = prices.where(present, "").astype(str).to_numpy().astype("S")
+    except UnicodeEncodeError:
+        # Non-ASCII text somewhere: fall back to the regex path
+        digits = prices.astype(str).str.replace(r"[^\d]", "", regex=True)
+        return pd.to_numeric(digits.where(present & (digits != "")), errors="coerce")
+    codes = raw.view(np.uint8).reshape(len(raw), -1) if len(raw) else np.empty((0, 0), np.uint8)
+    is_digit = (codes >= ord("0")) & (codes <= ord("9"))
+    values = np.zeros(len(raw))
+    # Horner's rule one character position at a time, skipping non-digits
+    for j in range(codes.shape[1]):
+        rows = is_digit[:, j]
+        values[rows] = values[rows] * 10 + (codes[rows, j] - ord("0"))
+    values[~is_digit.any(axis=1)] = np.nan
+    return pd.Series(values, index=prices.index, name=prices.name)
+
+
+def parse_count(values: pd.Series) -> pd.Series:
+    """Parse room counts, capped ones like ">10" included, to float32."""
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_numeric(
+        pd.Series(uniques).astype(str).str.strip().str.lstrip(">"), errors="coerce"
+    ).to_numpy(dtype=np.float32)
+    result = np.append(parsed, np.float32(np.nan))[codes]
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def _header(source) -> list:
+    if hasattr(source, "seek"):
+        position = source.tell()
+        header = pd.read_csv(source, nrows=0).columns
+        source.seek(position)
+    else:
+        header = pd.read_csv(source, nrows=0).columns
+    return list(header)
+
+
+def _typed(chunk: pd.DataFrame, rename: dict) -> pd.DataFrame:
+    chunk = chunk.rename(columns=rename)
+    for col in ("KM", "KT"):
+        if col in chunk:
+            chunk[col] = parse_count(chunk[col])
+    if "Price" in chunk:
+        chunk["Price"] = parse_price(chunk["Price"])
+    return chunk
+
+
+def iter_listings(source, columns=None, chunksize: int = 100_000):
+    """
+    Yield typed DataFrames of ``chunksize`` listings.
+
+    Args:
+        source: Path or file-like object of a CSV in final.csv format
+        columns: Columns to read and require (default: REQUIRED_COLUMNS)
+        chunksize: Rows per chunk
+
+    Raises:
+        ValueError: If the header lacks one of the columns
+    """
+    columns = list(columns or REQUIRED_COLUMNS)
+    # Header names are matched ignoring surrounding whitespace
+    raw_names = {name.strip(): name for name in _header(source)}
+    missing = [c for c in columns if c not in raw_names]
+    if missing:
+        raise ValueError(f"CSV missing columns: {missing}")
+
+    rename = {raw_names[c]: c for c in columns}
+    reader = pd.read_csv(
+        source,
+        usecols=list(rename),
+        dtype={raw_names[c]: _READ_DTYPES.get(c, object) for c in columns},
+        chunksize=chunksize,
+    )
+    with reader:
+        for chunk in reader:
+            yield _typed(chunk, rename)[columns]
+
+
+def read_listings(source, columns=None, chunksize: int = 100_000, dropna_price: bool = False) -> pd.DataFrame:
+    """
+    Read a whole listings CSV with compact dtypes (see iter_listings).
+
+    Args:
+        dropna_price: Drop rows whose price is missing or unparseable
+    """
+    chunks = list(iter_listings(source, columns, chunksize))
+    if len(chunks) == 1:
+        df = chunks[0]
+    else:
+        df = pd.concat(chunks, ignore_index=True)
+        # concat turns categoricals with different categories into object
+        for col in chunks[0].columns:
+            if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+                df[col] = union_categoricals([chunk[col] for chunk in chunks])
+    if dropna_price and "Price" in df:
+        before = len(df)
+        df = df.dropna(subset=["Price"]).reset_index(drop=True)
+        if len(df) < before:
+            logger.info(f"Dropped {before - len(df)} listings without a price")
+    return df
+
+
+def read_features(path, target: str, chunksize: int = 100_000) -> pd.DataFrame:
+    """
+    Read a processed all-numeric feature CSV: features as float32 and the
+    target as float64.
+
+    Raises:
+        ValueError: If the target column is missing
+    """
+    header = _header(path)
+    if target not in header:
+        raise ValueError(f"CSV missing target column {target!r}")
+    dtypes = {col: np.float32 for col in header}
+    dtypes[target] = np.float64
+    return pd.concat(pd.read_csv(path, dtype=dtypes, chunksize=chunksize), ignore_index=True)
@@ -1,8 +1,14 @@
 # src/data/processor.py
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import logging
+import sys
+
+# Allow `python src/data/run_processing.py` to import the src package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.data.sketch import QuantileSketch
 
 # Set up logging
 logging.basicConfig(
@@ -16,6 +22,13 @@ def load_data(file_path):
     logger.info(f"Loading data from {file_path}")
     return pd.read_csv(file_path)
 
+def price_column(columns):
+    """The target column: ``price`` in the raw scrape, ``Price`` in the OLX listings."""
+    for name in ('price', 'Price'):
+        if name in columns:
+            return name
+    raise ValueError("Dataset has no 'price' or 'Price' column")
+
 def clean_data(df):
     """Clean the dataset by handling missing values and outliers."""
     logger.info("Cleaning dataset")
@@ -42,20 +55,21 @@ def clean_data(df):
     
     # Handle outliers in price (target variable)
     # Using IQR method to identify outliers
-    Q1 = df_cleaned['price'].quantile(0.25)
-    Q3 = df_cleaned['price'].quantile(0.75)
+    price = price_column(df_cleaned.columns)
+    Q1 = df_cleaned[price].quantile(0.25)
+    Q3 = df_cleaned[price].quantile(0.75)
     IQR = Q3 - Q1
     lower_bound = Q1 - 1.5 * IQR
     upper_bound = Q3 + 1.5 * IQR
     
     # Filter out extreme outliers
-    outliers = df_cleaned[(df_cleaned['price'] < lower_bound) | 
-                          (df_cleaned['price'] > upper_bound)]
+    outliers = df_cleaned[(df_cleaned[price] < lower_bound) | 
+                          (df_cleaned[price] > upper_bound)]
     
     if not outliers.empty:
         logger.info(f"Found {len(outliers)} outliers in price column")
-        df_cleaned = df_cleaned[(df_cleaned['price'] >= lower_bound) & 
-                                (df_cleaned['price'] <= upper_bound)]
+        df_cleaned = df_cleaned[(df_cleaned[price] >= lower_bound) & 
+                                (df_cleaned[price] <= upper_bound)]
         logger.info(f"Removed outliers. New dataset shape: {df_cleaned.shape}")
     
     return df_cleaned
@@ -79,9 +93,125 @@ def process_data(input_file, output_file):
     
     return df_cleaned
 
+def collect_stats(input_file, chunksize, sketch_size=4096):
+    """
+    First pass of the chunked mode: per-column missing counts, a quantile
+    sketch of every numeric column and value counts of every other column.
+
+    Column types are taken from the first chunk; in later chunks non-numeric
+    values in a numeric column count as missing.
+    """
+    stats = {'rows': 0, 'numeric': {}, 'missing': {}, 'sketches': {}, 'counts': {}}
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        if not stats['numeric']:
+            stats['numeric'] = {c: pd.api.types.is_numeric_dtype(chunk[c]) for c in chunk.columns}
+            stats['missing'] = dict.fromkeys(chunk.columns, 0)
+        stats['rows'] += len(chunk)
+        for column, numeric in stats['numeric'].items():
+            values = chunk[column]
+            if numeric:
+                values = pd.to_numeric(values, errors='coerce')
+                stats['sketches'].setdefault(column, QuantileSketch(k=sketch_size)).update(values.to_numpy())
+            else:
+                counts = values.value_counts()
+                previous = stats['counts'].get(column)
+                stats['counts'][column] = counts if previous is None else previous.add(counts, fill_value=0)
+            stats['missing'][column] += int(values.isna().sum())
+    return stats
+
+def fill_values(stats):
+    """Median (numeric) or mode (other) of every column with missing values."""
+    fills = {}
+    for column, missing_count in stats['missing'].items():
+        if not missing_count:
+            continue
+        logger.info(f"Found {missing_count} missing values in {column}")
+        if stats['numeric'][column]:
+            fills[column] = stats['sketches'][column].quantile(0.5)
+            logger.info(f"Filling missing values in {column} with median: {fills[column]}")
+        else:
+            counts = stats['counts'][column]
+            # Ties go to the smallest value, like Series.mode()[0]
+            fills[column] = min(counts.index[counts == counts.max()])
+            logger.info(f"Filling missing values in {column} with mode: {fills[column]}")
+    return fills
+
+def process_data_chunked(input_file, output_file, chunksize=100_000, sketch_size=4096):
+    """
+    Out-of-core version of process_data, in two passes over the input.
+
+    The first pass collects statistics (collect_stats); the second imputes,
+    drops price outliers and appends each cleaned chunk to the output, so
+    memory is bounded by the chunk size plus the sketches and the value
+    counts of the non-numeric columns.
+
+    Medians and the price quartiles come from QuantileSketch: identical to
+    the in-memory path while a column has at most ``sketch_size`` values,
+    otherwise within the sketch's rank error (see src/data/sketch.py), so only
+    rows whose price lies within that error of a bound can be kept or
+    dropped differently.
+
+    Returns:
+        Summary dict: rows read and written, outliers, fill values and price bounds
+    """
+    output_path = Path(output_file).parent
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    logger.info(f"Collecting statistics from {input_file} in chunks of {chunksize} rows")
+    stats = collect_stats(input_file, chunksize, sketch_size)
+    if not stats['rows']:
+        raise ValueError(f"No rows in {input_file}")
+    fills = fill_values(stats)
+
+    # Quartiles after imputation, as in clean_data: the filled prices count too
+    price = price_column(stats['numeric'])
+    if not stats['numeric'][price]:
+        raise ValueError(f"Column {price} is not numeric")
+    sketch = stats['sketches'][price]
+    if stats['missing'][price]:
+        sketch.add_repeated(fills[price], stats['missing'][price])
+    Q1, Q3 = sketch.quantile(0.25), sketch.quantile(0.75)
+    IQR = Q3 - Q1
+    lower_bound = Q1 - 1.5 * IQR
+    upper_bound = Q3 + 1.5 * IQR
+
+    # Columns with missing values are float in the in-memory path; keep them float in every chunk
+    float_columns = [c for c, numeric in stats['numeric'].items() if numeric and stats['missing'][c]]
+    written = 0
+    for i, chunk in enumerate(pd.read_csv(input_file, chunksize=chunksize)):
+        for column, numeric in stats['numeric'].items():
+            if numeric and not pd.api.types.is_numeric_dtype(chunk[column]):
+                chunk[column] = pd.to_numeric(chunk[column], errors='coerce')
+        chunk = chunk.fillna(fills).astype({c: np.float64 for c in float_columns})
+        chunk = chunk[(chunk[price] >= lower_bound) & (chunk[price] <= upper_bound)]
+        chunk.to_csv(output_file, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        written += len(chunk)
+
+    outliers = stats['rows'] - written
+    if outliers:
+        logger.info(f"Found {outliers} outliers in price column")
+    logger.info(f"Saved {written} of {stats['rows']} rows to {output_file}")
+    return {
+        'rows': stats['rows'],
+        'written': written,
+        'outliers': outliers,
+        'fills': fills,
+        'bounds': (lower_bound, upper_bound),
+    }
+
 if __name__ == "__main__":
-    # Example usage
-    process_data(
-        input_file="data/raw/house_data.csv", 
-        output_file="data/processed/cleaned_house_data.csv"
-    )
+    parser = argparse.ArgumentParser(description='Clean the raw housing data.')
+    parser.add_argument('--input', default='data/raw/house_data.csv', help='Path to raw CSV file')
+    parser.add_argument('--output', default='data/processed/cleaned_house_data.csv',
+                        help='Path for the cleaned CSV file')
+    parser.add_argument('--chunksize', type=int, default=0,
+                        help='Process out of core in chunks of this many rows (0 loads the whole file)')
+    parser.add_argument('--sketch-size', type=int, default=4096,
+                        help='Values per quantile sketch level in chunked mode (larger is more accurate)')
+
+    args = parser.parse_args()
+
+    if args.chunksize:
+        process_data_chunked(args.input, args.output, args.chunksize, args.sketch_size)
+    else:
+        process_data(args.input, args.output)
@@ -0,0 +1,101 @@
+# src/data/sketch.py
+"""
+Mergeable streaming quantile sketch.
+
+A compactor sketch in the style of KLL. Values are kept in levels, and a value
+at level ``h`` stands for ``2**h`` input values. When a level holds more than
+``k`` values, it is sorted and every other value (random offset) moves up one
+level. Memory is O(k · log2(n / k)) floats no matter how many values are
+added. Sketches of different chunks or files can be merged.
+
+Accuracy: while at most ``k`` values have been added nothing is compacted,
+and quantiles equal pandas' (linear interpolation). After that, the rank error
+of a quantile is at most about ``log2(n / k) / k`` of n, which is under 0.5% at
+k=4096 for a billion values. In practice it is far smaller because the
+random offsets cancel.
+"""
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of a stream of floats in bounded memory.
+
+    Args:
+        k: Values per level before it is compacted; larger is more accurate
+        seed: Seed of the compaction offsets, for reproducible results
+    """
+
+    def __init__(self, k: int = 4096, seed: int = 0):
+        self.k = k
+        self.count = 0
+        # levels[h] holds values of weight 2**h
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Add values; NaNs are ignored."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.count += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compact()
+
+    def add_repeated(self, value: float, n: int):
+        """Add ``value`` n times in O(log n): one copy at each level of n's binary expansion."""
+        self.count += n
+        level = 0
+        while n:
+            if n & 1:
+                self._level(level)
+                self.levels[level] = np.append(self.levels[level], float(value))
+            n >>= 1
+            level += 1
+        self._compact()
+
+    def merge(self, other: "QuantileSketch"):
+        """Add everything summarized by another sketch."""
+        for level, values in enumerate(other.levels):
+            self._level(level)
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self.count += other.count
+        self._compact()
+
+    def quantile(self, q: float) -> float:
+        """The q-quantile, interpolated linearly between ranks like pandas."""
+        if not self.count:
+            return float("nan")
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(v), 1 << h, dtype=np.int64) for h, v in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, cumulative = values[order], np.cumsum(weights[order])
+
+        position = q * (cumulative[-1] - 1)
+        lower, fraction = int(np.floor(position)), position - np.floor(position)
+        below = values[np.searchsorted(cumulative, lower, side="right")]
+        above = values[np.searchsorted(cumulative, min(lower + 1, cumulative[-1] - 1), side="right")]
+        return float(below + (above - below) * fraction)
+
+    @property
+    def size(self) -> int:
+        """Number of values currently stored."""
+        return sum(len(v) for v in self.levels)
+
+    def _level(self, level: int):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) > self.k:
+                values = np.sort(values)
+                # An odd value out stays at this level so no weight is lost
+                paired = len(values) - len(values) % 2
+                promoted = values[self._rng.integers(2):paired:2]
+                self.levels[level] = values[paired:]
+                self._level(level + 1)
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
@@ -3,12 +3,18 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import logging
+import sys
+from pathlib import Path
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 import joblib
 
+# Allow `python src/features/engineer.py` to import the src package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.features.store import save_features, store_path
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -70,8 +76,15 @@ def create_preprocessor():
     
     return preprocessor
 
-def run_feature_engineering(input_file, output_file, preprocessor_file):
-    """Full feature engineering pipeline."""
+def run_feature_engineering(input_file, output_file, preprocessor_file, store_file=None, write_csv=False):
+    """
+    Full feature engineering pipeline.
+
+    The transformed matrix is saved as a binary feature store (store_file,
+    default: output_file with a .features suffix) for the training scripts.
+    The dense CSV at output_file is only written when write_csv is True, and
+    is then returned as a DataFrame; otherwise None is returned.
+    """
     # Load cleaned data
     logger.info(f"Loading data from {input_file}")
     df = pd.read_csv(input_file)
@@ -91,8 +104,25 @@ def run_feature_engineering(input_file, output_file, preprocessor_file):
     joblib.dump(preprocessor, preprocessor_file)
     logger.info(f"Saved preprocessor to {preprocessor_file}")
     
+    # Save the binary feature store the training scripts load without parsing
+    try:
+        feature_names = preprocessor.get_feature_names_out()
+    except AttributeError:
+        feature_names = None
+    save_features(
+        store_file or store_path(output_file),
+        X_transformed,
+        y.values if y is not None else None,
+        target='price' if y is not None else None,
+        feature_names=feature_names,
+    )
+    
+    if not write_csv:
+        return None
+    
     # Save fully preprocessed data
-    df_transformed = pd.DataFrame(X_transformed)
+    X_dense = X_transformed.toarray() if hasattr(X_transformed, 'toarray') else X_transformed
+    df_transformed = pd.DataFrame(X_dense)
     if y is not None:
         df_transformed['price'] = y.values
     df_transformed.to_csv(output_file, index=False)
@@ -105,9 +135,12 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description='Feature engineering for housing data.')
     parser.add_argument('--input', required=True, help='Path to cleaned CSV file')
-    parser.add_argument('--output', required=True, help='Path for output CSV file (engineered features)')
+    parser.add_argument('--output', required=True, help='Path for the optional CSV file (engineered features); the store defaults next to it')
     parser.add_argument('--preprocessor', required=True, help='Path for saving the preprocessor')
+    parser.add_argument('--store', default=None,
+                        help='Path for the binary feature store (default: output path with .features)')
+    parser.add_argument('--csv', action='store_true', help='Also write the dense CSV at --output')
     
     args = parser.parse_args()
     
-    run_feature_engineering(args.input, args.output, args.preprocessor)
+    run_feature_engineering(args.input, args.output, args.preprocessor, args.store, write_csv=args.csv)
@@ -0,0 +1,220 @@
+"""
+Offline batch scoring of a listings CSV in final.csv format.
+
+Reads the CSV in chunks, parses the numeric columns (``Price`` like
+"550.000.000", ``KM``/``KT`` like ">10") and scores every chunk with the same
+feature engineering, preprocessor and model as the API. Chunks are spread over
+a process pool whose workers load the artifacts once; results are written in
+input order to CSV or Parquet as they complete.
+
+Usage:
+    python -m src.models.batch_score --input final.csv --output predictions.csv \
+        --model models/modelbaru.pkl --preprocessor models/barupreprocessor.pkl
+"""
+import argparse
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.api import inference
+from src.data.ingest import parse_count, parse_price
+
+# -----------------------------
+# Configure logging
+# -----------------------------
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Argument parser
+# -----------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score a listings CSV with the trained model.")
+    parser.add_argument("--input", type=str, required=True, help="Path to CSV in final.csv format")
+    parser.add_argument("--output", type=str, required=True, help="Output path (.csv or .parquet)")
+    parser.add_argument("--model", type=str, default=str(inference.MODEL_PATH), help="Path to model .pkl")
+    parser.add_argument("--preprocessor", type=str, default=str(inference.PREPROCESSOR_PATH),
+                        help="Path to preprocessor .pkl")
+    parser.add_argument("--chunksize", type=int, default=50000, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (0 scores in this process)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None,
+                        help="Output format (default: from the output file extension)")
+    parser.add_argument("--keep-columns", nargs="*", default=[],
+                        help="Input columns to copy to the output, e.g. an ID column")
+    return parser.parse_args(argv)
+
+# -----------------------------
+# Parsing and scoring
+# -----------------------------
+def parse_chunk(chunk: pd.DataFrame) -> tuple:
+    """
+    Coerce a raw final.csv chunk to the types the model expects.
+
+    Returns:
+        Tuple of (features DataFrame with inference.CSV_COLS, per-row error
+        messages as an object array with None for valid rows)
+    """
+    missing = [c for c in inference.CSV_COLS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {missing}")
+
+    features = pd.DataFrame(index=chunk.index)
+    for col in ("LB", "LT"):
+        features[col] = pd.to_numeric(chunk[col], errors="coerce")
+    for col in ("KM", "KT"):
+        # Counts are capped in the listings, e.g. ">10"
+        features[col] = parse_count(chunk[col]).astype(np.float64)
+    for col in inference.CATEGORICAL_COLS:
+        features[col] = chunk[col].where(chunk[col].notna(), None).astype(object)
+
+    # Same constraints as OLXPredictionRequest
+    errors = np.full(len(chunk), None, dtype=object)
+    checks = [
+        (features["LB"].isna() | (features["LB"] <= 0), "LB must be a number > 0"),
+        (features["LT"].isna() | (features["LT"] <= 0), "LT must be a number > 0"),
+        (features["KM"].isna() | (features["KM"] < 0), "KM must be a number >= 0"),
+        (features["KT"].isna() | (features["KT"] < 0), "KT must be a number >= 0"),
+    ] + [(features[c].isna(), f"{c} is required") for c in inference.CATEGORICAL_COLS]
+    for mask, message in checks:
+        errors[mask.to_numpy() & pd.isna(errors)] = message
+    return features[inference.CSV_COLS], errors
+
+
+def score_chunk(chunk: pd.DataFrame, keep_columns=()) -> pd.DataFrame:
+    """Score one raw chunk; invalid rows get a NaN prediction and an error message."""
+    features, errors = parse_chunk(chunk)
+    predictions = np.full(len(chunk), np.nan)
+    valid = np.flatnonzero(pd.isna(errors))
+    if len(valid):
+        # e.g. a category the preprocessor has never seen fails the chunk: the
+        # bad rows are isolated by bisection, the rest stays vectorized
+        scores, failures = inference.score_isolating(
+            valid, lambda rows: inference.predict_frame(features.iloc[rows])[0])
+        if failures:
+            logger.warning(f"Chunk scoring failed for {len(failures)} of {len(valid)} rows")
+        for i, price in scores.items():
+            predictions[i] = price
+        for i, row_error in failures.items():
+            errors[i] = str(row_error)
+
+    out = pd.DataFrame({"row": chunk.index.to_numpy()})
+    for col in keep_columns:
+        out[col] = chunk[col].to_numpy()
+    if "Price" in chunk.columns:
+        out["actual_price"] = parse_price(chunk["Price"]).to_numpy()
+    out["predicted_price"] = predictions
+    out["error"] = errors
+    return out
+
+
+def _init_worker(model_path: str, preprocessor_path: str):
+    """Process pool initializer: load and warm up the artifacts once per worker."""
+    inference.MODEL_PATH = Path(model_path)
+    inference.PREPROCESSOR_PATH = Path(preprocessor_path)
+    logging.getLogger("src.api.inference").setLevel(logging.WARNING)
+    inference._ensure_loaded()
+
+# -----------------------------
+# Output
+# -----------------------------
+class _Writer:
+    """Append scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self._parquet = None
+        self._first = True
+
+    def write(self, frame: pd.DataFrame):
+        if self.fmt == "csv":
+            frame.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        else:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                # Columns that are all null in the first chunk (e.g. no errors yet) are strings
+                schema = pa.schema([
+                    pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                    for f in table.schema
+                ])
+                self._parquet = pq.ParquetWriter(self.path, schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        self._first = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        elif self._first and self.fmt == "csv":
+            # Empty input still produces a file with a header
+            pd.DataFrame(columns=["row", "predicted_price", "error"]).to_csv(self.path, index=False)
+
+# -----------------------------
+# Main logic
+# -----------------------------
+def main(args) -> dict:
+    fmt = args.format or ("parquet" if Path(args.output).suffix in (".parquet", ".pq") else "csv")
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    reader = pd.read_csv(args.input, chunksize=args.chunksize, dtype=str, keep_default_na=True)
+    writer = _Writer(args.output, fmt)
+
+    start_time = time.perf_counter()
+    n_rows = n_failed = 0
+
+    def record(frame):
+        nonlocal n_rows, n_failed
+        writer.write(frame)
+        n_rows += len(frame)
+        n_failed += int(frame["error"].notna().sum())
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"Scored {n_rows:,} rows ({n_rows / elapsed:,.0f} rows/s)")
+
+    try:
+        if args.workers <= 0:
+            _init_worker(args.model, args.preprocessor)
+            for chunk in reader:
+                record(score_chunk(chunk, args.keep_columns))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=args.workers,
+                initializer=_init_worker,
+                initargs=(args.model, args.preprocessor),
+            ) as pool:
+                # Bounded in-flight chunks keep memory flat; results are written in input order
+                in_flight = deque()
+                for chunk in reader:
+                    in_flight.append(pool.submit(score_chunk, chunk, args.keep_columns))
+                    if len(in_flight) >= 2 * args.workers:
+                        record(in_flight.popleft().result())
+                while in_flight:
+                    record(in_flight.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start_time
+    summary = {
+        "rows": n_rows,
+        "failed": n_failed,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(n_rows / elapsed, 1) if elapsed else 0.0,
+        "output": args.output,
+    }
+    logger.info(
+        f"Finished: {n_rows:,} rows ({n_failed:,} failed) in {elapsed:.2f}s, "
+        f"{summary['rows_per_second']:,.0f} rows/s -> {args.output}"
+    )
+    return summary
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,121 @@
+"""
+Recursive feature elimination with an adaptive step.
+
+``RFE(step=1)`` refits the estimator once per dropped column, about 170 XGBoost
+fits to go from the full one-hot matrix to 10 features. Features are ranked
+the same way, by the importances of a fit on the whole training set, but with
+fewer rounds:
+
+- While more than ``fine_below`` features are left, each round drops a
+  ``step`` fraction of them. Below that it drops one feature per round, so the
+  final choice is made just as carefully as with step=1.
+- Every feature the fitted model does not use (zero importance) is dropped in
+  the same round. Most one-hot columns are in this group.
+
+On one-hot data with a few informative columns it picks the same subset as
+RFE(step=1) (see tests/test_feature_selection.py) in far fewer rounds. Each
+round is one ranking fit plus ``cv`` fits scoring the round's subset with
+``cv``-fold R², so about 4 fits per round with the default cv=3 (``cv=0``
+skips scoring and leaves one fit per round). The report lists every round's
+subset size, CV score, seconds and dropped features, and the total n_fits.
+"""
+import logging
+import time
+
+import numpy as np
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'n_features_to_select': 10,
+    'step': 0.2,
+    'fine_below': 20,
+    'cv': 3,
+    'drop_zero_importance': True,
+}
+
+
+def _importances(model) -> np.ndarray:
+    if hasattr(model, 'feature_importances_'):
+        return np.asarray(model.feature_importances_, dtype=np.float64)
+    return np.abs(np.asarray(model.coef_, dtype=np.float64)).reshape(-1)
+
+
+def _n_to_drop(n_remaining: int, step: float, fine_below: int) -> int:
+    if n_remaining <= fine_below:
+        return 1
+    if step < 1:
+        return max(1, int(step * n_remaining))
+    return int(step)
+
+
+def _cv_score(estimator, X: np.ndarray, y: np.ndarray, folds) -> float:
+    if not folds:
+        return None
+    scores = [
+        r2_score(y[test], clone(estimator).fit(X[train], y[train]).predict(X[test]))
+        for train, test in folds
+    ]
+    return float(np.mean(scores))
+
+
+def select_features(estimator, X, y, n_features_to_select: int = 10, step: float = 0.2,
+                    fine_below: int = 20, cv: int = 3, drop_zero_importance: bool = True,
+                    columns=None) -> tuple:
+    """
+    Eliminate features from X until ``n_features_to_select`` are left.
+
+    Args:
+        estimator: Unfitted estimator exposing feature_importances_ or coef_
+        X: DataFrame, array or scipy sparse matrix (densified: XGBoost reads a
+            sparse matrix's zeros as missing values, not as zeros)
+        n_features_to_select: Size of the final subset
+        step: Fraction (< 1) or number (>= 1) of features dropped per round above fine_below
+        fine_below: Drop one feature per round once this many or fewer are left
+        cv: Number of folds each round's subset is scored on (0 disables scoring)
+        drop_zero_importance: Also drop every feature the fitted model does not use
+        columns: Column names (default: X.columns)
+
+    Returns:
+        Tuple of (selected column names, report), report having n_fits,
+        seconds and a list of rounds (n_features, cv_score, seconds, dropped)
+    """
+    columns = list(X.columns if columns is None else columns)
+    X = X.toarray() if sparse.issparse(X) else np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    folds = list(KFold(n_splits=cv).split(X)) if cv else []
+    remaining = np.arange(len(columns))
+    rounds = []
+    start_time = time.perf_counter()
+
+    while True:
+        round_start = time.perf_counter()
+        cv_score = _cv_score(estimator, X[:, remaining], y, folds)
+        entry = {'n_features': len(remaining), 'cv_score': cv_score, 'dropped': []}
+        rounds.append(entry)
+        if len(remaining) <= n_features_to_select:
+            entry['seconds'] = time.perf_counter() - round_start
+            break
+
+        importances = _importances(clone(estimator).fit(X[:, remaining], y))
+        n_drop = _n_to_drop(len(remaining), step, fine_below)
+        if drop_zero_importance:
+            n_drop = max(n_drop, int(np.sum(importances == 0)))
+        n_drop = min(n_drop, len(remaining) - n_features_to_select)
+        # Stable sort: ties go in column order, like RFE's ranking
+        dropped = np.argsort(importances, kind='stable')[:n_drop]
+        entry['dropped'] = [columns[i] for i in remaining[dropped]]
+        remaining = np.delete(remaining, dropped)
+        entry['seconds'] = time.perf_counter() - round_start
+        logger.info(f"{entry['n_features']} features: CV R2 {cv_score}, dropped {n_drop} in {entry['seconds']:.2f}s")
+
+    report = {
+        'n_fits': len(rounds) * len(folds) + len(rounds) - 1,
+        'seconds': time.perf_counter() - start_time,
+        'rounds': rounds,
+    }
+    return [columns[i] for i in remaining], report
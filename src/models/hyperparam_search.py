@@ -0,0 +1,385 @@
+"""
+Successive-halving hyperparameter search with a resumable trial journal.
+
+Every candidate of every model family first runs on a small fraction of each
+training fold. Only the best 1/``eta`` of each family moves on to the next
+rung, which uses ``eta`` times more rows, and the last rung uses the full
+folds; candidates still left then are all compared on the full folds. A
+family is not pruned below one candidate, and its last candidate goes
+straight to the final rung.
+
+Every fold fit is written to a SQLite journal (by default next to the MLflow
+store, data/mlflow/search_journal.db) as soon as it finishes. It records the
+params, rung, fold, score and timings. Trials are keyed by a fingerprint of
+the dataset and CV setup, so after a crash or a grid change a re-run repeats
+only the missing fits. The winning family's params go to model_config.yaml
+for train_model.py.
+
+Run with::
+
+    python -m src.models.hyperparam_search --data data/processed/featured_house_data.csv \\
+        --config models/model_config.yaml
+"""
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+from joblib import Parallel, delayed
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ParameterGrid, train_test_split
+
+# Allow `python src/models/hyperparam_search.py` to import the src package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.features.store import load_xy
+from src.models.training_scheduler import MemorySampler, fit_final, open_shared, share_arrays, single_threaded
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL = "data/mlflow/search_journal.db"
+
+# Same search space as create_new_model.py
+DEFAULT_GRIDS = {
+    'LinearRegression': {},
+    'RandomForest': {
+        'n_estimators': [100, 150],
+        'max_depth': [None, 10, 20]
+    },
+    'GradientBoosting': {
+        'n_estimators': [100, 250],
+        'learning_rate': [0.1, 0.05],
+        'max_depth': [3, 10]
+    },
+    'XGBoost': {
+        'n_estimators': [100, 150],
+        'learning_rate': [0.1, 0.05],
+        'max_depth': [3, 10]
+    }
+}
+
+# -----------------------------
+# Trial journal
+# -----------------------------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS studies (
+    study TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trials (
+    study TEXT NOT NULL,
+    family TEXT NOT NULL,
+    params TEXT NOT NULL,
+    fraction REAL NOT NULL,
+    fold INTEGER NOT NULL,
+    n_train INTEGER NOT NULL,
+    score REAL NOT NULL,
+    fit_seconds REAL NOT NULL,
+    score_seconds REAL NOT NULL,
+    pid INTEGER,
+    finished_at TEXT NOT NULL,
+    PRIMARY KEY (study, family, params, fraction, fold)
+);
+"""
+
+
+def _params_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class TrialJournal:
+    """SQLite record of finished fold fits, one row per (study, family, params, fraction, fold)."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript(_SCHEMA)
+
+    def start_study(self, study: str, description: dict):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO studies VALUES (?, ?, ?)",
+                (study, datetime.now(timezone.utc).isoformat(), json.dumps(description, sort_keys=True)),
+            )
+
+    def scores(self, study: str, family: str, params: dict, fraction: float) -> dict:
+        """Fold -> score of the finished fits of one candidate at one rung."""
+        rows = self._conn.execute(
+            "SELECT fold, score FROM trials WHERE study = ? AND family = ? AND params = ? AND fraction = ?",
+            (study, family, _params_key(params), fraction),
+        )
+        return dict(rows.fetchall())
+
+    def record(self, study: str, family: str, params: dict, fraction: float, fold: int, result: dict):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (study, family, _params_key(params), fraction, fold, result["n_train"], result["score"],
+                 result["fit_time"], result["score_time"], result["pid"],
+                 datetime.now(timezone.utc).isoformat()),
+            )
+
+    def trials(self, study: str) -> list:
+        rows = self._conn.execute(
+            "SELECT family, params, fraction, fold, n_train, score, fit_seconds FROM trials "
+            "WHERE study = ? ORDER BY family, fraction, params, fold",
+            (study,),
+        )
+        columns = [c[0] for c in rows.description]
+        return [dict(zip(columns, row)) for row in rows.fetchall()]
+
+    def close(self):
+        self._conn.close()
+
+
+def study_key(X, y, cv: int, eta: int, min_fraction: float, seed: int) -> str:
+    """Fingerprint of everything that makes fold scores comparable between runs."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    digest.update(json.dumps([np.shape(X), cv, eta, min_fraction, seed]).encode())
+    return digest.hexdigest()[:16]
+
+# -----------------------------
+# Successive halving
+# -----------------------------
+def rung_fractions(eta: int, min_fraction: float) -> list:
+    """
+    Training-row fractions of each rung: powers of 1/eta from the smallest
+    one >= min_fraction up to 1.0. They do not depend on the grid, so adding
+    candidates leaves the journaled rungs of the old ones reusable.
+    """
+    n_rungs = 1 + math.floor(math.log(1 / min_fraction) / math.log(eta) + 1e-9)
+    return [round(float(eta) ** (rung - n_rungs + 1), 6) for rung in range(n_rungs)]
+
+
+def _subsample(train: np.ndarray, fraction: float, fold: int, seed: int) -> np.ndarray:
+    """The first ``fraction`` of a fixed permutation of the fold, so reruns fit the same rows."""
+    if fraction >= 1:
+        return train
+    order = np.random.default_rng([seed, fold]).permutation(train)
+    return np.sort(order[:max(2, math.ceil(fraction * len(train)))])
+
+
+def _fit_fold(estimator, X_path: str, y_path: str, train, test) -> dict:
+    X, y = open_shared(X_path), open_shared(y_path)
+    start_time = time.perf_counter()
+    estimator.fit(X[train], y[train])
+    fit_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    score = r2_score(y[test], estimator.predict(X[test]))
+    return {
+        "score": float(score),
+        "fit_time": fit_time,
+        "score_time": time.perf_counter() - start_time,
+        "n_train": len(train),
+        "pid": os.getpid(),
+    }
+
+
+def _default_factory(name, params):
+    # Imported lazily: train_model pulls in mlflow
+    from src.models.train_model import get_model_instance
+    return get_model_instance(name, params)
+
+
+def run_search(X_train, y_train, X_test, y_test, grids: dict = None, journal: TrialJournal = None,
+               model_factory=None, eta: int = 3, min_fraction: float = 0.1, cv: int = 3,
+               n_jobs: int = None, seed: int = 42) -> tuple:
+    """
+    Successive-halving search over every family in ``grids`` on one process pool.
+
+    Args:
+        grids: Family name -> parameter grid (default: DEFAULT_GRIDS)
+        journal: Where finished fold fits are recorded and looked up (default: in memory)
+        model_factory: (family, params) -> unfitted estimator (default: train_model.get_model_instance)
+        eta: Keep the best 1/eta candidates per rung and give them eta times the rows
+        min_fraction: Smallest fraction of a training fold a candidate is fitted on
+        cv: Number of folds
+        n_jobs: Global core budget (default: all cores)
+        seed: Seed of the per-fold row subsamples
+
+    Returns:
+        Tuple of (results, report): results maps each family to its winner
+        refit on the full training set (model, params, cv_score, mae, mse,
+        rmse, r2); report has the study key, the candidates of each rung and
+        how many fold fits ran or were reused from the journal
+    """
+    grids = DEFAULT_GRIDS if grids is None else grids
+    journal = journal or TrialJournal(":memory:")
+    model_factory = model_factory or _default_factory
+    n_jobs = n_jobs or os.cpu_count() or 1
+    X_train = np.asarray(X_train, dtype=np.float64)
+    y_train = np.asarray(y_train, dtype=np.float64)
+
+    study = study_key(X_train, y_train, cv, eta, min_fraction, seed)
+    journal.start_study(study, {"shape": list(X_train.shape), "cv": cv, "eta": eta,
+                                "min_fraction": min_fraction, "seed": seed})
+    survivors = {name: list(ParameterGrid(grid or {})) for name, grid in grids.items()}
+    fractions = rung_fractions(eta, min_fraction)
+    folds = list(KFold(n_splits=cv).split(X_train))
+    logger.info(f"Study {study}: {sum(map(len, survivors.values()))} candidates, rungs {fractions}")
+
+    start_time = time.perf_counter()
+    rungs, cv_scores, n_fits, n_reused, fit_seconds = [], {}, 0, 0, 0.0
+    workdir = tempfile.mkdtemp(prefix="hyperparam-search-")
+    try:
+        with MemorySampler() as sampler, Parallel(n_jobs=n_jobs, return_as="generator") as parallel:
+            paths = share_arrays(workdir, X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test)
+            for rung, fraction in enumerate(fractions):
+                final = rung == len(fractions) - 1
+                # A family down to one candidate skips to the full-data rung
+                active = {name: c for name, c in survivors.items() if final or len(c) > 1}
+                scores, tasks = {}, []
+                for name, candidates in active.items():
+                    for i, params in enumerate(candidates):
+                        done = journal.scores(study, name, params, fraction)
+                        scores[name, i] = dict(done)
+                        n_reused += len(done)
+                        tasks += [(name, i, fold) for fold in range(cv) if fold not in done]
+
+                results = parallel(
+                    delayed(_fit_fold)(
+                        single_threaded(model_factory(name, active[name][i])), paths["X_train"], paths["y_train"],
+                        _subsample(folds[fold][0], fraction, fold, seed), folds[fold][1],
+                    )
+                    for name, i, fold in tasks
+                )
+                # Generator first, so it is run to completion and the pool is free for the next rung
+                for result, (name, i, fold) in zip(results, tasks):
+                    # Journaled as each fit finishes, so an interrupted rung resumes where it stopped
+                    journal.record(study, name, active[name][i], fraction, fold, result)
+                    scores[name, i][fold] = result["score"]
+                    fit_seconds += result["fit_time"]
+                    n_fits += 1
+
+                means = {key: float(np.mean(list(s.values()))) for key, s in scores.items()}
+                rungs.append({"fraction": fraction, "candidates": {n: len(c) for n, c in active.items()}})
+                for name, candidates in active.items():
+                    ranked = sorted(range(len(candidates)), key=lambda i: means[name, i], reverse=True)
+                    keep = 1 if final else math.ceil(len(candidates) / eta)
+                    survivors[name] = [candidates[i] for i in ranked[:keep]]
+                    if final:
+                        cv_scores[name] = means[name, ranked[0]]
+                logger.info(f"Rung {rung} ({fraction:g} of each fold): {rungs[-1]['candidates']}")
+
+            finals = list(parallel(
+                delayed(fit_final)(model_factory(name, survivors[name][0]), {}, paths) for name in grids
+            ))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        name: dict(final, params=survivors[name][0], cv_score=cv_scores[name])
+        for name, final in zip(grids, finals)
+    }
+    wall_seconds = time.perf_counter() - start_time
+    report = {
+        "study": study,
+        "journal": journal.path,
+        "rungs": rungs,
+        "n_fits": n_fits,
+        "n_reused": n_reused,
+        "wall_seconds": round(wall_seconds, 3),
+        "fit_seconds": round(fit_seconds, 3),
+        "peak_rss_bytes": sampler.peak_rss,
+        "peak_pss_bytes": sampler.peak_pss,
+    }
+    logger.info(
+        f"Search finished in {wall_seconds:.1f}s: {n_fits} fits run, {n_reused} reused from {journal.path}"
+    )
+    return results, report
+
+
+def write_model_config(path, name: str, model, r2: float, mae: float):
+    """Set the selected model in model_config.yaml, keeping its other settings."""
+    config = {}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            config = yaml.safe_load(f) or {}
+    model_cfg = config.setdefault('model', {})
+    model_cfg.setdefault('name', 'house_price_model')
+    model_cfg.setdefault('target_variable', 'price')
+    model_cfg.update({
+        'best_model': name,
+        'parameters': model.get_params(),
+        'r2_score': float(r2),
+        'mae': float(mae),
+    })
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        yaml.dump(config, f)
+
+# -----------------------------
+# Argument parser
+# -----------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-halving model search with a resumable journal.")
+    parser.add_argument("--data", type=str, required=True,
+                        help="Path to the feature store or processed CSV dataset")
+    parser.add_argument("--target", type=str, default="price", help="Target column")
+    parser.add_argument("--config", type=str, default="models/model_config.yaml",
+                        help="model_config.yaml to write the selected model to")
+    parser.add_argument("--grids", type=str, default=None,
+                        help="YAML file of family -> parameter grid (default: the create_new_model.py grids)")
+    parser.add_argument("--journal", type=str, default=DEFAULT_JOURNAL, help="SQLite trial journal")
+    parser.add_argument("--eta", type=int, default=3, help="Keep the best 1/eta candidates per rung")
+    parser.add_argument("--min-fraction", type=float, default=0.1,
+                        help="Fraction of each training fold used by the first rung")
+    parser.add_argument("--cv", type=int, default=3)
+    parser.add_argument("--n-jobs", type=int, default=int(os.getenv("TRAIN_N_JOBS", os.cpu_count() or 1)))
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+# -----------------------------
+# Main logic
+# -----------------------------
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    grids = DEFAULT_GRIDS
+    if args.grids:
+        with open(args.grids, 'r') as f:
+            grids = yaml.safe_load(f)
+
+    # Dense: the search shares arrays between its workers, and XGBoost would
+    # read a sparse matrix's zeros as missing values
+    X, y, _ = load_xy(args.data, args.target, dense=True)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    journal = TrialJournal(args.journal)
+    try:
+        results, report = run_search(
+            X_train, y_train, X_test, y_test, grids=grids, journal=journal, eta=args.eta,
+            min_fraction=args.min_fraction, cv=args.cv, n_jobs=args.n_jobs, seed=args.seed,
+        )
+    finally:
+        journal.close()
+
+    for name, result in results.items():
+        print(f"{name} CV R2: {result['cv_score']:.4f}, test R2: {result['r2']:.4f}, "
+              f"RMSE: {result['rmse']:.2f}, params: {result['params']}")
+    best_name = max(results, key=lambda name: results[name]['r2'])
+    best = results[best_name]
+    write_model_config(args.config, best_name, best['model'], best['r2'], best['mae'])
+    print(f"Best Model: {best_name} (R² {best['r2']:.4f}); saved to {args.config}")
+    print(f"{report['n_fits']} fold fits run, {report['n_reused']} reused from {report['journal']} "
+          f"(study {report['study']}) in {report['wall_seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""
+Incremental model update from buffered feedback.
+
+Instead of a full retrain over the whole CSV, this job continues training the
+served model on the feedback the API has collected since the last promotion
+(``POST /feedback``, see src/api/feedback.py):
+
+1. Read the new rows of every feedback file, from the byte offsets recorded
+   at the last promotion.
+2. Extend the preprocessor's one-hot vocabularies with ``Kota/Kab`` (or other
+   categorical) values it has never seen. Only the affected vocabularies
+   change: each new set of values becomes an extra OneHotEncoder appended to
+   the ColumnTransformer, so every existing feature keeps its position and
+   the scaler and old vocabularies are left as fitted.
+3. Widen the model to the new feature count (existing trees never split on
+   the new columns, so its predictions do not change) and continue boosting:
+   ``--rounds`` more rounds for XGBoost, warm-started stages for
+   GradientBoosting.
+4. Score the candidate and the current model on a holdout: part of the new
+   feedback plus, optionally, a reference CSV such as final.csv. The
+   candidate is promoted only if its MAE is lower. The feedback rows held out
+   are kept in the feedback directory on promotion and join the training data
+   of the next update, so no feedback is left out of the model for good.
+
+Promotion replaces the preprocessor and then the model file atomically, after
+copying the previous ones to ``*.prev.pkl``. A running API picks the new
+pair up through its artifact watcher or ``/admin/reload``.
+
+Usage:
+    python -m src.models.incremental_update --model models/modelbaru.pkl \
+        --preprocessor models/barupreprocessor.pkl --holdout final.csv
+"""
+import argparse
+import copy
+import io
+import json
+import logging
+import os
+import shutil
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.preprocessing import OneHotEncoder
+
+from src.api import inference
+from src.api.feedback import FEEDBACK_COLUMNS, FEEDBACK_DIR, FILE_PREFIX
+from src.data.ingest import read_listings
+
+# -----------------------------
+# Configure logging
+# -----------------------------
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "_consumed.json"
+HOLDOUT_NAME = "_holdout.csv"
+VOCAB_PREFIX = "vocab_"
+
+# -----------------------------
+# Argument parser
+# -----------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Continue training the served model on buffered feedback.")
+    parser.add_argument("--feedback-dir", type=str, default=str(FEEDBACK_DIR), help="Directory of feedback CSVs")
+    parser.add_argument("--model", type=str, default=str(inference.MODEL_PATH), help="Path to model .pkl")
+    parser.add_argument("--preprocessor", type=str, default=str(inference.PREPROCESSOR_PATH),
+                        help="Path to preprocessor .pkl")
+    parser.add_argument("--holdout", type=str, default=None,
+                        help="Reference CSV in final.csv format added to the holdout, e.g. final.csv")
+    parser.add_argument("--holdout-fraction", type=float, default=0.2,
+                        help="Fraction of the new feedback held out for the comparison")
+    parser.add_argument("--rounds", type=int, default=50, help="Boosting rounds (stages) to add")
+    parser.add_argument("--min-rows", type=int, default=20, help="Skip the update below this many new rows")
+    parser.add_argument("--min-improvement", type=float, default=0.0,
+                        help="Required relative MAE improvement on the holdout to promote")
+    parser.add_argument("--bundle-dir", type=str, default=None,
+                        help="Also export a memory-mapped inference bundle here on promotion")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dry-run", action="store_true", help="Evaluate without promoting")
+    return parser.parse_args(argv)
+
+# -----------------------------
+# Feedback
+# -----------------------------
+def load_offsets(directory) -> dict:
+    """Byte offsets of the feedback already used by a promoted model, per file."""
+    path = Path(directory) / STATE_NAME
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f).get("offsets", {})
+
+
+def save_offsets(directory, offsets: dict, **info):
+    path = Path(directory) / STATE_NAME
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(dict(info, offsets=offsets), f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_holdout(directory) -> pd.DataFrame:
+    """Feedback rows held out by the last promoted update, to be trained on by the next one."""
+    path = Path(directory) / HOLDOUT_NAME
+    if not path.exists():
+        return pd.DataFrame(columns=inference.CSV_COLS + ["Price"])
+    return read_listings(path, dropna_price=True)
+
+
+def save_holdout(directory, frame: pd.DataFrame):
+    path = Path(directory) / HOLDOUT_NAME
+    tmp = path.with_name(f".{path.name}.tmp")
+    frame[inference.CSV_COLS + ["Price"]].to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def read_feedback(directory, offsets: dict = None) -> tuple:
+    """
+    Read the complete feedback rows written after ``offsets``.
+
+    Returns:
+        Tuple of (typed listings DataFrame, offsets after the rows read)
+    """
+    offsets = dict(offsets or {})
+    header = ",".join(FEEDBACK_COLUMNS).encode("utf-8") + b"\n"
+    body = []
+    for path in sorted(Path(directory).glob(f"{FILE_PREFIX}*.csv")):
+        start = offsets.get(path.name, 0)
+        if start > path.stat().st_size:
+            logger.warning(f"{path} is shorter than its recorded offset; reading it from the start")
+            start = 0
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read()
+        # A row still being appended is left for the next run
+        data = data[:data.rfind(b"\n") + 1]
+        offsets[path.name] = start + len(data)
+        if start == 0:
+            data = data.partition(b"\n")[2]
+        body.append(data)
+
+    data = b"".join(body)
+    if not data:
+        return pd.DataFrame(columns=inference.CSV_COLS + ["Price"]), offsets
+    frame = read_listings(io.BytesIO(header + data), dropna_price=True)
+    frame = frame.dropna(subset=inference.CSV_COLS).reset_index(drop=True)
+    return frame, offsets
+
+
+def _features(frame: pd.DataFrame) -> pd.DataFrame:
+    """Engineered model inputs, as the API computes them."""
+    columns = {c: frame[c].astype(float if c in inference.NUMERIC_COLS else object) for c in inference.CSV_COLS}
+    return inference._engineer_features(pd.DataFrame(columns))
+
+# -----------------------------
+# Vocabularies and model width
+# -----------------------------
+def _one_hot_encoders(preproc):
+    """(transformer index, encoder, columns) of each fitted OneHotEncoder in the ColumnTransformer."""
+    for i, (_, transformer, columns) in enumerate(preproc.transformers_):
+        steps = getattr(transformer, 'steps', [(None, transformer)])
+        encoder = steps[-1][1]
+        if isinstance(encoder, OneHotEncoder) and isinstance(columns, (list, tuple)):
+            yield i, encoder, list(columns)
+
+
+def vocabularies(preproc) -> dict:
+    """Known categories of each one-hot encoded input column."""
+    known = {}
+    for _, encoder, columns in _one_hot_encoders(preproc):
+        for column, categories in zip(columns, encoder.categories_):
+            known.setdefault(column, set()).update(categories.tolist())
+    return known
+
+
+def extend_vocabulary(preproc, X: pd.DataFrame) -> tuple:
+    """
+    Add the categories of X that the preprocessor has never seen.
+
+    The fitted transformers are kept as they are, except that encoders of
+    affected columns ignore values they do not know instead of raising. One
+    OneHotEncoder per affected column is appended, so new features come after
+    every existing one.
+
+    Returns:
+        Tuple of (preprocessor, {column: [new values]}); the preprocessor is
+        the original object if nothing is new
+
+    Raises:
+        ValueError: If the preprocessor cannot be extended without moving features
+    """
+    if not isinstance(preproc, ColumnTransformer) or not hasattr(preproc, 'feature_names_in_'):
+        raise ValueError("Only a ColumnTransformer fitted on a DataFrame can be extended")
+    known = vocabularies(preproc)
+    added = {}
+    for column, categories in known.items():
+        values = pd.unique(X[column].dropna())
+        new = sorted(str(v) for v in values if v not in categories)
+        if new:
+            added[column] = new
+    if not added:
+        return preproc, {}
+
+    base = copy.deepcopy(preproc)
+    for _, encoder, columns in _one_hot_encoders(base):
+        if any(c in added for c in columns):
+            encoder.handle_unknown = 'ignore'
+
+    n_existing = sum(name.startswith(VOCAB_PREFIX) for name, _, _ in preproc.transformers_)
+    extensions = [
+        (f"{VOCAB_PREFIX}{n_existing + k}",
+         OneHotEncoder(categories=[values], handle_unknown='ignore', sparse_output=False),
+         [column])
+        for k, (column, values) in enumerate(added.items(), start=1)
+    ]
+    # Fit a ColumnTransformer with the same layout on a frame of the categories
+    # of the first encoder of each column (the appended ones accept anything),
+    # then put the fitted originals back in place
+    fit_categories = {}
+    for _, encoder, columns in _one_hot_encoders(preproc):
+        for column, categories in zip(columns, encoder.categories_):
+            fit_categories.setdefault(column, categories)
+    length = max(len(categories) for categories in fit_categories.values())
+    frame = pd.DataFrame({c: np.zeros(length) for c in preproc.feature_names_in_})
+    for column, categories in fit_categories.items():
+        frame[column] = np.resize(np.asarray(categories, dtype=object), length)
+
+    extended = ColumnTransformer(
+        [(name, transformer, columns) for name, transformer, columns in preproc.transformers] + extensions,
+        remainder=preproc.remainder,
+        sparse_threshold=preproc.sparse_threshold,
+    )
+    extended.fit(frame)
+    for i, fitted in enumerate(base.transformers_):
+        if fitted[0] != 'remainder':
+            extended.transformers_[i] = fitted
+    extended.sparse_output_ = preproc.sparse_output_
+
+    before = np.asarray(_transform(preproc, frame))
+    after = np.asarray(_transform(extended, frame))
+    if after.shape[1] != before.shape[1] + sum(len(v) for v in added.values()) or \
+            not np.allclose(after[:, :before.shape[1]], before, equal_nan=True):
+        raise ValueError("Extending the vocabulary would move existing features; run a full retrain")
+    return extended, added
+
+
+def _dense(X):
+    return X.toarray() if hasattr(X, 'toarray') else X
+
+
+def _transform(preproc, frame: pd.DataFrame):
+    """Dense transform; new values in an extended column are expected to be unknown to its first encoder."""
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Found unknown categories", category=UserWarning)
+        return _dense(preproc.transform(frame))
+
+
+def widen_model(model, n_features: int):
+    """
+    Copy of a tree boosting model that accepts ``n_features`` inputs.
+
+    The extra inputs are appended after the existing ones and are not used by
+    any existing tree, so predictions on the existing features are unchanged.
+
+    Raises:
+        ValueError: If the model type cannot be widened
+    """
+    current = model.n_features_in_
+    if n_features == current:
+        return model
+    if n_features < current:
+        raise ValueError(f"Cannot narrow a model from {current} to {n_features} features")
+
+    if isinstance(model, GradientBoostingRegressor):
+        # Tree is not public API, but its pickled state is the documented way to rebuild one
+        from sklearn.tree._tree import Tree
+
+        widened = copy.deepcopy(model)
+        for estimator in widened.estimators_.ravel():
+            tree = Tree(n_features, estimator.tree_.n_classes, estimator.tree_.n_outputs)
+            tree.__setstate__(estimator.tree_.__getstate__())
+            estimator.tree_ = tree
+            estimator.n_features_in_ = n_features
+            if estimator.max_features_ == current:
+                estimator.max_features_ = n_features
+        widened.n_features_in_ = n_features
+        if widened.max_features_ == current:
+            widened.max_features_ = n_features
+        return widened
+
+    if type(model).__name__ == 'XGBRegressor':
+        booster = json.loads(bytes(model.get_booster().save_raw('json')))
+        booster['learner']['learner_model_param']['num_feature'] = str(n_features)
+        widened = copy.deepcopy(model)
+        widened.get_booster().load_model(bytearray(json.dumps(booster).encode('utf-8')))
+        return widened
+
+    raise ValueError(f"{type(model).__name__} cannot be updated incrementally; run a full retrain")
+
+
+def continue_training(model, X, y, rounds: int):
+    """
+    Continue boosting a fitted model on new data.
+
+    XGBoost adds ``rounds`` boosting rounds on top of the existing booster;
+    GradientBoosting warm-starts ``rounds`` more stages. X must have the
+    model's input width (see widen_model).
+
+    Raises:
+        ValueError: For model types without incremental training
+    """
+    if isinstance(model, GradientBoostingRegressor):
+        candidate = copy.deepcopy(model)
+        candidate.set_params(warm_start=True, n_estimators=model.estimators_.shape[0] + rounds)
+        candidate.fit(X, y)
+        candidate.set_params(warm_start=model.warm_start)
+        return candidate
+
+    if type(model).__name__ == 'XGBRegressor':
+        booster = model.get_booster()
+        total = booster.num_boosted_rounds() + rounds
+        candidate = type(model)(**dict(model.get_params(), n_estimators=rounds))
+        candidate.fit(X, y, xgb_model=booster)
+        candidate.set_params(n_estimators=total)
+        return candidate
+
+    raise ValueError(f"{type(model).__name__} cannot be updated incrementally; run a full retrain")
+
+
+def evaluate(model, X, y) -> dict:
+    predictions = np.asarray(model.predict(X), dtype=float)
+    return {
+        "mae": float(mean_absolute_error(y, predictions)),
+        "rmse": float(np.sqrt(mean_squared_error(y, predictions))),
+        "r2": float(r2_score(y, predictions)) if len(y) > 1 else None,
+    }
+
+# -----------------------------
+# Main logic
+# -----------------------------
+def _atomic_dump(obj, path: Path):
+    """Replace path with obj; the previous file is kept as *.prev.pkl."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    joblib.dump(obj, tmp)
+    if path.exists():
+        shutil.copy2(path, path.with_name(f"{path.stem}.prev{path.suffix}"))
+    os.replace(tmp, path)
+
+
+def _reference_holdout(path, preproc) -> pd.DataFrame:
+    """Reference listings the preprocessor can encode."""
+    frame = read_listings(path, dropna_price=True).dropna(subset=inference.CSV_COLS)
+    encodable = np.ones(len(frame), dtype=bool)
+    for column, categories in vocabularies(preproc).items():
+        encodable &= frame[column].astype(object).isin(categories).to_numpy()
+    if not encodable.all():
+        logger.info(f"Holdout: skipped {int((~encodable).sum())} reference rows with unknown categories")
+    return frame[encodable].reset_index(drop=True)
+
+
+def run_update(args) -> dict:
+    """Train, compare and (unless --dry-run) promote a candidate; returns a report."""
+    start_time = time.perf_counter()
+    offsets = load_offsets(args.feedback_dir)
+    feedback, new_offsets = read_feedback(args.feedback_dir, offsets)
+    report = {"rows": len(feedback), "promoted": False}
+    if len(feedback) < args.min_rows:
+        report["reason"] = f"{len(feedback)} new feedback rows, fewer than --min-rows {args.min_rows}"
+        logger.info(report["reason"])
+        return report
+
+    model, preproc = inference._load_artifacts(args.model, args.preprocessor)
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(feedback))
+    n_holdout = max(1, int(round(len(feedback) * args.holdout_fraction)))
+    train, holdout = feedback.iloc[order[n_holdout:]], feedback.iloc[order[:n_holdout]]
+    feedback_holdout = holdout
+    # The rows held out last time were never trained on; they join this round's training data
+    carried = load_holdout(args.feedback_dir)
+    seen = feedback
+    if len(carried):
+        train = pd.concat([train, carried], ignore_index=True)
+        seen = pd.concat([feedback, carried], ignore_index=True)
+    if args.holdout:
+        holdout = pd.concat([holdout, _reference_holdout(args.holdout, preproc)], ignore_index=True)
+
+    candidate_preproc, added = extend_vocabulary(preproc, _features(seen))
+    for column, values in added.items():
+        logger.info(f"New {column} values: {', '.join(values)}")
+    X_train = _transform(candidate_preproc, _features(train))
+    X_holdout = _transform(candidate_preproc, _features(holdout))
+
+    # The current model on the widened features predicts exactly as it does in
+    # production, with unseen categories encoded as all zeros
+    current = widen_model(model, X_train.shape[1])
+    candidate = continue_training(current, X_train, train["Price"].to_numpy(), args.rounds)
+
+    y_holdout = holdout["Price"].to_numpy()
+    report.update({
+        "train_rows": len(train),
+        "carried_rows": len(carried),
+        "holdout_rows": len(holdout),
+        "added_categories": added,
+        "rounds": args.rounds,
+        "current": evaluate(current, X_holdout, y_holdout),
+        "candidate": evaluate(candidate, X_holdout, y_holdout),
+    })
+    threshold = report["current"]["mae"] * (1 - args.min_improvement)
+    logger.info(f"Holdout MAE ({len(holdout)} rows): current {report['current']['mae']:,.0f}, "
+                f"candidate {report['candidate']['mae']:,.0f}")
+
+    if report["candidate"]["mae"] >= threshold:
+        report["reason"] = "Candidate does not beat the current model on the holdout"
+    elif args.dry_run:
+        report["reason"] = "Dry run"
+    else:
+        # Preprocessor first: a reload between the two files fails its smoke test and keeps the old pair
+        _atomic_dump(candidate_preproc, Path(args.preprocessor))
+        _atomic_dump(candidate, Path(args.model))
+        save_holdout(args.feedback_dir, feedback_holdout)
+        save_offsets(args.feedback_dir, new_offsets, promoted_at=datetime.utcnow().isoformat() + "Z")
+        report["promoted"] = True
+        report["model_version"] = inference._artifact_digest(args.model, args.preprocessor)
+        if args.bundle_dir:
+            from src.api.mmap_bundle import export_bundle
+            try:
+                export_bundle(candidate, candidate_preproc, args.bundle_dir)
+            except Exception as e:
+                logger.warning(f"Skipped inference bundle export: {e}")
+    report["seconds"] = round(time.perf_counter() - start_time, 3)
+    logger.info(f"Promoted: {report['promoted']}" + (f" ({report['reason']})" if "reason" in report else ""))
+    return report
+
+
+def main(argv=None) -> dict:
+    report = run_update(parse_args(argv))
+    print(json.dumps(report, indent=2))
+    return report
+
+if __name__ == "__main__":
+    main()
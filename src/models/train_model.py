@@ -14,8 +14,15 @@ import logging
 import os
 from mlflow.tracking import MlflowClient
 import platform
+import sys
+from pathlib import Path
 import sklearn
 
+# Allow `python src/models/train_model.py` to import the src package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.api.mmap_bundle import export_bundle
+from src.features.store import load_xy
+
 # -----------------------------
 # Configure logging
 # -----------------------------
@@ -31,6 +38,10 @@ def parse_args():
     parser.add_argument("--data", type=str, required=True, help="Path to processed CSV dataset")
     parser.add_argument("--models-dir", type=str, required=True, help="Directory to save trained model")
     parser.add_argument("--mlflow-tracking-uri", type=str, default=None, help="MLflow tracking URI")
+    parser.add_argument("--preprocessor", type=str, default=None,
+                        help="Path to the fitted preprocessor .pkl to bundle with the model")
+    parser.add_argument("--bundle-dir", type=str, default=None,
+                        help="Export a memory-mappable inference bundle here (needs --preprocessor)")
     return parser.parse_args()
 
 # -----------------------------
@@ -61,12 +72,12 @@ def main(args):
         mlflow.set_experiment(model_cfg['name'])
 
     # Load data
-    data = pd.read_csv(args.data)
     target = model_cfg['target_variable']
 
-    # Use all features except the target variable
-    X = data.drop(columns=[target])
-    y = data[target]
+    # Use all features except the target variable, from the binary feature
+    # store or parsed from a featured CSV. Dense, as the API serves it: XGBoost
+    # would read a sparse matrix's zeros as missing values
+    X, y, _ = load_xy(args.data, target, dense=True)
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
     # Get model
@@ -171,6 +182,17 @@ def main(args):
     logger.info(f"Saved trained model to: {save_path}")
     logger.info(f"Final MAE: {mae:.2f}, R²: {r2:.4f}")
 
+    # Export a memory-mappable inference bundle for the API (MODEL_BUNDLE_DIR)
+    if args.bundle_dir:
+        if not args.preprocessor:
+            logger.warning("--bundle-dir requires --preprocessor; skipping bundle export")
+        else:
+            try:
+                bundle_version = export_bundle(model, joblib.load(args.preprocessor), args.bundle_dir)
+                logger.info(f"Exported inference bundle {bundle_version} to {args.bundle_dir}")
+            except Exception as e:
+                logger.warning(f"Skipped inference bundle export: {e}")
+
 if __name__ == "__main__":
     args = parse_args()
     main(args)
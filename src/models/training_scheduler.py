@@ -0,0 +1,222 @@
+"""
+Concurrent training scheduler for the model comparison.
+
+Instead of one GridSearchCV(n_jobs=-1) per model family, run one after
+another, every (family, candidate, fold) fit of every family is scheduled on a
+single joblib process pool sized to one global core budget. Long fits are
+submitted first so the families finish together instead of the slowest one
+running alone at the end. Estimators are forced single-threaded so the pool
+size is the real core count in use.
+
+The training matrix is written once to .npy files. Tasks carry only the file
+paths, and each worker opens them once with ``mmap_mode='r'``, so every worker
+reads the same page-cache pages instead of receiving a pickled copy of the
+matrix per task.
+
+Wall-clock time, summed fit time and the peak RSS/PSS of the scheduler and its
+workers are reported with the results.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid
+
+from src.api import memory
+
+logger = logging.getLogger(__name__)
+
+
+# Memory maps opened by this (worker) process, by path
+_opened = {}
+
+
+def share_arrays(directory, **arrays) -> dict:
+    """Write arrays to directory as float64 .npy files; returns name -> path."""
+    paths = {}
+    for name, array in arrays.items():
+        path = Path(directory) / f"{name}.npy"
+        np.save(path, np.ascontiguousarray(np.asarray(array, dtype=np.float64)), allow_pickle=False)
+        paths[name] = str(path)
+    return paths
+
+
+def open_shared(path: str) -> np.ndarray:
+    """Read-only memory map of a shared array, opened once per process."""
+    array = _opened.get(path)
+    if array is None:
+        array = _opened[path] = np.load(path, mmap_mode="r")
+    return array
+
+
+def single_threaded(estimator):
+    """Make the estimator use one core; parallelism comes from the scheduler."""
+    if "n_jobs" in estimator.get_params():
+        estimator.set_params(n_jobs=1)
+    return estimator
+
+
+def _estimated_cost(params: dict) -> float:
+    """Rough relative fit cost, used only to submit long fits first."""
+    return float(params.get("n_estimators", 1)) * float(params.get("max_depth") or 16)
+
+
+def _fit_and_score(estimator, params: dict, X_path: str, y_path: str, train, test) -> dict:
+    X, y = open_shared(X_path), open_shared(y_path)
+    model = single_threaded(clone(estimator).set_params(**params))
+    start_time = time.perf_counter()
+    model.fit(X[train], y[train])
+    fit_time = time.perf_counter() - start_time
+    score = r2_score(y[test], model.predict(X[test]))
+    return {"fit_time": fit_time, "score": float(score), "pid": os.getpid()}
+
+
+def fit_final(estimator, params: dict, paths: dict) -> dict:
+    """Fit on the shared training set and score on the shared test set."""
+    X_train, y_train = open_shared(paths["X_train"]), open_shared(paths["y_train"])
+    X_test, y_test = open_shared(paths["X_test"]), open_shared(paths["y_test"])
+    model = single_threaded(clone(estimator).set_params(**params))
+    start_time = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start_time
+    y_pred = model.predict(X_test)
+    mse = mean_squared_error(y_test, y_pred)
+    return {
+        "model": model,
+        "fit_time": fit_time,
+        "mae": mean_absolute_error(y_test, y_pred),
+        "mse": mse,
+        "rmse": float(np.sqrt(mse)),
+        "r2": r2_score(y_test, y_pred),
+    }
+
+
+class MemorySampler:
+    """Track the peak summed RSS/PSS of this process and its children in a background thread."""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_pss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+
+    def sample(self):
+        pid = os.getpid()
+        processes = [memory.process_memory(p) for p in [pid] + memory.child_pids(pid)]
+        self.peak_rss = max(self.peak_rss, sum(p["rss"] or 0 for p in processes))
+        self.peak_pss = max(self.peak_pss, sum(p["pss"] or 0 for p in processes))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+def run_model_search(models: dict, grids: dict, X_train, y_train, X_test, y_test,
+                     n_jobs: int = None, cv: int = 3) -> tuple:
+    """
+    Grid search every model family concurrently on one shared process pool.
+
+    Candidates are ranked by mean R² over ``cv`` folds (the same KFold split
+    GridSearchCV uses for regressors); each family's best candidate is then
+    refit on the full training set and evaluated on the test set.
+
+    Args:
+        models: Family name -> unfitted estimator
+        grids: Family name -> parameter grid ({} fits the estimator as is)
+        n_jobs: Global core budget (default: all cores)
+        cv: Number of folds
+
+    Returns:
+        Tuple of (results, report): results maps each family to a dict with
+        mae, mse, rmse, r2, model, params and cv_score; report has wall-clock
+        time, summed fit time and peak memory of the whole comparison
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    workdir = tempfile.mkdtemp(prefix="model-search-")
+    try:
+        with MemorySampler() as sampler:
+            paths = share_arrays(workdir, X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test)
+            folds = list(KFold(n_splits=cv).split(np.empty((len(y_train), 0))))
+
+            tasks = [
+                (name, i, fold, params)
+                for name in models
+                for i, params in enumerate(ParameterGrid(grids.get(name) or {}))
+                for fold in range(cv)
+            ]
+            tasks.sort(key=lambda task: _estimated_cost(task[3]), reverse=True)
+            logger.info(f"Scheduling {len(tasks)} fits of {len(models)} model families on {n_jobs} cores")
+
+            with Parallel(n_jobs=n_jobs) as parallel:
+                scores = parallel(
+                    delayed(_fit_and_score)(models[name], params, paths["X_train"], paths["y_train"],
+                                            *folds[fold])
+                    for name, _, fold, params in tasks
+                )
+
+                cv_results = {}
+                for (name, i, _, params), score in zip(tasks, scores):
+                    entry = cv_results.setdefault((name, i), {"params": params, "scores": [], "fit_time": 0.0})
+                    entry["scores"].append(score["score"])
+                    entry["fit_time"] += score["fit_time"]
+
+                best = {}
+                for (name, _), entry in cv_results.items():
+                    entry["mean_score"] = float(np.mean(entry["scores"]))
+                    if name not in best or entry["mean_score"] > best[name]["mean_score"]:
+                        best[name] = entry
+
+                finals = parallel(
+                    delayed(fit_final)(models[name], best[name]["params"], paths)
+                    for name in models
+                )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {}
+    for name, final in zip(models, finals):
+        results[name] = dict(final, params=best[name]["params"], cv_score=best[name]["mean_score"])
+
+    wall_seconds = time.perf_counter() - start_time
+    fit_seconds = sum(s["fit_time"] for s in scores) + sum(f["fit_time"] for f in finals)
+    report = {
+        "n_jobs": n_jobs,
+        "n_fits": len(tasks) + len(finals),
+        "wall_seconds": round(wall_seconds, 3),
+        "fit_seconds": round(fit_seconds, 3),
+        "peak_rss_bytes": sampler.peak_rss,
+        "peak_pss_bytes": sampler.peak_pss,
+        "families": {
+            name: {
+                "candidates": sum(1 for key in cv_results if key[0] == name),
+                "fit_seconds": round(sum(e["fit_time"] for key, e in cv_results.items() if key[0] == name), 3),
+                "cv_score": results[name]["cv_score"],
+            }
+            for name in models
+        },
+    }
+    logger.info(
+        f"Model search finished in {wall_seconds:.1f}s wall ({fit_seconds:.1f}s of fitting on {n_jobs} cores), "
+        f"peak memory {sampler.peak_rss / (1 << 20):.0f}MB RSS / {sampler.peak_pss / (1 << 20):.0f}MB PSS"
+    )
+    return results, report
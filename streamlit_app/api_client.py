@@ -0,0 +1,137 @@
+# streamlit_app/api_client.py
+"""
+HTTP client for the prediction API, shared across Streamlit reruns.
+
+Streamlit re-executes app.py on every interaction. One ``ApiClient`` per API
+URL is kept with ``st.cache_resource``, so reruns reuse:
+
+- a ``requests.Session`` with a keep-alive connection pool, instead of a new
+  TCP (and TLS) connection per call;
+- the result of the last ``/health`` probe for ``health_ttl`` seconds;
+- responses to ``/predict`` and ``/predict/sweep`` payloads already sent, for
+  ``cache_ttl`` seconds (LRU, ``cache_size`` entries). A rerun that does not
+  change the inputs shows the previous answer without a request.
+
+The client is shared by every browser session of the Streamlit server, so
+all state is guarded by a lock.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ApiError(Exception):
+    """Raised when the API answers with an error status."""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"API error [{status_code}]: {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+class ApiClient:
+    """
+    Pooled, caching client for one prediction API.
+
+    Args:
+        base_url: API root, e.g. http://localhost:8000
+        health_ttl: Seconds a health probe result is reused
+        health_timeout: Timeout of the health probe in seconds
+        cache_size: Prediction responses kept (0 disables the cache)
+        cache_ttl: Seconds a prediction response is reused
+        pool_size: Keep-alive connections kept open to the API
+    """
+
+    def __init__(self, base_url: str, health_ttl: float = 15.0, health_timeout: float = 2.0,
+                 cache_size: int = 256, cache_ttl: float = 300.0, pool_size: int = 4):
+        self.base_url = base_url.rstrip("/")
+        self.health_ttl = health_ttl
+        self.health_timeout = health_timeout
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._health = None
+        self._health_checked = float("-inf")
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def is_healthy(self) -> bool:
+        """Whether /health answered OK, probing at most once per health_ttl."""
+        with self._lock:
+            if time.monotonic() - self._health_checked < self.health_ttl:
+                return self._health
+        try:
+            healthy = self.session.get(f"{self.base_url}/health", timeout=self.health_timeout).ok
+        except requests.RequestException:
+            healthy = False
+        with self._lock:
+            self._health, self._health_checked = healthy, time.monotonic()
+        return healthy
+
+    def predict(self, payload: dict, timeout: float = 20.0) -> dict:
+        """
+        POST payload to /predict, or return the cached response to the same payload.
+
+        Raises:
+            ApiError: If the API answers with an error status
+            requests.RequestException: If the API cannot be reached
+        """
+        return self._post("/predict", payload, timeout)
+
+    def sweep(self, payload: dict, axes: list, timeout: float = 20.0) -> dict:
+        """
+        Predicted prices while the inputs in ``axes`` vary around payload (POST /predict/sweep).
+
+        Args:
+            payload: Base listing, as for predict()
+            axes: One or two dicts with feature ("LB", "LT", "KM" or "KT"), start, stop and num
+
+        Raises:
+            ApiError: If the API answers with an error status
+            requests.RequestException: If the API cannot be reached
+        """
+        return self._post("/predict/sweep", {"base": payload, "axes": axes}, timeout)
+
+    def _post(self, path: str, body: dict, timeout: float) -> dict:
+        key = json.dumps([path, body], sort_keys=True)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        resp = self.session.post(f"{self.base_url}{path}", json=body, timeout=timeout)
+        if not resp.ok:
+            raise ApiError(resp.status_code, resp.text)
+        result = resp.json()
+        with self._lock:
+            # A successful call also proves the API is up
+            self._health, self._health_checked = True, time.monotonic()
+            if self.cache_size > 0:
+                self._cache[key] = (time.monotonic(), result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def _cached(self, key: str):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.cache_ttl:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._cache[key]
+            self.misses += 1
+            return None
+
+    def close(self):
+        self.session.close()
@@ -1,10 +1,16 @@
 # streamlit_app/app.py
 import os
+import sys
+from pathlib import Path
 import pandas as pd
 import streamlit as st
-import requests
+from api_client import ApiClient, ApiError
 from translations import TRANSLATIONS
 
+# The shared CSV reader: src/ sits next to app.py in the image, one level up in the repo
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.data.ingest import read_listings
+
 # Page configuration
 st.set_page_config(page_title="House Price Prediction", page_icon="🏠", layout="wide")
 
@@ -24,6 +30,11 @@ def t(key):
     return TRANSLATIONS[current_lang].get(key, key)
 
 # ====== SETTINGS ======
+@st.cache_resource(max_entries=4)
+def get_api_client(api_url):
+    """One pooled, caching API client per URL, shared by every rerun and session."""
+    return ApiClient(api_url)
+
 def validate_env_vars():
     """Validate required environment variables."""
     # For Streamlit Cloud, use a mock/demo mode since FastAPI won't be running
@@ -40,17 +51,11 @@ def validate_env_vars():
     if is_streamlit_cloud:
         # st.info("🚀 Running in Streamlit Cloud - using demo mode (FastAPI not available)")
         api_url = "demo"  # Special marker for demo mode
-    else:
-        # Check if API is available, if not, fall back to demo mode
-        try:
-            import requests
-            response = requests.get(f"{api_url}/health", timeout=5)
-            if not response.ok:
-                # st.warning("⚠️ FastAPI server not responding. Falling back to demo mode.")
-                api_url = "demo"
-        except Exception as e:
-            # st.warning(f"⚠️ Cannot connect to FastAPI server: {e}. Falling back to demo mode.")
-            api_url = "demo"
+    elif not get_api_client(api_url).is_healthy():
+        # Check if API is available, if not, fall back to demo mode. The probe
+        # result is cached by the client, so reruns do not repeat it.
+        # st.warning("⚠️ FastAPI server not responding. Falling back to demo mode.")
+        api_url = "demo"
 
     # Validate CSV path exists or is default
     if csv_path != "final.csv" and not os.path.exists(csv_path):
@@ -74,12 +79,11 @@ with st.sidebar:
 
 @st.cache_data
 def load_options_from_csv(_file_like_or_path):
-    df = pd.read_csv(_file_like_or_path)
-    df.columns = [c.strip() for c in df.columns]
-    need = {"Provinsi", "Kota/Kab"}
-    missing = need - set(df.columns)
-    if missing:
-        raise ValueError(f"Kolom CSV kurang: {missing}. Pastikan ada 'Provinsi' dan 'Kota/Kab'.")
+    try:
+        # Only the two location columns, read as categoricals
+        df = read_listings(_file_like_or_path, columns=["Provinsi", "Kota/Kab"])
+    except ValueError as e:
+        raise ValueError(f"{e}. Pastikan ada 'Provinsi' dan 'Kota/Kab'.")
     provs = sorted(df["Provinsi"].dropna().astype(str).unique())
     mapping = (
         df.dropna(subset=["Provinsi", "Kota/Kab"])
@@ -146,6 +150,19 @@ ratio_bangunan = round(luas_bangunan / luas_tanah, 3) if auto_ratio and luas_tan
 if ratio_bangunan is not None:
     st.caption(f"📏 ratio_bangunan ruma (auto): {ratio_bangunan}")
 
+# Request body shared by the prediction and the what-if sweep
+payload = {
+    "LB": float(luas_bangunan),
+    "LT": float(luas_tanah),
+    "KM": int(kamar_mandi),
+    "KT": int(kamar_tidur),
+    "Provinsi": provinsi,
+    "Kota/Kab": kota_kab,
+    "Type": tipe
+}
+if ratio_bangunan is not None:
+    payload["ratio_bangunan ruma"] = float(ratio_bangunan)
+
 # ====== PREDICTION SECTION ======
 st.markdown("---")
 
@@ -182,33 +199,70 @@ with col_results:
 
         else:
             # Normal mode - call actual API
-            payload = {
-                "LB": float(luas_bangunan),
-                "LT": float(luas_tanah),
-                "KM": int(kamar_mandi),
-                "KT": int(kamar_tidur),
-                "Provinsi": provinsi,
-                "Kota/Kab": kota_kab,
-                "Type": tipe
-            }
-
-            if ratio_bangunan is not None:
-                payload["ratio_bangunan ruma"] = float(ratio_bangunan)
-
             try:
-                resp = requests.post(f"{api_url}/predict", json=payload, timeout=timeout)
-                if resp.ok:
-                    result = resp.json()
-                    prediction = result.get('prediction', 0)
-                    confidence = result.get('confidence_score', 0)
-                    price_range = result.get('price_range', (0, 0))
-                    model_name = result.get('model_name', 'Unknown')
-
-                    st.success(f"💰 {t('predicted_price')}: Rp {prediction:,.0f}")
-                    # st.info(f"🎯 {t('confidence_score')}: {confidence:.1%}")
-                    # st.info(f"📊 {t('price_range')}: Rp {price_range[0]:,.0f} - Rp {price_range[1]:,.0f}")
-                    # st.info(f"🤖 {t('model_used')}: {model_name}")
-                else:
-                    st.error(f"API error [{resp.status_code}]: {resp.text}")
+                result = get_api_client(api_url).predict(payload, timeout=timeout)
+                prediction = result.get('prediction', 0)
+                confidence = result.get('confidence_score', 0)
+                price_range = result.get('price_range', (0, 0))
+                model_name = result.get('model_name', 'Unknown')
+
+                st.success(f"💰 {t('predicted_price')}: Rp {prediction:,.0f}")
+                # st.info(f"🎯 {t('confidence_score')}: {confidence:.1%}")
+                # st.info(f"📊 {t('price_range')}: Rp {price_range[0]:,.0f} - Rp {price_range[1]:,.0f}")
+                # st.info(f"🤖 {t('model_used')}: {model_name}")
+            except ApiError as e:
+                st.error(str(e))
             except Exception as e:
                 st.error(f"{t('error_api')}: {e}")
+
+# ====== WHAT-IF SECTION ======
+# Range of each input the sweep can vary (the input widgets' ranges) and the
+# number of points along it. Counts only take whole values.
+SWEEP_RANGES = {
+    "LB": (t('square_footage'), 10, 1000, 50),
+    "LT": (t('land_area'), 10, 2000, 50),
+    "KT": (t('bedrooms'), 1, 7, 7),
+    "KM": (t('bathrooms'), 1, 6, 6),
+}
+# A second input is drawn as one line per value, so it gets a few points only
+SWEEP_SERIES_POINTS = 5
+
+if api_url != "demo":
+    st.markdown("---")
+    st.markdown(f"### 📈 {t('sweep_section')}")
+    col_axis, col_series = st.columns(2)
+    with col_axis:
+        sweep_feature = st.selectbox(t('sweep_axis'), list(SWEEP_RANGES),
+                                     format_func=lambda f: SWEEP_RANGES[f][0])
+    with col_series:
+        series_options = [None] + [f for f in SWEEP_RANGES if f != sweep_feature]
+        series_feature = st.selectbox(t('sweep_second_axis'), series_options,
+                                      format_func=lambda f: t('sweep_none') if f is None else SWEEP_RANGES[f][0])
+
+    if st.button(f"📈 {t('sweep_button')}"):
+        _, start, stop, num = SWEEP_RANGES[sweep_feature]
+        axes = [{"feature": sweep_feature, "start": start, "stop": stop, "num": num}]
+        if series_feature is not None:
+            _, start, stop, num = SWEEP_RANGES[series_feature]
+            axes.append({"feature": series_feature, "start": start, "stop": stop,
+                         "num": min(num, SWEEP_SERIES_POINTS)})
+        try:
+            result = get_api_client(api_url).sweep(payload, axes, timeout=timeout)
+            x_values = result["axes"][0]["values"]
+            if len(result["axes"]) == 1:
+                curve = pd.DataFrame({t('predicted_price'): result["predictions"]}, index=x_values)
+            else:
+                # Predictions are row-major over (first axis, second axis)
+                series = result["axes"][1]
+                n_series = len(series["values"])
+                curve = pd.DataFrame(
+                    [result["predictions"][i * n_series:(i + 1) * n_series] for i in range(len(x_values))],
+                    index=x_values,
+                    columns=[f"{series['feature']} = {v:g}" for v in series["values"]],
+                )
+            curve.index.name = SWEEP_RANGES[sweep_feature][0]
+            st.line_chart(curve)
+        except ApiError as e:
+            st.error(str(e))
+        except Exception as e:
+            st.error(f"{t('error_api')}: {e}")
@@ -29,7 +29,12 @@ TRANSLATIONS = {
         'error_api': 'API Error: {}',
         'error_timeout': 'Connection timeout. Please try again.',
         'error_missing_inputs': 'Please fill in all required fields',
-        'predicting': 'Calculating prediction...'
+        'predicting': 'Calculating prediction...',
+        'sweep_section': 'What-if: how the price moves',
+        'sweep_axis': 'Vary',
+        'sweep_second_axis': 'Compare by',
+        'sweep_none': '(none)',
+        'sweep_button': 'Show price curve'
     },
     'id': {
         'title': 'Prediksi Harga Rumah',
@@ -61,6 +66,11 @@ TRANSLATIONS = {
         'error_api': 'Error API: {}',
         'error_timeout': 'Waktu koneksi habis. Silakan coba lagi.',
         'error_missing_inputs': 'Mohon lengkapi semua field yang diperlukan',
-        'predicting': 'Menghitung prediksi...'
+        'predicting': 'Menghitung prediksi...',
+        'sweep_section': 'Bagaimana jika: pergerakan harga',
+        'sweep_axis': 'Ubah',
+        'sweep_second_axis': 'Bandingkan menurut',
+        'sweep_none': '(tidak ada)',
+        'sweep_button': 'Tampilkan kurva harga'
     }
 }
\ No newline at end of file
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.api import inference
+from src.api.cache import PredictionCache
+
+FINAL_CSV = Path(__file__).resolve().parent.parent / "final.csv"
+
+
+@pytest.fixture(scope="session")
+def training_frame():
+    """Engineered features and target from the repo's final.csv."""
+    df = pd.read_csv(FINAL_CSV).dropna(subset=inference.CSV_COLS + ["Price"])
+    df["Price"] = pd.to_numeric(df["Price"].astype(str).str.replace(".", "", regex=False))
+    for col in ["KM", "KT"]:
+        df[col] = pd.to_numeric(df[col].astype(str).str.lstrip(">"))
+    df = df.reset_index(drop=True)
+    X = inference._engineer_features(df[inference.CSV_COLS].copy())
+    return X, df["Price"]
+
+
+@pytest.fixture(scope="session")
+def fitted_artifacts(training_frame):
+    """A small fitted (model, preprocessor) pair with the production layout."""
+    X, y = training_frame
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', Pipeline(steps=[('scaler', StandardScaler())]), ['LB', 'LT', 'KT', 'KM']),
+            ('cat', Pipeline(steps=[('onehot', OneHotEncoder(drop='first', sparse_output=False))]),
+             ['Provinsi', 'Kota/Kab', 'Type'])
+        ])
+    Xt = preprocessor.fit_transform(X)
+    model = GradientBoostingRegressor(n_estimators=20, max_depth=3, random_state=0)
+    model.fit(Xt, y)
+    return model, preprocessor
+
+
+@pytest.fixture
+def loaded_inference(monkeypatch, fitted_artifacts):
+    """Install the fitted artifacts as the inference module's active model."""
+    model, preprocessor = fitted_artifacts
+    monkeypatch.setattr(inference, "_model", model)
+    monkeypatch.setattr(inference, "_preproc", preprocessor)
+    monkeypatch.setattr(inference, "_state", None)
+    monkeypatch.setattr(inference, "_model_version", None)
+    # Tests opt into caching explicitly so backends are actually exercised
+    monkeypatch.setattr(inference, "_prediction_cache", PredictionCache(maxsize=0))
+    inference._install(inference.ModelState.prepare(model, preprocessor, version="test"))
+    return model, preprocessor
+
+
+@pytest.fixture
+def sample_payload():
+    return {
+        "LB": 120.0,
+        "LT": 150.0,
+        "KM": 2,
+        "KT": 3,
+        "Kota/Kab": "Depok Kota",
+        "Provinsi": "Jawa Barat",
+        "Type": "Rumah"
+    }
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 from fastapi.testclient import TestClient
 from src.api.main import app
@@ -51,4 +53,103 @@ def test_predict_endpoint_missing_fields():
     }
 
     response = client.post("/predict", json=request_data)
-    assert response.status_code == 422  # Validation error
\ No newline at end of file
+    assert response.status_code == 422  # Validation error
+
+def test_predict_batch_endpoint(loaded_inference, sample_payload):
+    """Batch endpoint scores every item and keeps request order."""
+    items = [dict(sample_payload, LB=lb) for lb in (60.0, 120.0, 240.0)]
+
+    response = client.post("/predict/batch", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["n_success"] == 3
+    assert body["n_failed"] == 0
+    assert [r["index"] for r in body["results"]] == [0, 1, 2]
+
+    single = client.post("/predict", json=items[1]).json()
+    assert body["results"][1]["prediction"]["prediction"] == single["prediction"]
+
+
+def test_predict_batch_endpoint_isolates_item_errors(loaded_inference, sample_payload):
+    """An unscorable item is reported without failing the rest of the batch."""
+    items = [sample_payload, dict(sample_payload, **{"Kota/Kab": "Atlantis"})]
+
+    response = client.post("/predict/batch", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["n_success"] == 1
+    assert body["n_failed"] == 1
+    assert body["results"][0]["prediction"] is not None
+    assert body["results"][1]["error"]
+
+
+def test_predict_batch_endpoint_empty_request():
+    """Batch endpoint rejects an empty item list."""
+    response = client.post("/predict/batch", json={"items": []})
+    assert response.status_code == 422
+
+
+def test_cache_stats_endpoint():
+    """Cache stats endpoint exposes the cache counters."""
+    response = client.get("/cache/stats")
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions", "size", "maxsize"} <= set(response.json())
+
+
+def test_ready_endpoint_before_loading(monkeypatch):
+    """Readiness fails until the model is loaded and warmed up."""
+    from src.api import inference
+    monkeypatch.setattr(inference, "_ready", threading.Event())
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+
+def test_ready_endpoint_starts_lazy_load(monkeypatch):
+    """With EAGER_LOAD off, a readiness probe loads the model instead of waiting for traffic."""
+    from src.api import inference
+    ready, loaded = threading.Event(), threading.Event()
+    monkeypatch.setattr(inference, "EAGER_LOAD", False)
+    monkeypatch.setattr(inference, "_ready", ready)
+    monkeypatch.setattr(inference, "_background_load", None)
+    monkeypatch.setattr(inference, "_ensure_loaded", lambda: loaded.wait(5) and ready.set())
+
+    assert client.get("/ready").status_code == 503
+    loaded.set()
+    inference._background_load.join(timeout=5)
+    assert client.get("/ready").status_code == 200
+
+
+def test_ready_endpoint_after_warm_up(loaded_inference, monkeypatch):
+    """Readiness succeeds once a warm-up inference has run."""
+    from src.api import inference
+    monkeypatch.setattr(inference, "_ready", threading.Event())
+    inference._warm_up()
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+
+
+def test_admin_reload_requires_token(monkeypatch):
+    """/admin/reload is rejected without the configured admin token."""
+    from src.api import main
+    monkeypatch.setattr(main.inference, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(main, "reload_artifacts", lambda force=False: {"reloaded": True})
+
+    assert client.post("/admin/reload").status_code == 403
+    response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+
+
+def test_admin_reload_failure_returns_500(monkeypatch):
+    """A failed reload is reported with status 500 and the active version."""
+    from src.api import main
+    monkeypatch.setattr(main.inference, "ADMIN_TOKEN", None)
+    monkeypatch.setattr(main, "reload_artifacts",
+                        lambda force=False: {"reloaded": False, "model_version": "abc", "error": "boom"})
+
+    response = client.post("/admin/reload?force=true")
+    assert response.status_code == 500
+    assert response.json()["model_version"] == "abc"
@@ -0,0 +1,115 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from streamlit_app.api_client import ApiClient, ApiError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self._send(200 if self.server.healthy else 503, {"status": "ok"})
+
+    def do_POST(self):
+        self.server.requests.append(self.path)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/predict/sweep":
+            axis = payload["axes"][0]
+            self._send(200, {"axes": [{"feature": axis["feature"], "values": [axis["start"], axis["stop"]]}],
+                             "predictions": [payload["base"]["LB"] * 1e7] * 2, "shape": [2]})
+        elif payload["LB"] <= 0:
+            self._send(422, {"detail": "LB must be positive"})
+        else:
+            self._send(200, {"prediction": payload["LB"] * 1e7})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.connections, httpd.requests, httpd.healthy = 0, [], True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _client(server, **kwargs):
+    return ApiClient(f"http://127.0.0.1:{server.server_address[1]}/", **kwargs)
+
+
+def test_health_is_cached_for_ttl(server):
+    client = _client(server, health_ttl=60)
+    assert client.is_healthy() and client.is_healthy()
+    assert server.requests == ["/health"]
+
+    server.healthy = False
+    client.health_ttl = 0
+    assert not client.is_healthy()
+    assert server.requests == ["/health", "/health"]
+    client.close()
+
+
+def test_predictions_reuse_one_connection_and_cache_responses(server):
+    client = _client(server)
+    for lb in (100.0, 120.0, 140.0):
+        assert client.predict({"LB": lb, "Kota/Kab": "Depok Kota"})["prediction"] == lb * 1e7
+
+    # Same payload, keys in another order: served from the client cache
+    assert client.predict({"Kota/Kab": "Depok Kota", "LB": 120.0})["prediction"] == 1.2e9
+    assert server.requests == ["/predict"] * 3
+    assert server.connections == 1
+    assert (client.hits, client.misses) == (1, 3)
+
+    with pytest.raises(ApiError) as error:
+        client.predict({"LB": -1.0})
+    assert error.value.status_code == 422
+    client.close()
+
+
+def test_cache_expires_and_is_bounded(server):
+    client = _client(server, cache_size=2, cache_ttl=60)
+    for lb in (1.0, 2.0, 3.0):
+        client.predict({"LB": lb})
+    client.predict({"LB": 1.0})
+    assert len(server.requests) == 4
+
+    client.cache_ttl = 0
+    client.predict({"LB": 3.0})
+    assert len(server.requests) == 5
+    client.close()
+
+
+def test_sweep_is_cached_separately_from_predict(server):
+    client = _client(server)
+    payload = {"LB": 120.0}
+    axes = [{"feature": "LT", "start": 50, "stop": 500, "num": 2}]
+
+    result = client.sweep(payload, axes)
+    assert result["predictions"] == [1.2e9, 1.2e9]
+    assert client.sweep(dict(payload), list(axes)) == result
+    client.predict(payload)
+    assert server.requests == ["/predict/sweep", "/predict"]
+    client.close()
+
+
+def test_unreachable_api_is_unhealthy():
+    assert not ApiClient("http://127.0.0.1:9", health_timeout=0.5).is_healthy()
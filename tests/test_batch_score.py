@@ -0,0 +1,97 @@
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.api import inference
+from src.models import batch_score
+
+
+def _write_listings(path):
+    pd.DataFrame({
+        "LT": ["77.4", "62.5", "0", "120"],
+        "KM": ["1", ">10", "2", "2"],
+        "KT": ["1", "3", "2", "abc"],
+        "LB": ["51.5", "71", "60", "90"],
+        "Price": ["550.000.000", "730.000.000", "1.000.000.000", None],
+        "Kota/Kab": ["Depok Kota", "Depok Kota", "Depok Kota", "Depok Kota"],
+        "Provinsi": ["Jawa Barat"] * 4,
+        "Type": ["Rumah"] * 4,
+        "listing_id": ["a", "b", "c", "d"],
+    }).to_csv(path, index=False)
+
+
+def test_parse_chunk_coerces_and_flags_rows():
+    """Numeric columns are parsed and invalid rows get an error message."""
+    chunk = pd.DataFrame({
+        "LB": ["51.5", "-1"], "LT": ["77.4", "10"], "KM": [">10", "1"], "KT": ["2", "2"],
+        "Kota/Kab": ["Depok Kota", None], "Provinsi": ["Jawa Barat"] * 2, "Type": ["Rumah"] * 2,
+    })
+    features, errors = batch_score.parse_chunk(chunk)
+    assert features["KM"].tolist()[0] == 10
+    assert errors[0] is None
+    assert errors[1] == "LB must be a number > 0"
+    assert batch_score.parse_price(pd.Series(["550.000.000", None])).tolist()[0] == 550000000
+
+
+def test_score_chunk_isolates_unknown_category_without_row_loop(loaded_inference, monkeypatch):
+    """A row the preprocessor rejects fails alone; the chunk is not rescored row by row."""
+    n_rows = 64
+    chunk = pd.DataFrame({
+        "LB": np.linspace(40, 300, n_rows), "LT": np.linspace(60, 400, n_rows), "KM": [2] * n_rows,
+        "KT": [3] * n_rows, "Kota/Kab": ["Depok Kota"] * n_rows, "Provinsi": ["Jawa Barat"] * n_rows,
+        "Type": ["Rumah"] * n_rows,
+    })
+    chunk.loc[20, "Kota/Kab"] = "Atlantis"
+    clean = batch_score.score_chunk(chunk.drop(index=20))
+    calls = []
+    predict_frame = inference.predict_frame
+    monkeypatch.setattr(inference, "predict_frame", lambda df, state=None: calls.append(len(df))
+                        or predict_frame(df, state))
+
+    result = batch_score.score_chunk(chunk)
+
+    assert result["error"].notna().tolist() == [i == 20 for i in range(n_rows)]
+    np.testing.assert_allclose(result["predicted_price"].drop(index=20), clean["predicted_price"])
+    assert len(calls) <= 2 * 6 + 1
+
+
+def test_cli_matches_api_predictions(loaded_inference, monkeypatch, tmp_path, sample_payload):
+    """In-process scoring writes one row per input row, matching /predict."""
+    monkeypatch.setattr(inference, "MODEL_PATH", inference.MODEL_PATH)
+    monkeypatch.setattr(inference, "PREPROCESSOR_PATH", inference.PREPROCESSOR_PATH)
+    source, output = tmp_path / "listings.csv", tmp_path / "out" / "predictions.csv"
+    _write_listings(source)
+
+    summary = batch_score.main(batch_score.parse_args([
+        "--input", str(source), "--output", str(output), "--workers", "0",
+        "--chunksize", "3", "--keep-columns", "listing_id",
+    ]))
+
+    result = pd.read_csv(output)
+    assert summary["rows"] == 4 and summary["failed"] == 2
+    assert result["row"].tolist() == [0, 1, 2, 3]
+    assert result["listing_id"].tolist() == ["a", "b", "c", "d"]
+    assert result["actual_price"].tolist()[:3] == [550000000, 730000000, 1000000000]
+    assert result["error"].isna().tolist() == [True, True, False, False]
+
+    req = inference.OLXPredictionRequest(**dict(sample_payload, LB=51.5, LT=77.4, KM=1, KT=1))
+    np.testing.assert_allclose(result["predicted_price"][0], inference.predict_price(req).prediction, atol=0.01)
+
+
+def test_cli_process_pool(fitted_artifacts, tmp_path):
+    """Worker processes load the artifacts themselves and keep input order."""
+    model, preprocessor = fitted_artifacts
+    joblib.dump(model, tmp_path / "model.pkl")
+    joblib.dump(preprocessor, tmp_path / "preprocessor.pkl")
+    source, output = tmp_path / "listings.csv", tmp_path / "predictions.csv"
+    _write_listings(source)
+
+    summary = batch_score.main(batch_score.parse_args([
+        "--input", str(source), "--output", str(output), "--workers", "2", "--chunksize", "1",
+        "--model", str(tmp_path / "model.pkl"), "--preprocessor", str(tmp_path / "preprocessor.pkl"),
+    ]))
+
+    result = pd.read_csv(output)
+    assert summary["rows"] == 4
+    assert result["row"].tolist() == [0, 1, 2, 3]
+    assert result["predicted_price"].notna().tolist() == [True, True, False, False]
@@ -0,0 +1,117 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.api import inference
+from src.api.batching import MicroBatcher
+
+
+def test_single_caller_is_not_delayed():
+    """A lone request is flushed immediately instead of waiting out max_wait."""
+    batcher = MicroBatcher(lambda items: [x * 2 for x in items], max_size=8, max_wait=1.0)
+    try:
+        start = time.perf_counter()
+        assert batcher(21) == 42
+        assert time.perf_counter() - start < 0.5
+    finally:
+        batcher.close()
+
+
+def test_concurrent_callers_share_batches():
+    """Concurrent submissions are grouped and each caller gets its own result."""
+    sizes = []
+
+    def handler(items):
+        sizes.append(len(items))
+        time.sleep(0.01)
+        return [x * 2 for x in items]
+
+    batcher = MicroBatcher(handler, max_size=8, max_wait=0.05)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(batcher, range(64)))
+    finally:
+        batcher.close()
+
+    assert results == [x * 2 for x in range(64)]
+    assert max(sizes) > 1
+    assert max(sizes) <= 8
+    stats = batcher.stats()
+    assert stats["items"] == 64
+    assert stats["batches"] == len(sizes)
+    assert sum(stats["batch_size_counts"].values()) == len(sizes)
+
+
+def test_exceptions_fail_only_their_caller():
+    """An Exception entry in the handler's results is raised to that caller only."""
+    def handler(items):
+        return [ValueError("bad item") if x < 0 else x for x in items]
+
+    batcher = MicroBatcher(handler, max_size=4, max_wait=0.01)
+    try:
+        good, bad = batcher.submit(1), batcher.submit(-1)
+        assert good.result(1) == 1
+        with pytest.raises(ValueError, match="bad item"):
+            bad.result(1)
+    finally:
+        batcher.close()
+
+
+def test_handler_failure_fails_whole_batch():
+    """If the handler raises, every caller in the batch sees the error."""
+    def handler(items):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(handler, max_size=4, max_wait=0.01)
+    try:
+        with pytest.raises(RuntimeError, match="model exploded"):
+            batcher(1)
+    finally:
+        batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+
+
+def test_predict_price_through_micro_batcher(loaded_inference, monkeypatch, sample_payload):
+    """Micro-batched predictions match unbatched ones for concurrent callers."""
+    req = inference.OLXPredictionRequest(**sample_payload)
+    expected = inference.predict_price(req).prediction
+
+    monkeypatch.setattr(inference, "MICROBATCH_ENABLED", True)
+    monkeypatch.setattr(inference, "_batcher", None)
+    try:
+        barrier = threading.Barrier(8)
+
+        def call(_):
+            barrier.wait()
+            return inference.predict_price(req).prediction
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            predictions = list(pool.map(call, range(8)))
+        stats = inference.batching_stats()
+    finally:
+        inference.stop_batcher()
+
+    assert predictions == [expected] * 8
+    assert stats["enabled"] is True
+    assert stats["items"] == 8
+
+
+def test_microbatch_handler_isolates_bad_row_by_bisection(loaded_inference, monkeypatch, sample_payload):
+    """One unscorable row fails alone without turning the batch into single-row passes."""
+    state = inference._active_state()
+    payloads = [dict(sample_payload, LB=float(lb)) for lb in range(50, 82)]
+    payloads[11] = dict(sample_payload, **{"Kota/Kab": "Atlantis"})
+    items = [(inference._to_row(inference.OLXPredictionRequest(**p)), state) for p in payloads]
+    calls = []
+    predict_rows = inference._predict_rows
+    monkeypatch.setattr(inference, "_predict_rows", lambda rows, state=None: calls.append(len(rows))
+                        or predict_rows(rows, state))
+
+    results = inference._predict_microbatch(items)
+
+    assert [isinstance(r, Exception) for r in results] == [i == 11 for i in range(32)]
+    assert results[0] == pytest.approx(tuple(x[0] for x in predict_rows([items[0][0]], state)))
+    assert len(calls) <= 2 * 5 + 1
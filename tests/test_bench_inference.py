@@ -0,0 +1,43 @@
+from benchmarks import bench_inference
+from src.api import inference
+from src.api.cache import PredictionCache
+from src.api.schemas import OLXPredictionRequest
+
+
+def test_measure_reports_time_and_allocation_peak():
+    timing = bench_inference.measure(lambda: bytearray(1 << 20), min_time=0.001, repeat=3)
+    assert 0 < timing["min_s"] <= timing["median_s"]
+    assert timing["loops"] >= 1
+    assert timing["peak_bytes"] >= 1 << 20
+
+
+def test_bench_subject_times_every_stage(loaded_inference, monkeypatch, sample_payload):
+    model, preprocessor = loaded_inference
+    monkeypatch.setattr(inference, "_prediction_cache", PredictionCache(maxsize=0))
+    state = inference.ModelState.prepare(model, preprocessor, version="bench")
+    requests = [OLXPredictionRequest(**dict(sample_payload, LB=100.0 + i)) for i in range(3)]
+
+    results = bench_inference.bench_subject("shipped", state, requests, [1, 5], min_time=0.001, repeat=2)
+
+    stages = {r["stage"] for r in results}
+    assert stages == {"to_row", "engineer_features", "engineer_columns", "transform",
+                      "transform_compiled", "predict", "predict_flat", "predict_price", "predict_batch"}
+    assert {r["batch_size"] for r in results} == {1, 5}
+    for r in results:
+        assert r["subject"] == "shipped"
+        assert r["model"] == "GradientBoostingRegressor"
+        assert r["per_row_us"] == r["median_s"] / r["batch_size"] * 1e6
+
+
+def test_compare_flags_slower_stages_only():
+    baseline = [
+        {"subject": "shipped", "stage": "predict", "batch_size": 1, "median_s": 1.0},
+        {"subject": "shipped", "stage": "transform", "batch_size": 1, "median_s": 1.0},
+    ]
+    results = [
+        {"subject": "shipped", "stage": "predict", "batch_size": 1, "median_s": 1.5},
+        {"subject": "shipped", "stage": "transform", "batch_size": 1, "median_s": 1.1},
+        {"subject": "shipped", "stage": "to_row", "batch_size": 1, "median_s": 9.0},
+    ]
+    regressions = bench_inference.compare(results, baseline, threshold=0.2)
+    assert [(r["stage"], r["slowdown"]) for r in regressions] == [("predict", 1.5)]
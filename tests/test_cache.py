@@ -0,0 +1,122 @@
+from src.api import inference
+from src.api.cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPredictionCache:
+    """Test the LRU prediction cache."""
+
+    def test_lru_eviction(self):
+        cache = PredictionCache(maxsize=2)
+        cache.put("a", 1, "v1")
+        cache.put("b", 2, "v1")
+        assert cache.get("a", "v1") == 1  # "a" becomes most recently used
+        cache.put("c", 3, "v1")
+
+        assert cache.get("b", "v1") is None
+        assert cache.get("a", "v1") == 1
+        assert cache.get("c", "v1") == 3
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 3
+        assert stats["misses"] == 1
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = PredictionCache(maxsize=10, ttl=5, clock=clock)
+        cache.put("a", 1, "v1")
+        clock.now = 4.9
+        assert cache.get("a", "v1") == 1
+        clock.now = 5.0
+        assert cache.get("a", "v1") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_version_change_invalidates(self):
+        cache = PredictionCache(maxsize=10)
+        cache.put("a", 1, "v1")
+        assert cache.get("a", "v2") is None
+        assert cache.get("a", "v1") is None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_swap_drops_old_entries_and_ignores_old_version(self):
+        cache = PredictionCache(maxsize=10)
+        cache.set_version("v1")
+        cache.put("a", 1, "v1")
+        cache.set_version("v2")
+        assert cache.stats()["size"] == 0
+
+        # Requests still finishing on v1 neither evict nor read v2's entries
+        cache.put("b", 2, "v2")
+        cache.put("a", 1, "v1")
+        assert cache.get("a", "v1") is None
+        assert cache.get("b", "v2") == 2
+        stats = cache.stats()
+        assert stats["size"] == 1 and stats["stale"] == 2 and stats["invalidations"] == 1
+
+    def test_disabled_cache(self):
+        cache = PredictionCache(maxsize=0)
+        cache.put("a", 1, "v1")
+        assert cache.get("a", "v1") is None
+        assert cache.stats()["enabled"] is False
+
+
+class TestInferenceCaching:
+    """Test caching in predict_price and predict_batch."""
+
+    def test_repeated_request_served_from_cache(self, loaded_inference, monkeypatch, sample_payload):
+        monkeypatch.setattr(inference, "_prediction_cache", PredictionCache(maxsize=16))
+        req = inference.OLXPredictionRequest(**sample_payload)
+
+        first = inference.predict_price(req)
+        second = inference.predict_price(req)
+
+        assert first.cached is False
+        assert second.cached is True
+        assert second.prediction == first.prediction
+        assert inference.prediction_cache_stats()["hits"] == 1
+
+    def test_batch_uses_cache(self, loaded_inference, monkeypatch, sample_payload):
+        monkeypatch.setattr(inference, "_prediction_cache", PredictionCache(maxsize=16))
+        reqs = [inference.OLXPredictionRequest(**dict(sample_payload, LB=lb)) for lb in (50.0, 80.0)]
+        inference.predict_price(reqs[0])
+
+        results = inference.predict_batch(reqs)
+
+        assert [r.prediction.cached for r in results] == [True, False]
+
+    def test_model_swap_invalidates_cache(self, loaded_inference, monkeypatch, sample_payload):
+        cache = PredictionCache(maxsize=16)
+        monkeypatch.setattr(inference, "_prediction_cache", cache)
+        req = inference.OLXPredictionRequest(**sample_payload)
+        inference.predict_price(req)
+
+        model, _ = loaded_inference
+        monkeypatch.setattr(inference, "_model", model.__class__(**model.get_params()).fit(
+            [[0.0] * model.n_features_in_], [1.0]
+        ))
+
+        assert inference.predict_price(req).cached is False
+        assert cache.stats()["invalidations"] == 1
+
+    def test_install_clears_previous_version(self, loaded_inference, monkeypatch, sample_payload):
+        cache = PredictionCache(maxsize=16)
+        monkeypatch.setattr(inference, "_prediction_cache", cache)
+        req = inference.OLXPredictionRequest(**sample_payload)
+        old_state = inference._active_state()
+        inference.predict_price(req)
+
+        model, preprocessor = loaded_inference
+        inference._install(inference.ModelState.prepare(model, preprocessor, version="next"))
+
+        assert cache.stats()["size"] == 0
+        cache.put("late", "old answer", inference._cache_version(old_state))
+        assert cache.stats()["size"] == 0
+        assert inference.predict_price(req).cached is False
+        assert inference.predict_price(req).cached is True
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, PolynomialFeatures
+
+from src.api import inference
+from src.api.fast_preprocessor import CompiledPreprocessor, UnsupportedPreprocessorError
+
+
+def _columns(X):
+    """Convert an engineered DataFrame to the column mapping the fast path expects."""
+    cols = {}
+    for name in X.columns:
+        dtype = object if name in inference.CATEGORICAL_COLS else np.float64
+        cols[name] = X[name].to_numpy(dtype=dtype)
+    return cols
+
+
+class TestCompiledPreprocessor:
+    """Test the NumPy fast path against ColumnTransformer.transform."""
+
+    def test_matches_sklearn_transform(self, fitted_artifacts, training_frame):
+        """Compiled output is identical to the sklearn output."""
+        _, preprocessor = fitted_artifacts
+        X, _ = training_frame
+        compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+
+        expected = preprocessor.transform(X)
+        result = compiled.transform_columns(_columns(X))
+
+        assert result.shape == expected.shape
+        assert np.array_equal(result, expected)
+        assert list(compiled.get_feature_names_out()) == list(preprocessor.get_feature_names_out())
+
+    def test_engineer_columns_matches_pandas(self, fitted_artifacts, training_frame):
+        """Engineering from row dicts matches the DataFrame path end to end."""
+        _, preprocessor = fitted_artifacts
+        X, _ = training_frame
+        rows = X[inference.CSV_COLS].head(50).to_dict("records")
+        compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+
+        expected = preprocessor.transform(inference._engineer_features(pd.DataFrame(rows)))
+        result = compiled.transform_columns(inference._engineer_columns(rows))
+
+        assert np.array_equal(result, expected)
+
+    def test_unknown_category_raises(self, fitted_artifacts, training_frame):
+        """Unknown categories raise like OneHotEncoder(handle_unknown='error')."""
+        _, preprocessor = fitted_artifacts
+        X, _ = training_frame
+        cols = _columns(X.head(1))
+        cols["Kota/Kab"] = np.array(["Atlantis"], dtype=object)
+        compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+
+        with pytest.raises(ValueError, match="unknown categories"):
+            compiled.transform_columns(cols)
+
+    def test_imputer_and_ignore_unknown(self, training_frame):
+        """Imputing pipelines with handle_unknown='ignore' also match sklearn."""
+        X, _ = training_frame
+        X = X.head(200).copy()
+        X.loc[X.index[:5], "LB"] = np.nan
+        X.loc[X.index[5:10], "Provinsi"] = np.nan
+        preprocessor = ColumnTransformer(
+            transformers=[
+                ("num", SimpleImputer(strategy="median"), ["LB", "LT", "KM", "KT"]),
+                ("cat", Pipeline([
+                    ("imp", SimpleImputer(strategy="most_frequent")),
+                    ("ohe", OneHotEncoder(handle_unknown="ignore"))
+                ]), ["Kota/Kab", "Provinsi", "Type"]),
+            ],
+            remainder="drop",
+            sparse_threshold=0
+        )
+        preprocessor.fit(X)
+        compiled = CompiledPreprocessor.from_column_transformer(preprocessor)
+
+        test = X.head(20).copy()
+        test.loc[test.index[0], "Kota/Kab"] = "Atlantis"
+        assert np.array_equal(compiled.transform_columns(_columns(test)), preprocessor.transform(test))
+
+    def test_unsupported_transformer(self, training_frame):
+        """Transformers without a NumPy equivalent are rejected."""
+        X, _ = training_frame
+        preprocessor = ColumnTransformer([("poly", PolynomialFeatures(), ["LB", "LT"])])
+        preprocessor.fit(X)
+
+        with pytest.raises(UnsupportedPreprocessorError):
+            CompiledPreprocessor.from_column_transformer(preprocessor)
+
+
+def test_predict_price_compiled_matches_sklearn(loaded_inference, monkeypatch, sample_payload):
+    """predict_price gives the same answer on both preprocessor backends."""
+    req = inference.OLXPredictionRequest(**sample_payload)
+    assert inference._active_state().compiled is not None
+    compiled_price = inference.predict_price(req).prediction
+
+    monkeypatch.setattr(inference._active_state(), "compiled", None)
+    assert inference.predict_price(req).prediction == compiled_price
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.feature_selection import RFE
+from sklearn.linear_model import LinearRegression
+from xgboost import XGBRegressor
+
+from src.models.feature_selection import select_features
+
+
+def _data(n_noise=30, n_rows=200):
+    rng = np.random.default_rng(0)
+    informative = rng.normal(size=(n_rows, 3))
+    y = informative @ np.array([5.0, -3.0, 2.0]) + rng.normal(scale=0.1, size=n_rows)
+    noise = rng.normal(scale=0.5, size=(n_rows, n_noise))
+    # Constant columns are never split on: zero importance
+    constant = np.zeros((n_rows, 10))
+    X = pd.DataFrame(np.hstack([noise[:, :10], informative, noise[:, 10:], constant]))
+    X.columns = [f"c{i}" for i in range(X.shape[1])]
+    return X, pd.Series(y)
+
+
+def test_selects_informative_features_in_few_rounds():
+    X, y = _data()
+    estimator = RandomForestRegressor(n_estimators=20, random_state=0)
+
+    selected, report = select_features(estimator, X, y, n_features_to_select=3, step=0.3, fine_below=6, cv=3)
+
+    assert selected == ["c10", "c11", "c12"]
+    rounds = report["rounds"]
+    assert [r["n_features"] for r in rounds][:2] == [43, 31]
+    assert set(rounds[0]["dropped"]) >= {f"c{i}" for i in range(33, 43)}
+    assert len(rounds) < X.shape[1] - 3
+    assert rounds[-1]["cv_score"] > rounds[0]["cv_score"]
+    assert report["n_fits"] == len(rounds) * 3 + len(rounds) - 1
+    assert all(r["seconds"] >= 0 for r in rounds)
+
+
+def test_step_one_matches_rfe():
+    X, y = _data(n_noise=8)
+    estimator = LinearRegression()
+
+    selected, report = select_features(estimator, X, y, n_features_to_select=4, step=1, fine_below=0,
+                                       cv=0, drop_zero_importance=False)
+
+    rfe = RFE(estimator, n_features_to_select=4).fit(X, y)
+    assert selected == list(X.columns[rfe.support_])
+    assert all(r["cv_score"] is None for r in report["rounds"])
+
+
+def _onehot_data(n_rows=300):
+    rng = np.random.default_rng(0)
+    numeric = rng.normal(size=(n_rows, 4))
+    onehot = np.eye(12)[rng.integers(12, size=n_rows)]
+    y = numeric @ np.array([5.0, -3.0, 0.0, 0.0]) + 4 * onehot[:, 2] - 6 * onehot[:, 7]
+    X = pd.DataFrame(np.hstack([numeric, onehot]),
+                     columns=[f"n{i}" for i in range(4)] + [f"city_{i}" for i in range(12)])
+    return X, pd.Series(y + rng.normal(scale=0.1, size=n_rows))
+
+
+@pytest.mark.parametrize("estimator", [RandomForestRegressor(n_estimators=20, random_state=0),
+                                       XGBRegressor(n_estimators=50, max_depth=3, random_state=0)])
+def test_adaptive_step_matches_rfe_step_one_on_onehot_data(estimator):
+    """The default adaptive step picks RFE(step=1)'s subset with fewer fits."""
+    X, y = _onehot_data()
+
+    selected, report = select_features(estimator, X, y, n_features_to_select=4, cv=3)
+
+    rfe = RFE(estimator, n_features_to_select=4, step=1).fit(X, y)
+    assert selected == list(X.columns[rfe.support_])
+    # One ranking fit plus cv scoring fits per round, no ranking fit in the last
+    assert report["n_fits"] == len(report["rounds"]) * 4 - 1
+
+
+@pytest.mark.parametrize("estimator", [RandomForestRegressor(n_estimators=20, random_state=0),
+                                       XGBRegressor(n_estimators=20, random_state=0)])
+def test_accepts_sparse_matrix_with_column_names(estimator):
+    X, y = _data()
+    # Exact zeros in the informative columns: XGBoost would read them as missing on CSR
+    X.iloc[::3, 10:13] = 0.0
+
+    dense, _ = select_features(estimator, X, y, n_features_to_select=3, step=0.3, fine_below=6, cv=0)
+    selected, _ = select_features(estimator, sparse.csr_matrix(X.to_numpy()), y, n_features_to_select=3,
+                                  step=0.3, fine_below=6, cv=0, columns=list(X.columns))
+
+    assert selected == dense
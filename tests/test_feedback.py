@@ -0,0 +1,84 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from src.api import inference
+from src.api.feedback import FEEDBACK_COLUMNS, FeedbackBuffer
+from src.api.main import app
+from src.data.ingest import read_listings
+
+client = TestClient(app)
+
+
+def _row(price="550000000", city="Depok Kota"):
+    return {"LB": 120.0, "LT": 150.0, "KM": 2, "KT": 3, "Kota/Kab": city, "Provinsi": "Jawa Barat",
+            "Type": "Rumah", "Price": price}
+
+
+def test_flushes_when_full_and_on_close(tmp_path):
+    buffer = FeedbackBuffer(tmp_path, max_rows=3, max_wait=60)
+    for _ in range(3):
+        buffer.add(_row(), model_version="v1")
+    deadline = time.monotonic() + 5
+    while buffer.written < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert buffer.written == 3
+
+    buffer.add(_row(city="Kota, Baru \"Timur\""))
+    assert buffer.stats()["pending"] == 1
+    buffer.close()
+
+    lines = buffer.path.read_text().splitlines()
+    assert lines[0] == ",".join(FEEDBACK_COLUMNS)
+    assert len(lines) == 5
+    listings = read_listings(buffer.path)
+    assert listings["Price"].tolist() == [550_000_000] * 4
+    assert listings["Kota/Kab"].tolist()[-1] == "Kota, Baru \"Timur\""
+
+
+def test_flushes_after_max_wait(tmp_path):
+    buffer = FeedbackBuffer(tmp_path, max_rows=100, max_wait=0.05)
+    buffer.add(_row())
+    deadline = time.monotonic() + 5
+    while buffer.written < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert buffer.stats()["written"] == 1
+    buffer.close()
+
+
+def test_failed_writes_back_off_and_bound_the_backlog(tmp_path):
+    # A file where the directory should be: every write fails
+    blocked = tmp_path / "feedback"
+    blocked.write_text("")
+    buffer = FeedbackBuffer(blocked, max_rows=2, max_wait=0, max_backlog=3, retry_wait=60)
+    for price in range(1, 6):
+        buffer.add(_row(price=str(price)))
+    time.sleep(0.2)
+
+    stats = buffer.stats()
+    # One attempt, then waiting out the backoff despite a full buffer
+    assert stats["write_errors"] == 1
+    assert stats["pending"] == 3 and stats["dropped"] == 2
+
+    blocked.unlink()
+    buffer.close()
+    assert read_listings(buffer.path)["Price"].tolist() == [3, 4, 5]
+
+
+def test_feedback_endpoint(monkeypatch, tmp_path, sample_payload):
+    buffer = FeedbackBuffer(tmp_path, max_rows=100, max_wait=60)
+    monkeypatch.setattr(inference, "_feedback", buffer)
+    monkeypatch.setattr(inference, "_model_version", "abc123")
+
+    response = client.post("/feedback", json=dict(sample_payload, Price=1_250_000_000))
+    assert response.status_code == 202
+    assert response.json() == {"accepted": True, "pending": 1, "model_version": "abc123"}
+    assert client.get("/feedback/stats").json()["received"] == 1
+
+    assert client.post("/feedback", json=dict(sample_payload, Price=0)).status_code == 422
+    assert client.post("/feedback", json=sample_payload).status_code == 422
+
+    inference.stop_feedback()
+    listings = read_listings(buffer.path)
+    assert listings["Price"].tolist() == [1_250_000_000]
+    assert listings["Kota/Kab"].tolist() == [sample_payload["Kota/Kab"]]
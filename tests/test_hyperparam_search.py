@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import yaml
+from sklearn.linear_model import LinearRegression, Ridge
+
+from src.models import hyperparam_search
+
+MODELS = {"LinearRegression": LinearRegression, "Ridge": Ridge}
+
+
+def factory(name, params):
+    return MODELS[name](**params)
+
+
+@pytest.fixture
+def regression_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = X @ np.array([3.0, -2.0, 0.5, 0.0]) + rng.normal(scale=0.5, size=300)
+    return X[:240], y[:240], X[240:], y[240:]
+
+
+def search(data, journal, grids, **kwargs):
+    return hyperparam_search.run_search(*data, grids=grids, journal=journal, model_factory=factory,
+                                        n_jobs=1, **kwargs)
+
+
+def test_rung_fractions():
+    assert hyperparam_search.rung_fractions(eta=3, min_fraction=0.1) == [round(1 / 9, 6), round(1 / 3, 6), 1.0]
+    assert hyperparam_search.rung_fractions(eta=2, min_fraction=0.25) == [0.25, 0.5, 1.0]
+    assert hyperparam_search.rung_fractions(eta=3, min_fraction=0.5) == [1.0]
+
+
+def test_successive_halving_prunes_and_picks_best(regression_data, tmp_path):
+    grids = {"LinearRegression": {}, "Ridge": {"alpha": [0.01, 0.1, 1.0, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8]}}
+    journal = hyperparam_search.TrialJournal(tmp_path / "journal.db")
+
+    results, report = search(regression_data, journal, grids, eta=3, min_fraction=0.1)
+
+    assert [r["candidates"] for r in report["rungs"]] == [{"Ridge": 9}, {"Ridge": 3}, {"LinearRegression": 1, "Ridge": 1}]
+    assert report["n_fits"] == (9 + 3 + 2) * 3
+    assert results["Ridge"]["params"]["alpha"] <= 1.0
+    assert results["Ridge"]["r2"] > 0.9
+    assert results["LinearRegression"]["cv_score"] > 0.9
+    assert len(journal.trials(report["study"])) == report["n_fits"]
+
+
+def test_rerun_resumes_from_journal(regression_data, tmp_path):
+    """Finished fits are reused; only candidates added to the grid are fitted."""
+    path = tmp_path / "journal.db"
+    grids = {"Ridge": {"alpha": [0.1, 10.0, 1e6]}}
+    _, first = search(regression_data, hyperparam_search.TrialJournal(path), grids)
+
+    results, again = search(regression_data, hyperparam_search.TrialJournal(path), grids)
+    assert again["study"] == first["study"]
+    assert again["n_fits"] == 0
+    assert again["n_reused"] == first["n_fits"]
+
+    _, extended = search(regression_data, hyperparam_search.TrialJournal(path),
+                         {"Ridge": {"alpha": [0.1, 10.0, 1e6, 1.0]}})
+    # The new candidate is scored at every rung it reaches; everything else comes from the journal
+    assert extended["n_reused"] >= 3 * 3
+    assert extended["n_fits"] <= 3 * 3
+
+
+def test_write_model_config_keeps_other_settings(tmp_path):
+    path = tmp_path / "model_config.yaml"
+    path.write_text(yaml.dump({"model": {"name": "house_price_model", "feature_sets": {"rfe": ["1"]},
+                                         "best_model": "RandomForest", "parameters": {"max_depth": 10}}}))
+
+    hyperparam_search.write_model_config(path, "Ridge", Ridge(alpha=0.5), r2=0.8, mae=12.0)
+
+    model_cfg = yaml.safe_load(path.read_text())["model"]
+    assert model_cfg["best_model"] == "Ridge"
+    assert model_cfg["parameters"]["alpha"] == 0.5
+    assert model_cfg["r2_score"] == 0.8
+    assert model_cfg["feature_sets"] == {"rfe": ["1"]}
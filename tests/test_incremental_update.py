@@ -0,0 +1,137 @@
+import copy
+
+import numpy as np
+import pytest
+import joblib
+import xgboost as xgb
+from sklearn.ensemble import RandomForestRegressor
+
+from src.api import inference
+from src.api.fast_preprocessor import CompiledPreprocessor
+from src.api.feedback import FeedbackBuffer
+from src.models import incremental_update as update
+
+NEW_CITY = "Kota Baru"
+
+
+def _feedback_rows(training_frame, n=80, price=9e10):
+    X, _ = training_frame
+    rows = X[inference.CSV_COLS].iloc[:n].to_dict("records")
+    for row in rows:
+        row.update({"Kota/Kab": NEW_CITY, "Price": f"{price:.0f}"})
+    return rows
+
+
+def test_extend_vocabulary_appends_new_categories(fitted_artifacts, training_frame):
+    _, preprocessor = fitted_artifacts
+    X, _ = training_frame
+    frame = X.iloc[:5].copy()
+    frame.loc[frame.index[0], "Kota/Kab"] = NEW_CITY
+
+    extended, added = update.extend_vocabulary(preprocessor, frame)
+
+    assert added == {"Kota/Kab": [NEW_CITY]}
+    before = preprocessor.transform(X.iloc[:50])
+    after = update._transform(extended, frame)
+    np.testing.assert_array_equal(update._transform(extended, X.iloc[:50])[:, :-1], before)
+    assert after[:, -1].tolist() == [1, 0, 0, 0, 0]
+    # The served preprocessor is untouched, and the API can still compile the new one
+    assert update.extend_vocabulary(preprocessor, X.iloc[:5]) == (preprocessor, {})
+    compiled = CompiledPreprocessor.from_column_transformer(extended)
+    np.testing.assert_allclose(compiled.transform_columns(
+        {c: frame[c].to_numpy(dtype=object if c in inference.CATEGORICAL_COLS else float) for c in frame}), after)
+
+
+@pytest.mark.parametrize("kind", ["gbr", "xgb"])
+def test_widen_and_continue_training(fitted_artifacts, training_frame, kind):
+    model, preprocessor = fitted_artifacts
+    X, y = training_frame
+    Xt = preprocessor.transform(X)
+    if kind == "xgb":
+        model = xgb.XGBRegressor(n_estimators=10, max_depth=3).fit(Xt, y)
+    wide = np.hstack([Xt, np.zeros((len(Xt), 1))])
+
+    widened = update.widen_model(model, wide.shape[1])
+    np.testing.assert_allclose(widened.predict(wide), model.predict(Xt))
+    assert model.n_features_in_ == Xt.shape[1]
+
+    wide[:40, -1] = 1
+    target = np.where(wide[:, -1] == 1, y.max() * 2, y)
+    candidate = update.continue_training(widened, wide[:200], target[:200], rounds=5)
+    assert update.evaluate(candidate, wide[:40], target[:40])["mae"] < \
+        update.evaluate(widened, wide[:40], target[:40])["mae"]
+    n_trees = candidate.get_booster().num_boosted_rounds() if kind == "xgb" else candidate.estimators_.shape[0]
+    assert n_trees == (10 if kind == "xgb" else model.n_estimators) + 5
+
+
+def test_unsupported_model_is_rejected(fitted_artifacts, training_frame):
+    _, preprocessor = fitted_artifacts
+    X, y = training_frame
+    forest = RandomForestRegressor(n_estimators=2).fit(preprocessor.transform(X.iloc[:50]), y[:50])
+    with pytest.raises(ValueError, match="full retrain"):
+        update.widen_model(forest, forest.n_features_in_ + 1)
+
+
+def test_run_update_promotes_and_consumes_feedback(fitted_artifacts, training_frame, tmp_path):
+    model, preprocessor = fitted_artifacts
+    model_path, preprocessor_path = tmp_path / "model.pkl", tmp_path / "preprocessor.pkl"
+    joblib.dump(model, model_path)
+    joblib.dump(preprocessor, preprocessor_path)
+    feedback_dir = tmp_path / "feedback"
+    buffer = FeedbackBuffer(feedback_dir, max_rows=1000, max_wait=60)
+    for row in _feedback_rows(training_frame):
+        buffer.add(row, model_version="v1")
+    buffer.close()
+    # A row still being written is not consumed
+    with open(buffer.path, "a") as f:
+        f.write("120.0,150.0,2")
+    args = ["--feedback-dir", str(feedback_dir), "--model", str(model_path),
+            "--preprocessor", str(preprocessor_path), "--rounds", "20"]
+    served_paths = (inference.MODEL_PATH, inference.PREPROCESSOR_PATH)
+
+    report = update.run_update(update.parse_args(args + ["--dry-run"]))
+    assert not report["promoted"] and report["reason"] == "Dry run"
+    assert report["candidate"]["mae"] < report["current"]["mae"]
+
+    report = update.run_update(update.parse_args(args))
+    assert report["promoted"]
+    assert report["rows"] == 80 and report["holdout_rows"] == 16
+    assert report["added_categories"] == {"Kota/Kab": [NEW_CITY]}
+    promoted = joblib.load(model_path)
+    assert promoted.estimators_.shape[0] == model.n_estimators + 20
+    assert (tmp_path / "model.prev.pkl").exists() and (tmp_path / "preprocessor.prev.pkl").exists()
+    # The promoted pair passes the API's reload smoke test
+    inference._smoke_test(inference.ModelState.prepare(promoted, joblib.load(preprocessor_path)))
+
+    report = update.run_update(update.parse_args(args))
+    assert not report["promoted"] and report["rows"] == 0
+    assert update.load_offsets(feedback_dir)[buffer.path.name] == buffer.path.stat().st_size - len("120.0,150.0,2")
+    # The API's artifact paths are left alone
+    assert (inference.MODEL_PATH, inference.PREPROCESSOR_PATH) == served_paths
+
+
+def test_run_update_trains_on_previous_holdout(fitted_artifacts, training_frame, tmp_path):
+    model, preprocessor = fitted_artifacts
+    model_path, preprocessor_path = tmp_path / "model.pkl", tmp_path / "preprocessor.pkl"
+    joblib.dump(model, model_path)
+    joblib.dump(preprocessor, preprocessor_path)
+    feedback_dir = tmp_path / "feedback"
+    args = update.parse_args(["--feedback-dir", str(feedback_dir), "--model", str(model_path),
+                              "--preprocessor", str(preprocessor_path), "--rounds", "20"])
+
+    buffer = FeedbackBuffer(feedback_dir, max_rows=1000, max_wait=60)
+    for row in _feedback_rows(training_frame):
+        buffer.add(row, model_version="v1")
+    buffer.flush()
+    report = update.run_update(args)
+    assert report["promoted"] and report["carried_rows"] == 0
+    held_out = update.load_holdout(feedback_dir)
+    assert len(held_out) == report["holdout_rows"] == 16
+    assert held_out["Kota/Kab"].astype(str).eq(NEW_CITY).all()
+
+    for row in _feedback_rows(training_frame, n=40):
+        buffer.add(row, model_version="v2")
+    buffer.close()
+    report = update.run_update(args)
+    assert report["rows"] == 40 and report["carried_rows"] == 16
+    assert report["train_rows"] == 40 - 8 + 16
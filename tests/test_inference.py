@@ -125,4 +125,194 @@ class TestPrediction:
 
         # This should raise validation error from Pydantic
         with pytest.raises(ValueError):
-            predict_price(req)
\ No newline at end of file
+            predict_price(req)
+
+class TestBatchPrediction:
+    """Test vectorized batch prediction."""
+
+    def test_predict_batch_matches_single_predictions(self, loaded_inference, sample_payload):
+        """Batch predictions match one-at-a-time predictions."""
+        from src.api.inference import predict_batch
+
+        reqs = [
+            OLXPredictionRequest(**dict(sample_payload, LB=lb, KT=kt))
+            for lb, kt in [(45.0, 1), (120.0, 3), (300.0, 5)]
+        ]
+
+        results = predict_batch(reqs)
+
+        assert [r.index for r in results] == [0, 1, 2]
+        for req, result in zip(reqs, results):
+            assert result.error is None
+            assert result.prediction.prediction == predict_price(req).prediction
+
+    def test_score_isolating_bisects_failures(self):
+        """Failing items are isolated in a few calls, not one call per item."""
+        from src.api.inference import score_isolating
+
+        bad = {5, 40}
+        calls = []
+
+        def score(indices):
+            calls.append(len(indices))
+            if bad & set(indices):
+                raise ValueError("unknown category")
+            return [i * 10 for i in indices]
+
+        results, errors = score_isolating(range(64), score)
+
+        assert set(errors) == bad and all(isinstance(e, ValueError) for e in errors.values())
+        assert results == {i: i * 10 for i in range(64) if i not in bad}
+        assert len(calls) < 30
+
+    def test_predict_batch_isolates_unknown_category(self, loaded_inference, sample_payload, monkeypatch):
+        """One unscorable listing does not turn the batch into single-row predictions."""
+        from src.api import inference
+
+        reqs = [OLXPredictionRequest(**dict(sample_payload, LB=float(lb))) for lb in range(50, 82)]
+        reqs[7] = OLXPredictionRequest(**dict(sample_payload, **{"Kota/Kab": "Atlantis"}))
+        expected = [inference.predict_batch([req])[0] for req in reqs]
+        inference._prediction_cache.clear()
+        calls = []
+        predict_rows = inference._predict_rows
+        monkeypatch.setattr(inference, "_predict_rows", lambda rows, state=None: calls.append(len(rows))
+                            or predict_rows(rows, state))
+
+        results = inference.predict_batch(reqs)
+
+        assert [r.error is not None for r in results] == [i == 7 for i in range(32)]
+        for result, single in zip(results, expected):
+            if result.error is None:
+                assert result.prediction.prediction == single.prediction.prediction
+        assert len(calls) <= 2 * 5 + 1
+
+
+class TestModelLoading:
+    """Test eager, thread-safe artifact loading."""
+
+    def test_concurrent_cold_start_loads_once(self, fitted_artifacts, monkeypatch):
+        """Concurrent first requests unpickle the artifacts only once."""
+        import threading
+        import time
+        from src.api import inference
+
+        calls = []
+
+        def slow_load():
+            calls.append(1)
+            time.sleep(0.05)
+            return fitted_artifacts
+
+        monkeypatch.setattr(inference, "_model", None)
+        monkeypatch.setattr(inference, "_preproc", None)
+        monkeypatch.setattr(inference, "_state", None)
+        monkeypatch.setattr(inference, "_model_version", None)
+        monkeypatch.setattr(inference, "_ready", threading.Event())
+        monkeypatch.setattr(inference, "_load_artifacts", slow_load)
+        monkeypatch.setattr(inference, "_artifact_digest", lambda *paths: "test")
+
+        threads = [threading.Thread(target=inference._ensure_loaded) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert inference._model is fitted_artifacts[0]
+        assert inference.readiness()["ready"] is True
+
+    def test_startup_failure_is_reported(self, monkeypatch):
+        """A failed startup load is surfaced by readiness instead of crashing."""
+        import threading
+        from src.api import inference
+
+        def failing_load():
+            raise FileNotFoundError("Model file not found: /models/modelbaru.pkl")
+
+        monkeypatch.setattr(inference, "_model", None)
+        monkeypatch.setattr(inference, "_preproc", None)
+        monkeypatch.setattr(inference, "_state", None)
+        monkeypatch.setattr(inference, "_model_version", None)
+        monkeypatch.setattr(inference, "_ready", threading.Event())
+        monkeypatch.setattr(inference, "_load_error", None)
+        monkeypatch.setattr(inference, "_load_artifacts", failing_load)
+
+        inference.load_on_startup()
+
+        status = inference.readiness()
+        assert status["ready"] is False
+        assert "Model file not found" in status["error"]
+
+
+class TestHotReload:
+    """Tests for swapping in new artifacts while serving."""
+
+    @pytest.fixture
+    def artifact_files(self, tmp_path, monkeypatch, loaded_inference):
+        import joblib
+        from src.api import inference
+
+        model, preprocessor = loaded_inference
+        model_path, prep_path = tmp_path / "model.pkl", tmp_path / "preprocessor.pkl"
+        joblib.dump(model, model_path)
+        joblib.dump(preprocessor, prep_path)
+        monkeypatch.setattr(inference, "MODEL_PATH", model_path)
+        monkeypatch.setattr(inference, "PREPROCESSOR_PATH", prep_path)
+        return model_path, prep_path
+
+    def test_reload_swaps_in_new_artifacts(self, artifact_files, sample_payload):
+        """A successful reload installs the new model and reports its version."""
+        from src.api import inference
+
+        req = OLXPredictionRequest(**sample_payload)
+        old_state = inference._active_state()
+        status = inference.reload_artifacts()
+
+        assert status["reloaded"] is True
+        assert status["previous_version"] == "test"
+        new_state = inference._active_state()
+        assert new_state is not old_state
+        assert new_state.version == status["model_version"]
+        assert predict_price(req).model_version == status["model_version"]
+
+    def test_reload_skips_unchanged_artifacts(self, artifact_files):
+        """Reloading files whose content hash is already active is a no-op."""
+        from src.api import inference
+
+        inference.reload_artifacts()
+        state = inference._active_state()
+
+        status = inference.reload_artifacts()
+        assert status["reloaded"] is False
+        assert inference._active_state() is state
+        assert inference.reload_artifacts(force=True)["reloaded"] is True
+
+    def test_failed_reload_keeps_current_model(self, artifact_files, monkeypatch, sample_payload):
+        """Artifacts that fail the smoke test never replace the serving model."""
+        from src.api import inference
+
+        model_path, _ = artifact_files
+        model_path.write_bytes(b"not a pickle")
+        state = inference._active_state()
+
+        status = inference.reload_artifacts()
+
+        assert status["reloaded"] is False
+        assert status["model_version"] == "test"
+        assert "error" in status
+        assert inference._active_state() is state
+        assert predict_price(OLXPredictionRequest(**sample_payload)).model_version == "test"
+
+    def test_in_flight_request_finishes_on_old_state(self, artifact_files):
+        """A state snapshot taken before a reload keeps predicting with the old model."""
+        from src.api import inference
+
+        snapshot = inference._active_state()
+        inference.reload_artifacts(force=True)
+
+        assert inference._active_state() is not snapshot
+        row = {"LB": 120.0, "LT": 150.0, "KM": 2, "KT": 3,
+               "Kota/Kab": "Depok Kota", "Provinsi": "Jawa Barat", "Type": "Rumah"}
+        old_prices, _ = inference._predict_rows([row], snapshot)
+        new_prices, _ = inference._predict_rows([row])
+        np.testing.assert_allclose(old_prices, new_prices)
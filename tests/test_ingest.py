@@ -0,0 +1,76 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import ingest
+
+CSV = """LT,KM,KT,LB,Price,Kota/Kab,Provinsi,Type
+77.4,1,1,51.5,550.000.000,Medan Kota,Sumatra Utara,Rumah
+62.5,>10,3,71,730.000.000,Makassar Kota,Sulawesi Selatan,Rumah
+120,2,4,90,,Bandung Kota,Jawa Barat,Apartemen
+"""
+
+
+def _old_price_to_float(s):
+    # The per-row parser training/train_pipeline.py used before
+    if pd.isna(s):
+        return np.nan
+    t = "".join(ch for ch in str(s) if ch.isdigit())
+    return float(t) if t else np.nan
+
+
+def test_parse_price_matches_per_row_parser():
+    prices = pd.Series(["550.000.000", "1.250.000.000", None, "Rp 75.000", "n/a", "12,500"])
+    expected = prices.apply(_old_price_to_float)
+    pd.testing.assert_series_equal(ingest.parse_price(prices), expected)
+
+
+def test_parse_count_handles_capped_values():
+    counts = ingest.parse_count(pd.Series(["3", ">10", None, " 2 "]))
+    assert counts.dtype == np.float32
+    assert counts.tolist()[:2] == [3.0, 10.0]
+    assert np.isnan(counts[2]) and counts[3] == 2.0
+
+
+@pytest.mark.parametrize("chunksize", [1, 100])
+def test_read_listings_types(chunksize):
+    df = ingest.read_listings(io.StringIO(CSV), chunksize=chunksize)
+
+    assert list(df.columns) == ingest.REQUIRED_COLUMNS
+    for col in ingest.NUMERIC_COLUMNS:
+        assert df[col].dtype == np.float32
+    for col in ingest.CATEGORICAL_COLUMNS:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype)
+    assert df["Price"].dtype == np.float64
+    assert df["KM"].tolist() == [1, 10, 2]
+    assert df["Price"].tolist()[:2] == [550_000_000, 730_000_000]
+    assert set(df["Kota/Kab"].cat.categories) == {"Medan Kota", "Makassar Kota", "Bandung Kota"}
+
+
+def test_read_listings_validates_and_selects_columns():
+    csv = CSV.replace("Kota/Kab", " Kota/Kab ")
+    df = ingest.read_listings(io.StringIO(csv), columns=["Provinsi", "Kota/Kab"], dropna_price=True)
+    assert list(df.columns) == ["Provinsi", "Kota/Kab"]
+    assert len(df) == 3
+
+    with pytest.raises(ValueError, match="missing columns: \\['Type'\\]"):
+        ingest.read_listings(io.StringIO(CSV.replace("Type", "Kind")))
+
+
+def test_read_listings_drops_missing_prices():
+    df = ingest.read_listings(io.StringIO(CSV), dropna_price=True)
+    assert len(df) == 2
+    assert df.index.tolist() == [0, 1]
+
+
+def test_read_features(tmp_path):
+    path = tmp_path / "features.csv"
+    pd.DataFrame({"0": [1.5, 2.5], "1": [0, 1], "Price": [550_000_123, 1.0]}).to_csv(path, index=False)
+
+    df = ingest.read_features(path, "Price", chunksize=1)
+    assert df.dtypes.to_dict() == {"0": np.float32, "1": np.float32, "Price": np.float64}
+    assert df["Price"][0] == 550_000_123
+    with pytest.raises(ValueError, match="target"):
+        ingest.read_features(path, "price")
@@ -0,0 +1,83 @@
+import io
+import json
+import logging
+
+from src.api import logging_config, metrics
+from src.api.schemas import OLXPredictionRequest
+
+
+def _logger(name, handler):
+    logger = logging.getLogger(f"tests.logging.{name}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def test_pipeline_writes_json_lines_on_listener_thread(sample_payload):
+    """Records are queued, formatted by the listener as JSON and counted in the metrics."""
+    stream = io.StringIO()
+    handler, listener = logging_config.build_pipeline(stream, fmt="json")
+    logger = _logger("json", handler)
+    emitted = metrics.LOG_RECORDS.value(level="INFO", outcome="emitted")
+    written = metrics.LOG_BYTES.value()
+
+    listener.start()
+    logger.info("Prediction completed", extra={"payload": OLXPredictionRequest(**sample_payload),
+                                               "prediction": 1.5})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Scoring failed for %s", "row 3")
+    listener.stop()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "Prediction completed"
+    assert first["level"] == "INFO"
+    assert first["payload"]["LB"] == sample_payload["LB"]
+    assert first["prediction"] == 1.5
+    assert second["message"] == "Scoring failed for row 3"
+    assert "ValueError: boom" in second["exc"]
+    assert metrics.LOG_RECORDS.value(level="INFO", outcome="emitted") == emitted + 1
+    assert metrics.LOG_BYTES.value() - written == len(stream.getvalue())
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler, _ = logging_config.build_pipeline(io.StringIO(), queue_size=2)
+    logger = _logger("full", handler)
+    dropped = metrics.LOG_RECORDS.value(level="INFO", outcome="dropped")
+
+    for i in range(5):
+        logger.info(f"record {i}")
+
+    assert handler.queue.qsize() == 2
+    assert metrics.LOG_RECORDS.value(level="INFO", outcome="dropped") == dropped + 3
+
+
+def test_sampling_filter():
+    record = logging.LogRecord("payload", logging.INFO, __file__, 1, "msg", None, None)
+    sampled_out = metrics.LOG_RECORDS.value(level="INFO", outcome="sampled_out")
+
+    assert logging_config.SamplingFilter(1).filter(record)
+    assert not any(logging_config.SamplingFilter(0).filter(record) for _ in range(10))
+    assert metrics.LOG_RECORDS.value(level="INFO", outcome="sampled_out") == sampled_out + 10
+
+
+def test_rate_limit_per_call_site(monkeypatch):
+    """Errors beyond the burst are suppressed per call site and reported on the next one let through."""
+    now = [100.0]
+    monkeypatch.setattr(logging_config.time, "monotonic", lambda: now[0])
+    limiter = logging_config.RateLimitFilter(rate=1, burst=3)
+
+    def record(lineno, level=logging.ERROR):
+        return logging.LogRecord("api", level, __file__, lineno, "failed", None, None)
+
+    assert [limiter.filter(record(10)) for _ in range(5)] == [True, True, True, False, False]
+    assert limiter.filter(record(20))
+    assert limiter.filter(record(10, logging.INFO))
+
+    now[0] += 1
+    passed = record(10)
+    assert limiter.filter(passed)
+    assert passed.suppressed == 2
+    assert not limiter.filter(record(10))
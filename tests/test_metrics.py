@@ -0,0 +1,109 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import inference, metrics
+from src.api.main import app
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Histogram output follows the Prometheus text format with cumulative buckets."""
+    registry = metrics.Registry()
+    hist = metrics.Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0),
+                             registry=registry)
+    hist.observe(0.05, stage="a")
+    hist.observe(0.1, stage="a")
+    hist.observe(5.0, stage="a")
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="a"} 3' in text
+    assert 'demo_seconds_sum{stage="a"} 5.15' in text
+
+
+def test_counter_and_label_validation():
+    """Counters accumulate per label set and reject unknown labels."""
+    registry = metrics.Registry()
+    counter = metrics.Counter("demo_total", "Demo.", ("outcome",), registry=registry)
+    counter.inc(outcome="ok")
+    counter.inc(2, outcome="ok")
+    assert counter.value(outcome="ok") == 3
+    assert 'demo_total{outcome="ok"} 3' in registry.render()
+    with pytest.raises(ValueError):
+        counter.inc(result="ok")
+    with pytest.raises(ValueError):
+        metrics.Counter("demo_total", "Duplicate.", registry=registry)
+
+
+def test_render_shared_sums_published_worker_series(tmp_path, monkeypatch):
+    """Under the pre-fork server /metrics adds up the series every worker published."""
+    monkeypatch.setattr(metrics, "SHARED_DIR", str(tmp_path))
+    registry = metrics.Registry()
+    hist = metrics.Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0), registry=registry)
+    counter = metrics.Counter("demo_total", "Demo.", ("outcome",), registry=registry)
+    hist.observe(0.05, stage="a")
+    counter.inc(outcome="ok")
+    # Another worker's series, as published by metrics.publish()
+    metrics.publish(registry)
+    (tmp_path / f"{os.getpid()}.json").rename(tmp_path / "999999.json")
+    hist.observe(0.5, stage="a")
+    counter.inc(2, outcome="ok")
+    counter.inc(outcome="error")
+
+    output = metrics.render_shared([os.getpid(), 999999, 999998], registry)
+
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 2' in output
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in output
+    assert 'demo_seconds_count{stage="a"} 3' in output
+    assert 'demo_total{outcome="ok"} 4' in output
+    assert 'demo_total{outcome="error"} 1' in output
+    # This process's own series are not changed by rendering
+    assert counter.value(outcome="ok") == 3
+
+
+def test_predict_price_records_every_stage(loaded_inference, sample_payload):
+    """A prediction records each stage and the request under its model version."""
+    before = {
+        stage: metrics.STAGE_SECONDS.count(stage=stage, model_version="test")
+        for stage in ("to_row", "engineer_features", "transform", "predict",
+                      "feature_importance", "serialize")
+    }
+    requests = metrics.REQUESTS.value(endpoint="predict", model_version="test", outcome="success")
+
+    inference.predict_price(inference.OLXPredictionRequest(**sample_payload))
+
+    for stage, count in before.items():
+        assert metrics.STAGE_SECONDS.count(stage=stage, model_version="test") == count + 1
+    assert metrics.REQUESTS.value(
+        endpoint="predict", model_version="test", outcome="success"
+    ) == requests + 1
+
+
+def test_failed_prediction_counts_error_stage(loaded_inference, monkeypatch, sample_payload):
+    """Errors are counted against the stage that raised them."""
+    def broken_predict(rows, state=None):
+        raise RuntimeError("model exploded")
+
+    monkeypatch.setattr(inference, "_predict_rows", broken_predict)
+    before = metrics.ERRORS.value(endpoint="predict", stage="score", model_version="test")
+
+    with pytest.raises(ValueError, match="model exploded"):
+        inference.predict_price(inference.OLXPredictionRequest(**sample_payload))
+
+    assert metrics.ERRORS.value(endpoint="predict", stage="score", model_version="test") == before + 1
+
+
+def test_metrics_endpoint(loaded_inference, sample_payload):
+    """/metrics serves the registry in Prometheus text format."""
+    client = TestClient(app)
+    client.post("/predict", json=sample_payload)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'house_price_stage_seconds_bucket{stage="predict",model_version="test"' in response.text
+    assert "house_price_requests_total" in response.text
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from sklearn.base import clone
+from sklearn.linear_model import LinearRegression
+
+from src.api import inference, mmap_bundle
+from src.api.tree_engine import UnsupportedModelError
+
+
+def test_bundle_round_trip_is_memory_mapped(fitted_artifacts, training_frame, tmp_path):
+    """A loaded bundle predicts exactly like the pickled pair, from memory-mapped arrays."""
+    model, preprocessor = fitted_artifacts
+    X, _ = training_frame
+    version = mmap_bundle.export_bundle(model, preprocessor, tmp_path / "bundle")
+
+    engine, compiled, profile, loaded_version = mmap_bundle.load_bundle(tmp_path / "bundle")
+
+    assert loaded_version == version
+    assert isinstance(engine.threshold, np.memmap) or isinstance(engine.threshold.base, np.memmap)
+    cols = {c: X[c].to_numpy(dtype=np.float64) for c in inference.NUMERIC_COLS}
+    cols.update({c: X[c].to_numpy(dtype=object) for c in inference.CATEGORICAL_COLS})
+    cols.update(inference._derive_features(cols))
+    np.testing.assert_array_equal(compiled.transform_columns(cols), preprocessor.transform(X))
+    np.testing.assert_array_equal(engine.predict(preprocessor.transform(X)),
+                                  model.predict(preprocessor.transform(X)))
+    assert profile.display_name == "GradientBoostingRegressor"
+    assert profile.version == version
+
+
+def test_reexport_keeps_previous_version(fitted_artifacts, training_frame, tmp_path):
+    """A new export never rewrites arrays that running processes may have mapped."""
+    model, preprocessor = fitted_artifacts
+    X, y = training_frame
+    bundle = tmp_path / "bundle"
+    first = mmap_bundle.export_bundle(model, preprocessor, bundle)
+    first_files = {p.name: p.stat().st_mtime_ns for p in (bundle / first).iterdir()}
+
+    assert mmap_bundle.export_bundle(model, preprocessor, bundle) == first
+    assert {p.name: p.stat().st_mtime_ns for p in (bundle / first).iterdir()} == first_files
+
+    Xt = preprocessor.transform(X)
+    second = mmap_bundle.export_bundle(clone(model).set_params(n_estimators=5).fit(Xt, y),
+                                       preprocessor, bundle)
+    assert second != first
+    assert mmap_bundle.read_manifest(bundle)["version"] == second
+    assert (bundle / first).is_dir()
+
+    third = mmap_bundle.export_bundle(clone(model).set_params(n_estimators=6).fit(Xt, y),
+                                      preprocessor, bundle)
+    assert sorted(p.name for p in bundle.iterdir() if p.is_dir()) == sorted([second, third])
+
+
+def test_non_tree_models_are_rejected(fitted_artifacts, tmp_path):
+    """Only models the flat evaluator supports can be bundled."""
+    _, preprocessor = fitted_artifacts
+    model = LinearRegression().fit(np.zeros((3, 2)), np.zeros(3))
+    with pytest.raises(UnsupportedModelError):
+        mmap_bundle.export_bundle(model, preprocessor, tmp_path / "bundle")
+
+
+def test_inference_loads_bundle(fitted_artifacts, monkeypatch, tmp_path, sample_payload):
+    """With MODEL_BUNDLE_DIR set, the API serves from the bundle without unpickling."""
+    model, preprocessor = fitted_artifacts
+    version = mmap_bundle.export_bundle(model, preprocessor, tmp_path / "bundle")
+
+    def no_pickles():
+        raise AssertionError("pickles loaded")
+
+    monkeypatch.setattr(inference, "MODEL_BUNDLE_DIR", str(tmp_path / "bundle"))
+    monkeypatch.setattr(inference, "_load_artifacts", no_pickles)
+    for name in ("_model", "_preproc", "_state", "_model_version"):
+        monkeypatch.setattr(inference, name, None)
+    monkeypatch.setattr(inference, "_prediction_cache", inference.PredictionCache(maxsize=0))
+
+    response = inference.predict_price(inference.OLXPredictionRequest(**sample_payload))
+
+    assert response.model_version == version
+    assert response.model_name == "GradientBoostingRegressor"
+    assert inference.readiness()["ready"] is True
+    X = inference._engineer_features(inference.pd.DataFrame([inference._to_row(
+        inference.OLXPredictionRequest(**sample_payload))]))
+    assert response.prediction == round(float(model.predict(preprocessor.transform(X))[0]), 2)
+    assert inference.reload_artifacts()["reloaded"] is False
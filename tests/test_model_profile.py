@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LinearRegression
+
+from src.api import inference
+from src.api.main import app
+from src.api.model_profile import ModelProfile, _source_column
+
+
+def test_profile_ranks_importances(fitted_artifacts):
+    """The importance table is sorted and the response keeps the top three."""
+    model, preprocessor = fitted_artifacts
+    profile = ModelProfile.from_artifacts(model, preprocessor, version="v1")
+
+    names = list(preprocessor.get_feature_names_out())
+    expected = sorted(zip(names, model.feature_importances_), key=lambda x: x[1], reverse=True)
+    assert [name for name, _ in profile.importances] == [name for name, _ in expected]
+    assert profile.feature_importance() == dict(expected[:3])
+    assert profile.display_name == "GradientBoostingRegressor"
+    assert profile.version == "v1"
+
+
+def test_profile_aggregates_one_hot_columns(fitted_artifacts):
+    """One-hot slots are summed back to the input column they encode."""
+    model, preprocessor = fitted_artifacts
+    profile = ModelProfile.from_artifacts(model, preprocessor)
+
+    by_column = dict(profile.column_importances)
+    assert set(by_column) <= set(preprocessor.feature_names_in_)
+    assert "Kota/Kab" in by_column
+    kota = sum(v for name, v in profile.importances if name.startswith("cat__Kota/Kab_"))
+    assert by_column["Kota/Kab"] == pytest.approx(kota)
+    assert sum(by_column.values()) == pytest.approx(1.0)
+
+
+def test_source_column_prefers_longest_match():
+    """Columns that prefix each other resolve to the most specific one."""
+    columns = ["LB", "LB_per_LT", "Kota/Kab"]
+    assert _source_column("num__LB", columns) == "LB"
+    assert _source_column("num__LB_per_LT", columns) == "LB_per_LT"
+    assert _source_column("cat__Kota/Kab_Depok Kota", columns) == "Kota/Kab"
+    assert _source_column("remainder__other", columns) == "other"
+
+
+def test_profile_is_immutable_and_handles_models_without_importances(fitted_artifacts):
+    """Models without feature_importances_ get an empty table."""
+    _, preprocessor = fitted_artifacts
+    model = LinearRegression().fit(np.zeros((3, 2)), np.zeros(3))
+    profile = ModelProfile.from_artifacts(model, preprocessor)
+
+    assert profile.feature_importance() == {}
+    with pytest.raises(AttributeError):
+        profile.display_name = "Other"
+
+
+def test_predict_price_reuses_load_time_profile(loaded_inference, monkeypatch, sample_payload):
+    """Predictions read the precomputed profile instead of the preprocessor."""
+    model, preprocessor = loaded_inference
+    expected = inference._active_state().profile.feature_importance()
+
+    def fail():
+        raise AssertionError("feature names recomputed per request")
+
+    monkeypatch.setattr(preprocessor, "get_feature_names_out", fail, raising=False)
+    response = inference.predict_price(inference.OLXPredictionRequest(**sample_payload))
+    assert response.feature_importance == expected
+
+
+def test_model_info_endpoint(loaded_inference):
+    """/model/info exposes the active model's profile."""
+    response = TestClient(app).get("/model/info")
+    assert response.status_code == 200
+    info = response.json()
+    assert info["model_version"] == "test"
+    assert info["model_name"] == "GradientBoostingRegressor"
+    assert len(info["feature_names"]) == info["n_features"]
+    assert "Kota/Kab" in info["column_importance"]
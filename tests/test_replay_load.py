@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+from benchmarks import replay_load
+from src.api.main import app
+
+
+def _args(*extra):
+    return replay_load.parse_args(["--synthetic", "20", "--duration", "5", "--warmup", "2", *extra])
+
+
+def test_load_payloads_accepts_bodies_and_payload_logs(tmp_path, sample_payload):
+    path = tmp_path / "capture.ndjson"
+    path.write_text("\n".join([
+        json.dumps(sample_payload),
+        json.dumps({"level": "INFO", "message": "Prediction completed", "payload": sample_payload}),
+        json.dumps({"level": "INFO", "message": "Health check requested"}),
+        "",
+    ]))
+    assert replay_load.load_payloads(path) == [sample_payload, sample_payload]
+
+
+def test_closed_loop_report(loaded_inference):
+    """A closed-loop in-process run reports per-endpoint throughput, latency and errors."""
+    args = _args("--mode", "closed", "--concurrency", "4", "--requests", "24",
+                 "--endpoint", "predict", "--endpoint", "batch", "--batch-size", "3")
+    payloads = replay_load.synthetic_payloads(args.csv, args.synthetic)
+    report = asyncio.run(replay_load.run_load(args, payloads, app=app))
+
+    assert report["total"]["requests"] == 24
+    assert set(report["endpoints"]) == {"predict", "batch"}
+    assert report["endpoints"]["predict"]["requests"] == 12
+    for stats in report["endpoints"].values():
+        assert stats["errors"] == 0
+        assert stats["status_codes"] == {"200": 12}
+        assert 0 < stats["latency_ms"]["p50"] <= stats["latency_ms"]["p99"] <= stats["latency_ms"]["max"]
+    assert report["server"]["model_version"] == "test"
+    json.dumps(report)
+
+
+def test_open_loop_counts_errors_and_compares(loaded_inference, monkeypatch):
+    """Failed requests count as errors; a baseline comparison reports the change per metric."""
+    args = _args("--mode", "open", "--rate", "200", "--requests", "10")
+    payloads = replay_load.synthetic_payloads(args.csv, args.synthetic)
+    baseline = asyncio.run(replay_load.run_load(args, payloads, app=app))
+
+    def broken(req):
+        raise RuntimeError("model exploded")
+
+    monkeypatch.setattr("src.api.main.predict_price", broken)
+    report = asyncio.run(replay_load.run_load(args, payloads, app=app))
+
+    assert baseline["total"]["error_rate"] == 0
+    assert report["endpoints"]["predict"]["status_codes"] == {"500": 10}
+    assert report["total"]["error_rate"] == 1.0
+    rows = {metric: (old, new) for _, metric, old, new, _ in replay_load.compare(report, baseline)}
+    assert rows["error_rate"] == (0.0, 1.0)
+    assert "predict" in replay_load.format_report(report)
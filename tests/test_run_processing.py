@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from src.data import run_processing
+
+
+def _raw(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "price": rng.lognormal(13, 0.6, n).round(),
+        "sqft": rng.integers(500, 4000, n).astype(float),
+        "bedrooms": rng.integers(1, 6, n),
+        "location": rng.choice(["Suburb", "Downtown", "Rural"], n),
+    })
+    for column in ("price", "sqft", "location"):
+        df.loc[rng.random(n) < 0.05, column] = np.nan
+    return df
+
+
+def test_chunked_matches_in_memory_when_exact(tmp_path):
+    raw = tmp_path / "raw.csv"
+    _raw().to_csv(raw, index=False)
+
+    expected = run_processing.process_data(raw, tmp_path / "in_memory.csv")
+    summary = run_processing.process_data_chunked(raw, tmp_path / "chunked.csv", chunksize=37)
+
+    assert (tmp_path / "chunked.csv").read_text() == (tmp_path / "in_memory.csv").read_text()
+    assert summary["written"] == len(expected)
+    assert summary["rows"] - summary["written"] == summary["outliers"] > 0
+    assert set(summary["fills"]) == {"price", "sqft", "location"}
+
+
+def test_chunked_within_sketch_tolerance(tmp_path):
+    """With sketches much smaller than the data the outlier filter still agrees on almost every row."""
+    raw = tmp_path / "raw.csv"
+    _raw(n=20_000, seed=1).to_csv(raw, index=False)
+
+    expected = run_processing.process_data(raw, tmp_path / "in_memory.csv")
+    summary = run_processing.process_data_chunked(raw, tmp_path / "chunked.csv", chunksize=1000, sketch_size=256)
+
+    assert abs(summary["written"] - len(expected)) <= 0.01 * 20_000
+    assert abs(summary["fills"]["price"] - pd.read_csv(raw)["price"].median()) / summary["fills"]["price"] < 0.02
+
+
+def test_price_column():
+    assert run_processing.price_column(["sqft", "price"]) == "price"
+    assert run_processing.price_column(["LB", "Price"]) == "Price"
@@ -0,0 +1,141 @@
+import os
+import signal
+import threading
+
+from fastapi.testclient import TestClient
+
+from src.api import inference, memory, server
+from src.api.main import app
+
+SMAPS_ROLLUP = """\
+55d0c0000000-7ffc00000000 ---p 00000000 00:00 0                          [rollup]
+Rss:              204800 kB
+Pss:               61440 kB
+Shared_Clean:     153600 kB
+Shared_Dirty:          0 kB
+Private_Clean:      1024 kB
+Private_Dirty:     50176 kB
+"""
+
+
+def test_parse_smaps_rollup():
+    """kB fields are converted to bytes and renamed; other lines are ignored."""
+    values = memory._parse_kb_fields(SMAPS_ROLLUP, memory._SMAPS_FIELDS)
+    assert values["rss"] == 204800 * 1024
+    assert values["pss"] == 61440 * 1024
+    assert values["private_dirty"] == 50176 * 1024
+    assert len(values) == 6
+
+
+def test_process_memory_of_this_process():
+    report = memory.process_memory()
+    assert report["pid"] == os.getpid()
+    assert report["rss"] > 0
+    assert report["pss"] is None or 0 < report["pss"] <= report["rss"]
+
+
+def test_memory_endpoint_without_prefork():
+    """Outside the pre-fork server only the current process is reported."""
+    body = TestClient(app).get("/memory").json()
+    assert body["master"] is None
+    assert [w["pid"] for w in body["workers"]] == [os.getpid()]
+    assert body["total_rss"] == body["workers"][0]["rss"]
+
+
+def test_prefork_workers_inherit_loaded_model(loaded_inference, monkeypatch):
+    """Workers serve the master's model without loading, and dead workers are replaced."""
+    def no_load():
+        raise AssertionError("artifacts loaded in a worker")
+
+    monkeypatch.setattr(inference, "_load_artifacts", no_load)
+    read_fd, write_fd = os.pipe()
+
+    def serve():
+        inference._ensure_loaded()
+        report = memory.memory_report()
+        os.write(write_fd, f"{os.getpid()} {inference._active_state().version} "
+                           f"{len(report['workers'])}\n".encode())
+        signal.pause()
+
+    prefork = server.PreforkServer(serve, workers=2, memory_report_interval=0, graceful_timeout=5)
+    lines = []
+
+    def drive():
+        with os.fdopen(read_fd) as reports:
+            for line in reports:
+                lines.append(line.split())
+                if len(lines) == 2:
+                    os.kill(int(lines[0][0]), signal.SIGKILL)
+                if len(lines) == 3:
+                    break
+        prefork.stop()
+
+    driver = threading.Thread(target=drive, daemon=True)
+    driver.start()
+    prefork.run()
+    driver.join(timeout=5)
+    os.close(write_fd)
+
+    assert len(lines) == 3
+    assert {version for _, version, _ in lines} == {"test"}
+    assert all(int(n_workers) >= 1 for _, _, n_workers in lines)
+    assert len({pid for pid, _, _ in lines}) == 3
+    assert prefork.workers == {}
+
+
+def test_reload_signal_reaches_master_and_every_worker():
+    """RELOAD_SIGNAL to the master reloads it and is forwarded to each worker."""
+    read_fd, write_fd = os.pipe()
+    master_pid = os.getpid()
+    master_reloads = []
+
+    def serve():
+        os.write(write_fd, f"ready {os.getpid()}\n".encode())
+        while True:
+            signal.pause()
+
+    def reload():
+        if os.getpid() == master_pid:
+            master_reloads.append(True)
+        else:
+            os.write(write_fd, f"reload {os.getpid()}\n".encode())
+
+    prefork = server.PreforkServer(serve, workers=2, memory_report_interval=0, graceful_timeout=5,
+                                   reload=reload)
+    events = []
+
+    def drive():
+        with os.fdopen(read_fd) as reports:
+            for line in reports:
+                events.append(line.split())
+                if len(events) == 2:
+                    os.kill(master_pid, server.RELOAD_SIGNAL)
+                if len(events) == 4:
+                    break
+        prefork.stop()
+
+    driver = threading.Thread(target=drive, daemon=True)
+    driver.start()
+    prefork.run()
+    driver.join(timeout=5)
+    os.close(write_fd)
+
+    ready = {pid for kind, pid in events if kind == "ready"}
+    assert len(ready) == 2
+    assert {pid for kind, pid in events if kind == "reload"} == ready
+    assert master_reloads == [True]
+
+
+def test_admin_reload_notifies_master_only_under_prefork(monkeypatch):
+    """A worker that reloaded asks the pre-fork master to reload the others."""
+    from src.api import main
+    sent = []
+    monkeypatch.setattr(inference, "ADMIN_TOKEN", None)
+    monkeypatch.setattr(main, "reload_artifacts", lambda force=False: {"reloaded": True})
+    monkeypatch.setattr(os, "kill", lambda pid, sig: sent.append((pid, sig)))
+    client = TestClient(app)
+
+    assert client.post("/admin/reload").json()["workers_notified"] is False
+    monkeypatch.setattr(memory, "MASTER_PID", 4242)
+    assert client.post("/admin/reload").json()["workers_notified"] is True
+    assert sent == [(4242, server.RELOAD_SIGNAL)]
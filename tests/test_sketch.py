@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.sketch import QuantileSketch
+
+
+def test_exact_below_capacity():
+    values = np.random.default_rng(0).normal(size=999)
+    sketch = QuantileSketch(k=1024)
+    for chunk in np.array_split(values, 7):
+        sketch.update(chunk)
+
+    for q in (0, 0.25, 0.5, 0.75, 1):
+        assert sketch.quantile(q) == pytest.approx(pd.Series(values).quantile(q))
+
+
+def test_bounded_memory_and_rank_error():
+    values = np.random.default_rng(1).lognormal(13, 0.6, size=400_000)
+    sketch = QuantileSketch(k=512)
+    for chunk in np.array_split(values, 40):
+        sketch.update(chunk)
+
+    assert sketch.count == len(values)
+    assert sketch.size < 512 * len(sketch.levels)
+    ordered = np.sort(values)
+    for q in (0.25, 0.5, 0.75):
+        rank = np.searchsorted(ordered, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.01
+
+
+def test_merge_and_repeated_values():
+    values = np.random.default_rng(2).uniform(size=50_000)
+    left, right = QuantileSketch(k=256, seed=1), QuantileSketch(k=256, seed=2)
+    left.update(values[:20_000])
+    right.update(np.append(values[20_000:], np.nan))
+    left.merge(right)
+    assert left.count == len(values)
+    assert abs(left.quantile(0.5) - 0.5) < 0.02
+
+    sketch = QuantileSketch()
+    sketch.update([1.0, 2.0, 3.0])
+    sketch.add_repeated(10.0, 5)
+    assert sketch.count == 8
+    assert sketch.quantile(0.5) == pd.Series([1.0, 2.0, 3.0] + [10.0] * 5).quantile(0.5)
@@ -0,0 +1,112 @@
+import json
+import mmap
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from xgboost import XGBRegressor
+
+from src.features import store
+
+
+def _is_mapped(array):
+    while array is not None and not isinstance(array, (np.memmap, mmap.mmap)):
+        array = getattr(array, "base", None)
+    return array is not None
+
+
+def _features(n_rows=50):
+    rng = np.random.default_rng(0)
+    numeric = rng.normal(size=(n_rows, 2))
+    onehot = np.eye(6)[rng.integers(6, size=n_rows)]
+    X = pd.DataFrame(np.hstack([numeric, onehot]).astype(np.float32))
+    X.columns = [str(i) for i in range(X.shape[1])]
+    y = rng.uniform(1e8, 1e9, size=n_rows).round()
+    return X, y
+
+
+@pytest.mark.parametrize("layout", ["csr", "dense"])
+def test_round_trip(tmp_path, layout):
+    X, y = _features()
+    path = tmp_path / "featured.features"
+
+    meta = store.save_features(path, X, y, target="Price", feature_names=[f"f{i}" for i in range(8)], layout=layout)
+    features = store.load_features(path)
+
+    assert meta["layout"] == layout and store.is_store(path)
+    dense = features.X.toarray() if sparse.issparse(features.X) else np.asarray(features.X)
+    np.testing.assert_array_equal(dense, X.to_numpy())
+    np.testing.assert_array_equal(features.y, y)
+    assert features.columns == list(X.columns)
+    assert features.target == "Price"
+    assert json.loads((path / "meta.json").read_text())["feature_names"][0] == "f0"
+
+
+def test_auto_layout_uses_csr_for_sparse_data_and_maps_it(tmp_path):
+    X, y = _features()
+    path = tmp_path / "featured.features"
+
+    assert store.save_features(path, X, y, target="Price")["layout"] == "csr"
+    X_loaded, y_loaded, columns = store.load_xy(path, "Price")
+
+    assert X_loaded.dtype == np.float32
+    # The CSR matrix is a view over the read-only mapped files, not a copy
+    for array in (X_loaded.data, X_loaded.indices, X_loaded.indptr):
+        assert _is_mapped(array)
+        assert not array.flags.writeable
+    assert y_loaded.dtype == np.float64
+
+
+def test_load_xy_falls_back_to_csv(tmp_path):
+    X, y = _features()
+    csv = tmp_path / "featured.csv"
+    X.assign(Price=y).to_csv(csv, index=False)
+
+    X_loaded, y_loaded, columns = store.load_xy(csv, "Price")
+
+    assert sparse.issparse(X_loaded)
+    np.testing.assert_allclose(X_loaded.toarray(), X.to_numpy(), rtol=1e-6)
+    np.testing.assert_array_equal(y_loaded, y)
+    assert columns == list(X.columns)
+
+    store.main(["--csv", str(csv)])
+    assert store.is_store(store.store_path(csv))
+
+
+def test_save_replaces_store_and_checks_shapes(tmp_path):
+    X, y = _features()
+    path = tmp_path / "featured.features"
+    store.save_features(path, X, y)
+    store.save_features(path, X.iloc[:10], y[:10], layout="dense")
+
+    assert store.load_features(path).X.shape == (10, 8)
+    assert not (path / "data.npy").exists()
+    assert [p.name for p in tmp_path.iterdir()] == ["featured.features"]
+    with pytest.raises(ValueError, match="values for"):
+        store.save_features(path, X, y[:5])
+
+
+def test_load_xy_checks_target_name(tmp_path):
+    X, y = _features()
+    path = tmp_path / "featured.features"
+    store.save_features(path, X, y, target="price")
+
+    with pytest.raises(ValueError, match="has target 'price', not 'Price'"):
+        store.load_xy(path, "Price")
+
+
+def test_store_trained_xgboost_predicts_the_same_on_dense_input(tmp_path):
+    # One-hot plus numeric, as the preprocessor produces: many exact zeros
+    X, y = _features(400)
+    y = X["0"].to_numpy() * 3 + X["2"].to_numpy() * 5 + X["5"].to_numpy() * -4
+    path = tmp_path / "featured.features"
+    store.save_features(path, X, y, target="Price")
+
+    X_train, y_train, _ = store.load_xy(path, "Price", dense=True)
+    model = XGBRegressor(n_estimators=50, max_depth=3).fit(X_train, y_train)
+
+    # The API feeds the model dense preprocessor output
+    served = model.predict(X.to_numpy())
+    np.testing.assert_allclose(served, model.predict(X_train), rtol=1e-6)
+    assert np.mean(np.abs(served - y)) < 0.5
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from src.api import inference
+from src.api.main import app
+from src.api.streaming import iter_lines
+
+
+def _collect(chunks, max_line_bytes=1024):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [item async for item in iter_lines(stream(), max_line_bytes)]
+
+    return asyncio.run(run())
+
+
+def test_iter_lines_joins_lines_split_across_chunks():
+    """Lines are reassembled across chunk boundaries and numbered from 1."""
+    lines = _collect([b'{"a": 1}\n{"b"', b': 2}\n\n', b'{"c": 3}'])
+    assert lines == [(1, b'{"a": 1}'), (2, b'{"b": 2}'), (4, b'{"c": 3}')]
+
+
+def test_iter_lines_reports_oversized_lines_without_buffering():
+    """A line longer than the limit is yielded as None and the next line is kept."""
+    lines = _collect([b"x" * 10, b"x" * 10, b"x\nok\n"], max_line_bytes=8)
+    assert lines == [(1, None), (2, b"ok")]
+
+
+def test_stream_endpoint_scores_rows_and_reports_errors_inline(
+    loaded_inference, monkeypatch, sample_payload
+):
+    """Each input line yields one record, in order, with inline errors."""
+    monkeypatch.setattr(inference, "STREAM_CHUNK_SIZE", 2)
+    bad = dict(sample_payload, LB=-5)
+    lines = [
+        json.dumps(dict(sample_payload, id="a")),
+        "not json",
+        json.dumps(bad),
+        json.dumps(sample_payload),
+        "[1, 2]",
+    ]
+    body = ("\n".join(lines) + "\n").encode()
+
+    def chunks():
+        for start in range(0, len(body), 17):
+            yield body[start:start + 17]
+
+    expected = inference.predict_price(inference.OLXPredictionRequest(**sample_payload)).prediction
+    response = TestClient(app).post("/predict/stream", content=chunks())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["line"] for r in records] == [1, 2, 3, 4, 5]
+    assert records[0]["id"] == "a"
+    assert records[0]["prediction"]["prediction"] == expected
+    assert records[1]["error"].startswith("Invalid JSON")
+    assert "LB" in records[2]["error"]
+    assert records[3]["prediction"]["prediction"] == expected
+    assert records[4]["error"] == "Each line must be a JSON object"
+
+
+def test_stream_endpoint_fails_fast_without_model(monkeypatch):
+    """If the model cannot be loaded the stream is refused with 500."""
+    def failing_load():
+        raise FileNotFoundError("Model file not found")
+
+    monkeypatch.setattr(inference, "_ensure_loaded", failing_load)
+    response = TestClient(app).post("/predict/stream", content=b"{}\n")
+    assert response.status_code == 500
+
+
+def test_stream_isolates_unscorable_row_without_row_loop(loaded_inference, monkeypatch, sample_payload):
+    """An unseen category fails its own line; the chunk stays vectorized."""
+    monkeypatch.setattr(inference, "STREAM_CHUNK_SIZE", 32)
+    payloads = [dict(sample_payload, LB=float(lb)) for lb in range(50, 82)]
+    payloads[9] = dict(sample_payload, **{"Kota/Kab": "Atlantis"})
+    calls = []
+    predict_rows = inference._predict_rows
+    monkeypatch.setattr(inference, "_predict_rows", lambda rows, state=None: calls.append(len(rows))
+                        or predict_rows(rows, state))
+
+    response = TestClient(app).post("/predict/stream", content="\n".join(map(json.dumps, payloads)).encode())
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert ["error" in r for r in records] == [i == 9 for i in range(32)]
+    assert len(calls) <= 2 * 5 + 1
@@ -0,0 +1,66 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src.api import inference
+from src.api.cache import PredictionCache
+from src.api.main import app
+
+client = TestClient(app)
+
+
+def test_sweep_curve_matches_single_predictions(loaded_inference, sample_payload):
+    response = client.post("/predict/sweep", json={
+        "base": sample_payload,
+        "axes": [{"feature": "LB", "start": 10, "stop": 1000, "num": 12}],
+    })
+    assert response.status_code == 200
+    body = response.json()
+
+    values = body["axes"][0]["values"]
+    assert body["shape"] == [12] and len(body["predictions"]) == 12
+    assert values[0] == 10 and values[-1] == 1000
+    rows = [dict(sample_payload, LB=lb) for lb in values]
+    expected, _ = inference._predict_rows(rows)
+    np.testing.assert_allclose(body["predictions"], np.round(expected, 2))
+    assert body["model_version"] == "test" and not body["cached"]
+
+
+def test_sweep_surface_is_row_major_with_whole_counts(loaded_inference, sample_payload):
+    body = client.post("/predict/sweep", json={
+        "base": sample_payload,
+        "axes": [{"feature": "LT", "start": 50, "stop": 500, "num": 4},
+                 {"feature": "KT", "start": 1, "stop": 7, "num": 50}],
+    }).json()
+
+    assert body["shape"] == [4, 7]
+    assert body["axes"][1]["values"] == [1, 2, 3, 4, 5, 6, 7]
+    surface = np.array(body["predictions"]).reshape(body["shape"])
+    lt, kt = body["axes"][0]["values"][2], body["axes"][1]["values"][5]
+    expected, _ = inference._predict_rows([dict(sample_payload, LT=lt, KT=kt)])
+    assert surface[2, 5] == round(float(expected[0]), 2)
+
+
+def test_sweep_is_cached_per_base_and_axes(loaded_inference, monkeypatch, sample_payload):
+    monkeypatch.setattr(inference, "_sweep_cache", PredictionCache(maxsize=8))
+    request = {"base": sample_payload, "axes": [{"feature": "KM", "start": 1, "stop": 4}]}
+
+    first = client.post("/predict/sweep", json=request).json()
+    second = client.post("/predict/sweep", json=request).json()
+    other = client.post("/predict/sweep", json=dict(request, base=dict(sample_payload, LB=300.0))).json()
+
+    assert not first["cached"] and second["cached"] and not other["cached"]
+    assert second["predictions"] == first["predictions"]
+    assert client.get("/cache/stats").json()["sweep"]["hits"] == 1
+
+
+def test_sweep_validation(loaded_inference, sample_payload):
+    def post(axes, base=sample_payload):
+        return client.post("/predict/sweep", json={"base": base, "axes": axes}).status_code
+
+    assert post([]) == 422
+    assert post([{"feature": "LB", "start": 500, "stop": 100}]) == 422
+    assert post([{"feature": "Type", "start": 1, "stop": 2}]) == 422
+    assert post([{"feature": "LB", "start": 10, "stop": 20, "num": 200},
+                 {"feature": "LT", "start": 10, "stop": 20, "num": 200}]) == 422
+    assert post([{"feature": "LB", "start": 10, "stop": 20}],
+                base=dict(sample_payload, **{"Kota/Kab": "Atlantis"})) == 400
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import GridSearchCV
+
+from src.models import training_scheduler
+
+
+@pytest.fixture
+def regression_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(120, 4))
+    y = X @ np.array([3.0, -2.0, 0.5, 0.0]) + rng.normal(scale=0.5, size=120)
+    return X[:90], y[:90], X[90:], y[90:]
+
+
+def test_share_arrays_round_trips_as_read_only_memmap(tmp_path):
+    paths = training_scheduler.share_arrays(tmp_path, X=np.arange(6, dtype=np.int64).reshape(2, 3))
+
+    shared = training_scheduler.open_shared(paths["X"])
+    assert isinstance(shared, np.memmap)
+    assert shared.dtype == np.float64
+    assert not shared.flags.writeable
+    np.testing.assert_array_equal(shared, [[0, 1, 2], [3, 4, 5]])
+    assert training_scheduler.open_shared(paths["X"]) is shared
+
+
+def test_run_model_search_matches_grid_search(regression_data):
+    """Each family gets the candidate GridSearchCV(cv=3, scoring='r2') would pick."""
+    X_train, y_train, X_test, y_test = regression_data
+    models = {
+        "LinearRegression": LinearRegression(),
+        "Ridge": Ridge(),
+        "RandomForest": RandomForestRegressor(random_state=0),
+    }
+    grids = {
+        "LinearRegression": {},
+        "Ridge": {"alpha": [0.01, 10.0, 1000.0]},
+        "RandomForest": {"n_estimators": [5, 10], "max_depth": [2, None]},
+    }
+
+    results, report = training_scheduler.run_model_search(
+        models, grids, X_train, y_train, X_test, y_test, n_jobs=2
+    )
+
+    for name in ("Ridge", "RandomForest"):
+        search = GridSearchCV(models[name], grids[name], cv=3, scoring="r2").fit(X_train, y_train)
+        assert results[name]["params"] == search.best_params_
+        assert results[name]["cv_score"] == pytest.approx(search.best_score_)
+    assert results["LinearRegression"]["r2"] > 0.9
+    assert set(results["RandomForest"]) >= {"model", "mae", "mse", "rmse", "r2", "params", "cv_score"}
+    assert report["n_fits"] == (1 + 3 + 4) * 3 + 3
+    assert report["families"]["RandomForest"]["candidates"] == 4
+    assert report["wall_seconds"] > 0
+    assert report["peak_rss_bytes"] > 0
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from xgboost import XGBRegressor
+
+from src.api import inference
+from src.api.tree_engine import FlatTreeEnsemble, UnsupportedModelError, check_equivalence
+
+
+@pytest.fixture(scope="module")
+def regression_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 12))
+    X[:, 6:] = rng.integers(0, 2, size=(500, 6))
+    y = 3 * X[:, 0] - 2 * X[:, 1] * X[:, 7] + rng.normal(size=500)
+    return X, y
+
+
+@pytest.mark.parametrize("model", [
+    GradientBoostingRegressor(n_estimators=30, max_depth=3, learning_rate=0.05, random_state=0),
+    RandomForestRegressor(n_estimators=10, max_depth=None, random_state=0),
+    XGBRegressor(n_estimators=30, max_depth=4),
+], ids=lambda m: type(m).__name__)
+def test_flat_ensemble_matches_model_predict(model, regression_data):
+    """Flattened ensembles reproduce model.predict for batches and single rows."""
+    X, y = regression_data
+    model.fit(X, y)
+    engine = FlatTreeEnsemble.from_model(model)
+
+    assert check_equivalence(model, engine, X)["exact"]
+    # XGBoost accumulates in float32, so allow float32 rounding differences
+    np.testing.assert_allclose(engine.predict(X[3]), model.predict(X[3:4]), rtol=1e-6)
+
+
+def test_flat_ensemble_missing_values(regression_data):
+    """NaN inputs follow each split's default direction."""
+    X, y = regression_data
+    X = X.copy()
+    X[::7, 0] = np.nan
+    model = XGBRegressor(n_estimators=20, max_depth=3).fit(X, y)
+    engine = FlatTreeEnsemble.from_model(model)
+
+    assert check_equivalence(model, engine, X)["exact"]
+
+
+def test_flat_ensemble_rejects_non_tree_models(regression_data):
+    X, y = regression_data
+    with pytest.raises(UnsupportedModelError):
+        FlatTreeEnsemble.from_model(LinearRegression().fit(X, y))
+
+
+def test_flat_ensemble_checks_feature_count(regression_data):
+    X, y = regression_data
+    engine = FlatTreeEnsemble.from_model(GradientBoostingRegressor(n_estimators=5).fit(X, y))
+    with pytest.raises(ValueError):
+        engine.predict(X[:, :5])
+
+
+def test_predict_price_uses_flat_model(loaded_inference, monkeypatch, sample_payload):
+    """predict_price gives the same answer with and without the flat evaluator."""
+    req = inference.OLXPredictionRequest(**sample_payload)
+    assert inference._active_state().fast_model(1) is not None
+    flat_price = inference.predict_price(req).prediction
+
+    monkeypatch.setattr(inference._active_state(), "flat", None)
+    assert inference.predict_price(req).prediction == flat_price
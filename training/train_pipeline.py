@@ -1,6 +1,6 @@
 
 # training/train_pipeline.py
-import argparse, pandas as pd, numpy as np, joblib, os
+import argparse, pandas as pd, numpy as np, joblib, os, sys
 from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.compose import ColumnTransformer
@@ -15,6 +15,10 @@ try:
 except Exception:
     mlflow = None
 
+# Allow `python training/train_pipeline.py` to import the src package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.ingest import read_listings
+
 def parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--csv", required=True, help="Path to final.csv (with columns LB,LT,KM,KT,Provinsi,Kota/Kab,Type,Price)")
@@ -22,24 +26,13 @@ def parse_args():
     p.add_argument("--mlflow-uri", default="", help="MLflow tracking URI (empty to disable)")
     return p.parse_args()
 
-def price_to_float(s):
-    if pd.isna(s): return np.nan
-    t = str(s).replace('.', '').replace(',', '')
-    t = ''.join(ch for ch in t if ch.isdigit())
-    return float(t) if t else np.nan
-
 if __name__ == "__main__":
     args = parse_args()
-    df = pd.read_csv(args.csv)
-
-    needed = ["LB","LT","KM","KT","Kota/Kab","Provinsi","Type","Price"]
-    missing = [c for c in needed if c not in df.columns]
-    if missing:
-        raise SystemExit(f"CSV missing columns: {missing}")
-
-    df = df.copy()
-    df["Price"] = df["Price"].apply(price_to_float)
-    df = df.dropna(subset=["Price"])
+    # float32 numerics, categorical locations/type, vectorized price parsing
+    try:
+        df = read_listings(args.csv, dropna_price=True)
+    except ValueError as e:
+        raise SystemExit(str(e))
 
     X = df[["LB","LT","KM","KT","Kota/Kab","Provinsi","Type"]]
     y = df["Price"]